@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class DevoteesConfig(AppConfig):
     name = 'devotees'
+
+    def ready(self):
+        # Connects the user-cache invalidation receivers
+        from . import authentication  # noqa: F401
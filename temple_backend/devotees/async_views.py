@@ -0,0 +1,234 @@
+# ============================================================
+# ASYNC READ ENDPOINTS (SERVED BY temple_backend.asgi)
+# ============================================================
+#
+# Native `async def` views for the hot read paths, mounted under
+# /api/async/. Under an ASGI server (uvicorn / daphne) they await the
+# async ORM and stream exports from async iterators, so one process
+# can hold many slow clients (phones on weak temple Wi-Fi) without a
+# worker thread per connection. Under WSGI they still work, one
+# request per thread like the DRF views.
+#
+#   GET async/devotees/?nakshatra=&search=...   list page (keyset)
+#   GET async/duplicates/  async/invalids/      list pages
+#   GET async/stats/                            counts
+#   GET async/{devotees,duplicates,invalids}/export.csv
+#
+# Lists take the same filters as the DRF lists, return the same row
+# layout and ETags, and page with an opaque forward-only ?cursor=
+# in (-created_at, -id) order. "previous" is always null.
+
+import base64
+import binascii
+import functools
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.settings import api_settings
+
+from .authentication import CachedJWTAuthentication
+from .conditional import is_not_modified, list_etag, set_validators
+from .exports import astream_csv
+from .fastlist import FastJSONRenderer, values_plan
+from .filters import filter_devotees, nakshatra_param
+from .models import Devotee, DuplicateEntry, InvalidEntry
+from .stats import aread_stats, aread_version
+from .views import DevoteeViewSet, DuplicateEntryViewSet, InvalidEntryViewSet
+
+
+MAX_PAGE_SIZE = getattr(settings, "MAX_PAGE_SIZE", 500)
+
+# Serializer and export settings come from the matching DRF viewset
+VIEWSETS = {
+    Devotee: DevoteeViewSet,
+    DuplicateEntry: DuplicateEntryViewSet,
+    InvalidEntry: InvalidEntryViewSet,
+}
+
+_authenticator = CachedJWTAuthentication()
+
+
+# ============================================================
+# AUTHENTICATION
+# ============================================================
+
+def jwt_required(view):
+    """
+    Async counterpart of IsAuthenticated + CachedJWTAuthentication. The
+    user lookup runs off the event loop; failures answer like DRF (401).
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            result = await sync_to_async(_authenticator.authenticate)(request)
+        except AuthenticationFailed as e:
+            detail = e.detail if isinstance(e.detail, dict) else {"detail": e.detail}
+            return _unauthorized(detail)
+
+        if result is None:
+            return _unauthorized({"detail": "Authentication credentials were not provided."})
+
+        request.user, request.auth = result
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def _json(data, status=200):
+    return HttpResponse(
+        FastJSONRenderer().render(data),
+        status=status,
+        content_type="application/json",
+    )
+
+
+def _unauthorized(detail):
+    response = _json(detail, status=401)
+    response["WWW-Authenticate"] = _authenticator.authenticate_header(None)
+    return response
+
+
+# ============================================================
+# KEYSET CURSOR
+# ============================================================
+
+def _encode_cursor(row):
+    raw = f"{row['created_at'].isoformat()}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError({"detail": "Invalid cursor"})
+
+
+def _page_size(params):
+    try:
+        size = int(params.get("page_size", api_settings.PAGE_SIZE))
+    except ValueError:
+        size = api_settings.PAGE_SIZE
+
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+def _next_link(request, cursor):
+    params = request.GET.copy()
+    params["cursor"] = cursor
+    return request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+
+# ============================================================
+# LISTS
+# ============================================================
+
+async def _list(request, model):
+    serializer_class = VIEWSETS[model].serializer_class
+
+    nakshatra = nakshatra_param(request.GET)
+    version, last_modified = await aread_version(model, nakshatra or None)
+
+    etag = list_etag(model, version, request.get_full_path(), "json")
+
+    if is_not_modified(request, etag):
+        return set_validators(HttpResponse(status=304), etag, last_modified)
+
+    try:
+        queryset = filter_devotees(model.objects.all(), request.GET)
+
+        cursor = request.GET.get("cursor")
+        if cursor:
+            created_at, pk = _decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+    except ValidationError as e:
+        return _json(e.detail, status=400)
+
+    plan = values_plan(serializer_class())
+    page_size = _page_size(request.GET)
+
+    values = [
+        row async for row in queryset.order_by("-created_at", "-id")
+        .values(*plan.fields)[:page_size + 1]
+    ]
+
+    has_next = len(values) > page_size
+    values = values[:page_size]
+
+    data = {
+        "next": _next_link(request, _encode_cursor(values[-1])) if has_next else None,
+        "previous": None,
+        "results": plan.rows(values),
+    }
+
+    return set_validators(_json(data), etag, last_modified)
+
+
+@jwt_required
+async def devotee_list(request):
+    return await _list(request, Devotee)
+
+
+@jwt_required
+async def duplicate_list(request):
+    return await _list(request, DuplicateEntry)
+
+
+@jwt_required
+async def invalid_list(request):
+    return await _list(request, InvalidEntry)
+
+
+# ============================================================
+# STATS
+# ============================================================
+
+@jwt_required
+async def stats(request):
+    return _json(await aread_stats())
+
+
+# ============================================================
+# STREAMING CSV EXPORTS
+# ============================================================
+
+async def _export(request, model):
+    viewset = VIEWSETS[model]
+
+    try:
+        queryset = filter_devotees(model.objects.all(), request.GET)
+    except ValidationError as e:
+        return _json(e.detail, status=400)
+
+    label = nakshatra_param(request.GET) or viewset.export_name
+    today = timezone.localdate().isoformat()
+
+    return astream_csv(
+        queryset.order_by("-created_at", "-id"),
+        viewset.export_fields,
+        f"{label}_{today}.csv",
+    )
+
+
+@jwt_required
+async def devotee_export(request):
+    return await _export(request, Devotee)
+
+
+@jwt_required
+async def duplicate_export(request):
+    return await _export(request, DuplicateEntry)
+
+
+@jwt_required
+async def invalid_export(request):
+    return await _export(request, InvalidEntry)
@@ -0,0 +1,199 @@
+# ============================================================
+# JWT AUTHENTICATION WITH A CACHED USER LOOKUP
+# ============================================================
+#
+# simplejwt's JWTAuthentication loads the User row on every request.
+# CachedJWTAuthentication keeps resolved users in an in-process LRU
+# cache keyed by (user id, token id), so repeat requests with the same
+# access token skip that query.
+#
+#   * entries live AUTH_USER_CACHE_TTL seconds (never past the token's
+#     own expiry); at most AUTH_USER_CACHE_SIZE entries are kept
+#   * saving or deleting a User (password change, deactivation, any
+#     edit through the ORM / admin) drops all of that user's entries
+#   * the is_active / password-changed checks still run on every hit
+#   * a lookup that raced with an invalidation is not cached (the
+#     user row it read may predate the change)
+#   * hit / miss / eviction counters: GET /api/auth-cache/ (staff)
+#
+# The cache is per process: a change made in another worker (or with
+# QuerySet.update(), which sends no signal) is seen there after the
+# TTL at the latest. AUTH_USER_CACHE_TTL=0 disables caching.
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+USER_CACHE_TTL = getattr(settings, "AUTH_USER_CACHE_TTL", 60)
+USER_CACHE_SIZE = getattr(settings, "AUTH_USER_CACHE_SIZE", 1024)
+
+
+class UserCache:
+    """Thread-safe TTL + LRU map of (user_id, token_id) -> User."""
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+        # Bumped by every invalidation; see set()
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            # Each request gets its own instance
+            return copy.copy(entry[0])
+
+    def set(self, key, user, expires_at, generation):
+        """
+        Store a user loaded when `self.generation` was `generation`;
+        dropped if an invalidation happened since, as the row read may
+        be older than the change that triggered it.
+        """
+        expires_at = min(time.time() + self.ttl, expires_at)
+
+        with self._lock:
+            if generation != self.generation:
+                return
+
+            self._entries[key] = (copy.copy(user), expires_at)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(key[0], set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self.generation += 1
+            keys = self._keys_by_user.pop(user_id, set())
+
+            for key in keys:
+                self._entries.pop(key, None)
+
+            self.invalidations += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = UserCache(USER_CACHE_TTL, USER_CACHE_SIZE)
+
+
+# ============================================================
+# AUTHENTICATION CLASS
+# ============================================================
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+
+        if not user_cache.ttl:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        token_id = validated_token.get(api_settings.JTI_CLAIM) or str(validated_token)
+        key = (str(user_id), token_id)
+
+        user = user_cache.get(key)
+
+        if user is None:
+            generation = user_cache.generation
+
+            user = super().get_user(validated_token)
+            user_cache.set(key, user, validated_token.get("exp", float("inf")), generation)
+            return user
+
+        # Same checks as JWTAuthentication.get_user, without the query
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+# ============================================================
+# INVALIDATION
+# ============================================================
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def _invalidate_cached_user(sender, instance, using, **kwargs):
+    user_id = str(getattr(instance, api_settings.USER_ID_FIELD))
+
+    user_cache.invalidate_user(user_id)
+
+    # Lookups until the commit still read the old row; invalidate again
+    # once the change is visible
+    transaction.on_commit(lambda: user_cache.invalidate_user(user_id), using=using)
@@ -0,0 +1,329 @@
+# ============================================================
+# BATCH CREATE / UPDATE / CONVERT
+# ============================================================
+#
+# Replaces per-row round trips from the UI (POST devotee, maybe POST
+# duplicate, DELETE invalid ...) with one request per batch. Each
+# batch validates every item, resolves duplicates with one set-based
+# identity lookup and writes with bulk queries. Callers wrap the
+# whole batch in a single transaction.
+#
+# Every function returns one result dict per input item, in order:
+#   {"index": 0, "status": "created", "id": 12}
+#   {"index": 1, "status": "duplicate", "errors": {...}}
+#   {"index": 2, "status": "invalid", "errors": {...}}
+#   {"index": 3, "status": "not_found"}
+#
+# Malformed items (not an object, two items for one row, items that
+# collide with each other) are reported as "invalid" per item; they
+# never fail the whole batch.
+
+from django.conf import settings
+
+from .ingestion import lookup_identities
+from .models import Devotee, DuplicateEntry, InvalidEntry
+from .serializers import DUPLICATE_MESSAGE, DevoteeBatchItemSerializer
+from .stats import (
+    adjust_counts,
+    counter_key,
+    record_created,
+    record_deleted,
+    record_updated,
+)
+
+
+MAX_BATCH_ITEMS = getattr(settings, "MAX_BATCH_ITEMS", 1000)
+
+DEVOTEE_FIELDS = ["name", "country_code", "phone", "nakshatra"]
+
+DUPLICATE_ERROR = {"duplicate": [DUPLICATE_MESSAGE]}
+
+NOT_AN_OBJECT_ERROR = {"non_field_errors": ["Each item must be an object with an \"id\"."]}
+
+NOT_AN_ID_ERROR = {"non_field_errors": ["Each item must be an id or an object with an \"id\"."]}
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def _identity(data):
+    return tuple(data[field] for field in DEVOTEE_FIELDS)
+
+
+def _object_identity(obj):
+    return tuple(getattr(obj, field) for field in DEVOTEE_FIELDS)
+
+
+def _validate(item, instance=None):
+    serializer = DevoteeBatchItemSerializer(
+        instance,
+        data=item,
+        partial=instance is not None,
+    )
+
+    if serializer.is_valid():
+        return serializer.validated_data, None
+
+    return None, serializer.errors
+
+
+def _to_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _invalid(index, errors):
+    return {"index": index, "status": "invalid", "errors": errors}
+
+
+def _batch_conflict(index, other):
+    return _invalid(index, {
+        "non_field_errors": [
+            f"Conflicts with item {other} in this batch; "
+            "send these changes in separate batches."
+        ]
+    })
+
+
+def _created_ids(objects):
+    """
+    Primary keys of bulk-created devotees. Backends that don't return
+    ids from bulk_create (MySQL) get them from one identity lookup.
+    """
+    if all(obj.pk is not None for obj in objects):
+        return [obj.pk for obj in objects]
+
+    ids = lookup_identities(_object_identity(obj) for obj in objects)
+    return [ids.get(_object_identity(obj)) for obj in objects]
+
+
+# ============================================================
+# CREATE
+# ============================================================
+
+def create_devotees(items):
+
+    results = [None] * len(items)
+    pending = []
+
+    for index, item in enumerate(items):
+        data, errors = _validate(item)
+
+        if errors:
+            results[index] = {"index": index, "status": "invalid", "errors": errors}
+        else:
+            pending.append((index, data))
+
+    existing = lookup_identities(_identity(data) for _, data in pending)
+
+    seen = set()
+    new_devotees = []
+
+    for index, data in pending:
+        identity = _identity(data)
+
+        if identity in existing or identity in seen:
+            results[index] = {"index": index, "status": "duplicate", "errors": DUPLICATE_ERROR}
+            continue
+
+        seen.add(identity)
+        new_devotees.append((index, Devotee(**data)))
+
+    objects = Devotee.objects.bulk_create([obj for _, obj in new_devotees])
+    record_created(Devotee, [obj.nakshatra for obj in objects])
+
+    for (index, _), pk in zip(new_devotees, _created_ids(objects)):
+        results[index] = {"index": index, "status": "created", "id": pk}
+
+    return results
+
+
+# ============================================================
+# UPDATE
+# ============================================================
+
+def update_devotees(items):
+
+    results = [None] * len(items)
+
+    ids = [_to_id(item.get("id")) if isinstance(item, dict) else None for item in items]
+    instances = Devotee.objects.in_bulk([pk for pk in ids if pk is not None])
+
+    pending = []
+
+    # pk -> index of the item updating that devotee
+    item_for = {}
+
+    for index, (item, pk) in enumerate(zip(items, ids)):
+
+        if not isinstance(item, dict):
+            results[index] = _invalid(index, NOT_AN_OBJECT_ERROR)
+            continue
+
+        instance = instances.get(pk)
+
+        if instance is None:
+            results[index] = {"index": index, "status": "not_found"}
+            continue
+
+        if pk in item_for:
+            results[index] = _batch_conflict(index, item_for[pk])
+            continue
+
+        item_for[pk] = index
+
+        data, errors = _validate(item, instance=instance)
+
+        if errors:
+            results[index] = _invalid(index, errors)
+            continue
+
+        merged = {
+            field: data.get(field, getattr(instance, field))
+            for field in DEVOTEE_FIELDS
+        }
+        pending.append((index, instance, merged))
+
+    existing = lookup_identities(_identity(merged) for _, _, merged in pending)
+
+    # new identity -> index of the item that claimed it
+    claimed = {}
+    changed = []
+    deltas = {}
+    edited = []
+
+    for index, instance, merged in pending:
+        identity = _identity(merged)
+        owner = existing.get(identity)
+
+        # Another item moves to the same values
+        if identity in claimed:
+            results[index] = _batch_conflict(index, claimed[identity])
+            continue
+
+        # Values currently held by a row this batch also edits (a swap
+        # or chain): one UPDATE can't reorder the unique constraint
+        if owner is not None and owner != instance.pk and owner in item_for:
+            results[index] = _batch_conflict(index, item_for[owner])
+            continue
+
+        # Values of a row outside this batch
+        if owner is not None and owner != instance.pk:
+            results[index] = {"index": index, "status": "duplicate", "errors": DUPLICATE_ERROR}
+            continue
+
+        claimed[identity] = index
+
+        if instance.nakshatra != merged["nakshatra"]:
+            for key, delta in [
+                (counter_key(Devotee, instance.nakshatra), -1),
+                (counter_key(Devotee, merged["nakshatra"]), 1),
+            ]:
+                deltas[key] = deltas.get(key, 0) + delta
+        else:
+            edited.append(instance.nakshatra)
+
+        for field, value in merged.items():
+            setattr(instance, field, value)
+
+        changed.append(instance)
+        results[index] = {"index": index, "status": "updated", "id": instance.pk}
+
+    Devotee.objects.bulk_update(changed, DEVOTEE_FIELDS)
+    adjust_counts(deltas)
+    record_updated(Devotee, edited)
+
+    return results
+
+
+# ============================================================
+# CONVERT INVALID ENTRIES
+# ============================================================
+
+def convert_invalids(items):
+    """
+    Items are invalid-entry ids, or dicts with an "id" plus corrected
+    field values. Rows that now validate move to Devotee, or to
+    DuplicateEntry when the identity already exists; the rest stay.
+    """
+    # Bare ids; bool is an int but never an id
+    items = [
+        {"id": item} if isinstance(item, (int, str)) and not isinstance(item, bool) else item
+        for item in items
+    ]
+
+    results = [None] * len(items)
+
+    ids = [_to_id(item.get("id")) if isinstance(item, dict) else None for item in items]
+    invalids = InvalidEntry.objects.in_bulk([pk for pk in ids if pk is not None])
+
+    pending = []
+
+    # pk -> index of the item converting that entry
+    item_for = {}
+
+    for index, (item, pk) in enumerate(zip(items, ids)):
+
+        if not isinstance(item, dict):
+            results[index] = _invalid(index, NOT_AN_ID_ERROR)
+            continue
+
+        invalid = invalids.get(pk)
+
+        if invalid is None:
+            results[index] = {"index": index, "status": "not_found"}
+            continue
+
+        if pk in item_for:
+            results[index] = _batch_conflict(index, item_for[pk])
+            continue
+
+        item_for[pk] = index
+
+        data, errors = _validate({
+            field: item.get(field, getattr(invalid, field))
+            for field in DEVOTEE_FIELDS
+        })
+
+        if errors:
+            results[index] = {"index": index, "status": "invalid", "errors": errors}
+        else:
+            pending.append((index, invalid, data))
+
+    existing = lookup_identities(_identity(data) for _, _, data in pending)
+
+    seen = set()
+    new_devotees = []
+    new_duplicates = []
+
+    for index, invalid, data in pending:
+        identity = _identity(data)
+
+        # Converted rows stay part of the upload they came from
+        data["upload_batch_id"] = invalid.upload_batch_id
+
+        if identity in existing or identity in seen:
+            new_duplicates.append(DuplicateEntry(**data))
+            results[index] = {"index": index, "status": "duplicate"}
+            continue
+
+        seen.add(identity)
+        new_devotees.append((index, Devotee(**data)))
+
+    devotees = Devotee.objects.bulk_create([obj for _, obj in new_devotees])
+    DuplicateEntry.objects.bulk_create(new_duplicates)
+
+    for (index, _), pk in zip(new_devotees, _created_ids(devotees)):
+        results[index] = {"index": index, "status": "created", "id": pk}
+
+    converted = [invalid for _, invalid, _ in pending]
+    InvalidEntry.objects.filter(id__in=[invalid.pk for invalid in converted]).delete()
+
+    record_created(Devotee, [obj.nakshatra for obj in devotees])
+    record_created(DuplicateEntry, [obj.nakshatra for obj in new_duplicates])
+    record_deleted(InvalidEntry, [invalid.nakshatra for invalid in converted])
+
+    return results
@@ -0,0 +1,42 @@
+# ============================================================
+# CONDITIONAL GET HELPERS (ETAG / LAST-MODIFIED)
+# ============================================================
+#
+# List ETags are derived from the StatCounter version of the listed
+# table (per nakshatra when filtered) plus the full query string, so
+# they change whenever a write touches those rows or the request asks
+# for a different page. Shared by the DRF viewsets and the async views.
+
+import hashlib
+
+from django.utils.http import http_date, parse_etags, quote_etag
+
+
+def list_etag(model, version, full_path, renderer_format):
+    return quote_etag(hashlib.md5(
+        f"{model.__name__}:{version}:{full_path}:{renderer_format}".encode()
+    ).hexdigest())
+
+
+def is_not_modified(request, etag):
+    """True when the request's If-None-Match covers `etag`."""
+
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+
+    if not if_none_match:
+        return False
+
+    return etag in parse_etags(if_none_match) or if_none_match.strip() == "*"
+
+
+def set_validators(response, etag, last_modified):
+
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+
+    # Browsers keep the body and revalidate on every fetch
+    response["Cache-Control"] = "private, no-cache"
+    response["Vary"] = "Authorization"
+
+    return response
@@ -0,0 +1,422 @@
+# ============================================================
+# NEAR-DUPLICATE CLUSTERING
+# ============================================================
+#
+# The unique constraint only rejects exact (name, country_code, phone,
+# nakshatra) repeats. "RAMESH K" vs "RAMESH.K", or one phone saved with
+# and without its country code, get through. This job finds them:
+#
+#   1. Blocking   devotees are grouped by (nakshatra, normalized phone).
+#                 Each nakshatra is read on its own through the
+#                 nakshatra index, so memory is bounded by the largest
+#                 nakshatra rather than the whole table.
+#   2. Scoring    names are only compared inside a block. Blocks are a
+#                 family at most, so total work grows linearly with the
+#                 row count instead of O(n²).
+#   3. Clusters   pairs above the threshold are joined with union-find
+#                 and written to DuplicateCluster for review.
+#
+# Confirmed clusters are merged in bulk: one devotee is kept, the
+# others move to the duplicate table.
+
+import hashlib
+import re
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    Devotee,
+    DuplicateCluster,
+    DuplicateClusterMember,
+    DuplicateEntry,
+)
+from .stats import record_created, record_deleted
+
+
+# Minimum name similarity (0..1) for two devotees to be clustered
+NAME_THRESHOLD = getattr(settings, "DEDUPE_NAME_THRESHOLD", 0.85)
+
+# Blocks larger than this (shared office / placeholder phones) are
+# skipped rather than compared pairwise
+MAX_BLOCK_SIZE = getattr(settings, "DEDUPE_MAX_BLOCK_SIZE", 50)
+
+# Country codes are only stripped from numbers longer than this
+NATIONAL_NUMBER_LENGTH = 10
+
+MIN_PHONE_LENGTH = 7
+
+READ_CHUNK_SIZE = 5000
+
+NON_DIGITS = re.compile(r"\D")
+NON_LETTERS = re.compile(r"[^A-Z]+")
+
+
+# ============================================================
+# NORMALIZATION
+# ============================================================
+
+def phone_key(country_code, phone):
+    """
+    Blocking key for a phone: digits only, trunk zeros dropped and a
+    leading country code removed ('0919876543210' / '+91' ->
+    '9876543210').
+    """
+    digits = NON_DIGITS.sub("", phone or "").lstrip("0")
+    code = NON_DIGITS.sub("", country_code or "")
+
+    if (
+        code
+        and len(digits) > NATIONAL_NUMBER_LENGTH
+        and digits.startswith(code)
+        and len(digits) - len(code) >= MIN_PHONE_LENGTH
+    ):
+        digits = digits[len(code):]
+
+    return digits
+
+
+def name_tokens(name):
+    """'Ramesh.K ' -> ('RAMESH', 'K')"""
+    return tuple(NON_LETTERS.sub(" ", (name or "").upper()).split())
+
+
+# ============================================================
+# SCORING
+# ============================================================
+
+def _initials_match(a, b):
+    """Same tokens, except some are abbreviated to an initial."""
+
+    if len(a) != len(b) or a == b:
+        return False
+
+    return all(
+        x == y or (len(x) == 1 and y.startswith(x)) or (len(y) == 1 and x.startswith(y))
+        for x, y in zip(a, b)
+    )
+
+
+def name_similarity(a, b):
+    """Similarity of two token tuples from name_tokens(), 0..1."""
+
+    compact_a, compact_b = "".join(a), "".join(b)
+
+    if not compact_a or not compact_b:
+        return 0.0
+
+    # Spacing / punctuation only, or the same words in another order
+    if compact_a == compact_b or sorted(a) == sorted(b):
+        return 1.0
+
+    if _initials_match(a, b):
+        return 0.9
+
+    matcher = SequenceMatcher(None, compact_a, compact_b, autojunk=False)
+
+    # Cheap upper bound first; most pairs in a block are different people
+    if matcher.quick_ratio() < NAME_THRESHOLD:
+        return 0.0
+
+    return max(
+        matcher.ratio(),
+        SequenceMatcher(None, " ".join(sorted(a)), " ".join(sorted(b))).ratio(),
+    )
+
+
+def _clusters_in_block(rows):
+    """
+    rows: [(id, name_tokens)]. Returns [(member_ids, score)] for groups
+    of two or more rows joined by similar names (union-find).
+    """
+    parent = {pk: pk for pk, _ in rows}
+
+    def find(pk):
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    scores = {}
+
+    for i, (pk_a, tokens_a) in enumerate(rows):
+        for pk_b, tokens_b in rows[i + 1:]:
+            score = name_similarity(tokens_a, tokens_b)
+
+            if score < NAME_THRESHOLD:
+                continue
+
+            root_a, root_b = find(pk_a), find(pk_b)
+            low = min(score, scores.pop(root_a, 1.0), scores.pop(root_b, 1.0))
+
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+            scores[root_a] = low
+
+    groups = {}
+    for pk, _ in rows:
+        groups.setdefault(find(pk), []).append(pk)
+
+    return [
+        (sorted(members), round(scores[root], 3))
+        for root, members in groups.items()
+        if len(members) > 1
+    ]
+
+
+def signature(member_ids):
+    return hashlib.sha1(
+        ",".join(str(pk) for pk in sorted(member_ids)).encode()
+    ).hexdigest()
+
+
+# ============================================================
+# SCAN
+# ============================================================
+
+def find_clusters(nakshatra, summary):
+    """
+    [(phone_key, member_ids, score)] for one nakshatra. Scan counts are
+    added to `summary`.
+    """
+    blocks = {}
+
+    queryset = (
+        Devotee.objects.filter(nakshatra=nakshatra)
+        .order_by()
+        .values_list("id", "name", "country_code", "phone")
+    )
+
+    for pk, name, country_code, phone in queryset.iterator(chunk_size=READ_CHUNK_SIZE):
+        summary["rows_scanned"] += 1
+        key = phone_key(country_code, phone)
+
+        if key:
+            blocks.setdefault(key, []).append((pk, name_tokens(name)))
+
+    found = []
+
+    for key, rows in blocks.items():
+        if len(rows) < 2:
+            continue
+
+        if len(rows) > MAX_BLOCK_SIZE:
+            summary["blocks_skipped"] += 1
+            continue
+
+        summary["blocks_compared"] += 1
+
+        for member_ids, score in _clusters_in_block(rows):
+            found.append((key, member_ids, score))
+
+    return found
+
+
+def _write_clusters(scan, nakshatra, found):
+    """Insert one nakshatra's clusters and their members."""
+
+    clusters = DuplicateCluster.objects.bulk_create([
+        DuplicateCluster(
+            scan=scan,
+            nakshatra=nakshatra,
+            phone_key=key,
+            signature=signature(member_ids),
+            score=score,
+        )
+        for key, member_ids, score in found
+    ])
+
+    # MySQL doesn't return ids from bulk_create
+    if any(cluster.pk is None for cluster in clusters):
+        ids = dict(
+            DuplicateCluster.objects.filter(
+                scan=scan,
+                nakshatra=nakshatra,
+                status=DuplicateCluster.STATUS_PENDING,
+            ).values_list("signature", "id")
+        )
+        for cluster in clusters:
+            cluster.pk = ids[cluster.signature]
+
+    DuplicateClusterMember.objects.bulk_create(
+        [
+            DuplicateClusterMember(cluster_id=cluster.pk, devotee_id=pk)
+            for cluster, (_, member_ids, _) in zip(clusters, found)
+            for pk in member_ids
+        ],
+        batch_size=1000,
+    )
+
+
+def scan_for_duplicates(scan=None, on_progress=None):
+    """
+    Rebuild the pending review queue. Pending clusters from earlier
+    scans are replaced; merged and dismissed ones are kept, and a
+    dismissed group is not raised again.
+    """
+    summary = {
+        "rows_scanned": 0,
+        "blocks_compared": 0,
+        "blocks_skipped": 0,
+        "clusters_found": 0,
+    }
+
+    dismissed = set(
+        DuplicateCluster.objects.filter(
+            status=DuplicateCluster.STATUS_DISMISSED
+        ).values_list("signature", flat=True)
+    )
+
+    DuplicateCluster.objects.filter(
+        status=DuplicateCluster.STATUS_PENDING
+    ).delete()
+
+    for nakshatra, _ in Devotee.NAKSHATRA_CHOICES:
+        found = [
+            item for item in find_clusters(nakshatra, summary)
+            if signature(item[1]) not in dismissed
+        ]
+
+        if found:
+            with transaction.atomic():
+                _write_clusters(scan, nakshatra, found)
+
+        summary["clusters_found"] += len(found)
+
+        if on_progress:
+            on_progress(summary)
+
+    return summary
+
+
+# ============================================================
+# MERGE / DISMISS
+# ============================================================
+
+def merge_clusters(items):
+    """
+    Items are cluster ids, or {"id": ..., "keep": devotee_id}. The kept
+    devotee defaults to the earliest registration; every other member
+    moves to DuplicateEntry. Callers wrap the call in a transaction.
+
+    Returns one result per item, in order:
+      {"index": 0, "status": "merged", "kept": 12, "merged": 2}
+      {"index": 1, "status": "not_found"}
+      {"index": 2, "status": "invalid", "errors": {...}}
+    """
+    items = [item if isinstance(item, dict) else {"id": item} for item in items]
+
+    results = [None] * len(items)
+
+    ids = []
+    for item in items:
+        try:
+            ids.append(int(item.get("id")))
+        except (TypeError, ValueError):
+            ids.append(None)
+
+    clusters = (
+        DuplicateCluster.objects.select_for_update()
+        .filter(id__in=[pk for pk in ids if pk is not None])
+        .in_bulk()
+    )
+
+    members = {}
+    for member in DuplicateClusterMember.objects.filter(
+        cluster_id__in=list(clusters)
+    ).select_related("devotee"):
+        members.setdefault(member.cluster_id, []).append(member.devotee)
+
+    removed = set()
+    dropped = []
+    resolved = []
+    now = timezone.now()
+
+    for index, (item, pk) in enumerate(zip(items, ids)):
+        cluster = clusters.get(pk)
+
+        if cluster is None:
+            results[index] = {"index": index, "status": "not_found"}
+            continue
+
+        if cluster.status != DuplicateCluster.STATUS_PENDING:
+            results[index] = {
+                "index": index,
+                "status": "invalid",
+                "errors": {"status": f"Cluster is already {cluster.status}."},
+            }
+            continue
+
+        # Members merged away by an earlier item in this batch are gone
+        devotees = sorted(
+            (d for d in members.get(cluster.pk, []) if d.pk not in removed),
+            key=lambda d: (d.created_at, d.pk),
+        )
+
+        if len(devotees) < 2:
+            results[index] = {
+                "index": index,
+                "status": "invalid",
+                "errors": {"members": "Fewer than two members remain."},
+            }
+            continue
+
+        keep = item.get("keep", devotees[0].pk)
+        kept = next((d for d in devotees if str(d.pk) == str(keep)), None)
+
+        if kept is None:
+            results[index] = {
+                "index": index,
+                "status": "invalid",
+                "errors": {"keep": "Must be a member of the cluster."},
+            }
+            continue
+
+        others = [d for d in devotees if d.pk != kept.pk]
+
+        removed.update(d.pk for d in others)
+        dropped.extend(others)
+
+        cluster.status = DuplicateCluster.STATUS_MERGED
+        cluster.kept = kept
+        cluster.merged_count = len(others)
+        cluster.resolved_at = now
+        resolved.append(cluster)
+
+        results[index] = {
+            "index": index,
+            "status": "merged",
+            "kept": kept.pk,
+            "merged": len(others),
+        }
+
+    DuplicateCluster.objects.bulk_update(
+        resolved, ["status", "kept", "merged_count", "resolved_at"]
+    )
+
+    DuplicateEntry.objects.bulk_create([
+        DuplicateEntry(
+            name=d.name,
+            country_code=d.country_code,
+            phone=d.phone,
+            nakshatra=d.nakshatra,
+            upload_batch_id=d.upload_batch_id,
+        )
+        for d in dropped
+    ])
+
+    Devotee.objects.filter(id__in=[d.pk for d in dropped]).delete()
+
+    record_deleted(Devotee, [d.nakshatra for d in dropped])
+    record_created(DuplicateEntry, [d.nakshatra for d in dropped])
+
+    return results
+
+
+def dismiss_cluster(cluster):
+    cluster.status = DuplicateCluster.STATUS_DISMISSED
+    cluster.resolved_at = timezone.now()
+    cluster.save(update_fields=["status", "resolved_at"])
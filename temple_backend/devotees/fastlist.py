@@ -0,0 +1,164 @@
+# ============================================================
+# FAST READ-ONLY LIST PATH
+# ============================================================
+#
+# List pages skip ModelSerializer: rows come straight from
+# `.values()` dicts (no model instances) and only columns that need
+# formatting (created_at) are converted, with the time zone resolved
+# once per page instead of once per value. The payload is byte-for-byte
+# what the serializer + JSONRenderer would produce.
+#
+# FastJSONRenderer encodes with orjson (pinned in requirements.txt);
+# the import is still guarded, so an environment without it falls back
+# to DRF's stdlib encoder instead of failing.
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Fields whose value from `.values()` is already what
+# to_representation would return
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+)
+
+# Fields formatted through their DRF field, once per value
+FORMATTED_FIELDS = (
+    serializers.DateTimeField,
+    serializers.DateField,
+)
+
+
+def _datetime_formatter(field):
+    """
+    DateTimeField.to_representation for ISO 8601 output, with the
+    field's time zone looked up once. Other formats use the field.
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+
+    if (
+        output_format is None
+        or output_format.lower() != ISO_8601
+        or field_timezone is None
+    ):
+        return field.to_representation
+
+    def to_representation(value):
+        if isinstance(value, str) or value.tzinfo is None:
+            return field.to_representation(value)
+
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return to_representation
+
+
+# ============================================================
+# ROW BUILDING
+# ============================================================
+
+class ValuesPlan:
+    """
+    Which columns to fetch with `.values()` and how to turn each dict
+    into the serializer's output layout.
+    """
+
+    def __init__(self, fields, formatters):
+        self.fields = fields
+        self.formatters = formatters
+
+    def rows(self, values):
+        fields = self.fields
+        formatters = self.formatters
+
+        if not formatters:
+            return [{name: row[name] for name in fields} for row in values]
+
+        rows = []
+
+        for row in values:
+            item = {name: row[name] for name in fields}
+
+            for name, to_representation in formatters:
+                value = item[name]
+                if value is not None:
+                    item[name] = to_representation(value)
+
+            rows.append(item)
+
+        return rows
+
+
+def values_plan(serializer):
+    """
+    ValuesPlan for a ModelSerializer instance, or None when one of its
+    fields can't be served from `.values()` (method fields, nested or
+    renamed sources) and the regular serializer must be used.
+    """
+    fields = []
+    formatters = []
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+
+        if field.source != name:
+            return None
+
+        if isinstance(field, serializers.DateTimeField):
+            formatters.append((name, _datetime_formatter(field)))
+        elif isinstance(field, FORMATTED_FIELDS):
+            formatters.append((name, field.to_representation))
+        elif not isinstance(field, PASSTHROUGH_FIELDS):
+            return None
+
+        fields.append(name)
+
+    return ValuesPlan(fields, formatters)
+
+
+# ============================================================
+# RENDERER
+# ============================================================
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Same bytes as JSONRenderer for compact output, encoded by orjson.
+    Pretty-printed, non-compact, ASCII-only or exotic payloads use the
+    stock encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            # Lazy strings, Decimals, ... -> DRF's encoder knows them
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Match JSONRenderer's escaping of the JS line separators
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+        return ret
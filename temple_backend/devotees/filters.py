@@ -0,0 +1,126 @@
+# ============================================================
+# SERVER-SIDE SEARCH / FILTER PARAMETERS
+# ============================================================
+#
+# Supported query parameters (all optional):
+#
+#   ?nakshatra=ROHINI          nakshatra (any recognised spelling)
+#   ?name_prefix=RAM           name starts with (index on name / (name, phone))
+#   ?phone_prefix=98           phone starts with (index on phone)
+#   ?search=ram  | ?search=98  digits -> phone prefix, text -> name contains
+#   ?created_from=2026-01-01   created on or after this date
+#   ?created_to=2026-01-31     created on or before this date
+#   ?upload_batch=12           rows written by one bulk upload
+#
+# Names are stored uppercase and phones as digits, so prefix lookups
+# use case-sensitive `startswith`, which the B-tree indexes can serve.
+# Sorting (?ordering=) is handled by the cursor paginator.
+
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .normalization import exact_nakshatra
+
+
+def _parse_day(value, param):
+    day = parse_date(value)
+
+    if day is None:
+        raise ValidationError({param: "Use YYYY-MM-DD format."})
+
+    return day
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def nakshatra_param(params):
+    """
+    Canonical ?nakshatra= value (known spellings only), the raw value
+    uppercased, or ''.
+    """
+
+    nakshatra = params.get("nakshatra", "").strip()
+
+    if nakshatra:
+        nakshatra = exact_nakshatra(nakshatra) or nakshatra.upper()
+
+    return nakshatra
+
+
+# Everything filter_devotees reads (jobs store these to scope a run)
+FILTER_PARAMS = [
+    "nakshatra",
+    "name_prefix",
+    "phone_prefix",
+    "search",
+    "created_from",
+    "created_to",
+    "upload_batch",
+]
+
+
+def filter_params(params):
+    """The non-empty filter parameters of `params`, as a plain dict."""
+
+    return {
+        name: str(params[name]).strip()
+        for name in FILTER_PARAMS
+        if str(params.get(name) or "").strip()
+    }
+
+
+def filter_devotees(queryset, params):
+    """Apply the query parameters above to a Devotee-like queryset."""
+
+    nakshatra = nakshatra_param(params)
+    if nakshatra:
+        queryset = queryset.filter(nakshatra=nakshatra)
+
+    name_prefix = params.get("name_prefix", "").strip()
+    if name_prefix:
+        queryset = queryset.filter(name__startswith=name_prefix.upper())
+
+    phone_prefix = params.get("phone_prefix", "").strip()
+    if phone_prefix:
+        queryset = queryset.filter(phone__startswith=phone_prefix)
+
+    search = params.get("search", "").strip()
+    if search:
+        if search.isdigit():
+            queryset = queryset.filter(phone__startswith=search)
+        else:
+            queryset = queryset.filter(name__contains=search.upper())
+
+    # Half-open range on the raw column keeps the created_at
+    # indexes usable (no per-row date() conversion)
+    created_from = params.get("created_from", "").strip()
+    if created_from:
+        day = _parse_day(created_from, "created_from")
+        queryset = queryset.filter(created_at__gte=_start_of_day(day))
+
+    created_to = params.get("created_to", "").strip()
+    if created_to:
+        day = _parse_day(created_to, "created_to")
+        queryset = queryset.filter(
+            created_at__lt=_start_of_day(day + timedelta(days=1))
+        )
+
+    upload_batch = params.get("upload_batch", "").strip()
+    if upload_batch:
+        if not upload_batch.isdigit():
+            raise ValidationError({"upload_batch": "Must be an upload batch id."})
+        queryset = queryset.filter(upload_batch=int(upload_batch))
+
+    return queryset
+
+
+class DevoteeQueryFilter(BaseFilterBackend):
+
+    def filter_queryset(self, request, queryset, view):
+        return filter_devotees(queryset, request.query_params)
@@ -0,0 +1,129 @@
+# ============================================================
+# HEARTBEATS FOR IN-PROCESS BACKGROUND WORK
+# ============================================================
+#
+# Import jobs, cluster scans and reprocess jobs run in this process's
+# thread pools, so a worker restart (deploy, crash, host idling out)
+# drops them without a trace. To tell "still queued / running" from
+# "orphaned":
+#
+#   * every row being worked on here is tracked (track / untrack)
+#   * one daemon thread per process stamps heartbeat_at on all tracked
+#     rows every JOB_HEARTBEAT_SECONDS (one UPDATE per model)
+#   * a row still PENDING / RUNNING whose heartbeat is older than
+#     JOB_STALE_SECONDS has no live process behind it (is_stale)
+#
+# Recovery (marking those rows FAILED) is done by the callers when the
+# row is polled or before new work is queued; see jobs.fail_stale_jobs.
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = getattr(settings, "JOB_HEARTBEAT_SECONDS", 30)
+
+# Must be several heartbeats long, so one slow tick doesn't fail a job
+STALE_SECONDS = getattr(settings, "JOB_STALE_SECONDS", 300)
+
+_lock = threading.Lock()
+
+# model -> pks of rows this process is working on
+_tracked = {}
+
+# (pid, thread): a forked worker starts its own thread
+_beater = None
+
+
+def track(model, pk):
+    with _lock:
+        _tracked.setdefault(model, set()).add(pk)
+
+    _ensure_beater()
+
+
+def untrack(model, pk):
+    with _lock:
+        _tracked.get(model, set()).discard(pk)
+
+
+@contextmanager
+def beating(model, pk):
+    """Keep the row's heartbeat fresh while the block runs."""
+
+    track(model, pk)
+    try:
+        yield
+    finally:
+        untrack(model, pk)
+
+
+def stale_cutoff():
+    return timezone.now() - timedelta(seconds=STALE_SECONDS)
+
+
+def is_stale():
+    """
+    Filter for rows without a recent heartbeat (rows from before
+    heartbeats existed count from created_at).
+    """
+    cutoff = stale_cutoff()
+
+    return Q(heartbeat_at__lt=cutoff) | Q(
+        heartbeat_at__isnull=True, created_at__lt=cutoff
+    )
+
+
+# ============================================================
+# BEATER THREAD
+# ============================================================
+
+def _ensure_beater():
+    global _beater
+
+    with _lock:
+        if _beater is not None and _beater[0] == os.getpid():
+            return
+
+        thread = threading.Thread(
+            target=_beat_forever,
+            name="job-heartbeat",
+            daemon=True,
+        )
+        _beater = (os.getpid(), thread)
+
+    thread.start()
+
+
+def _beat_forever():
+
+    while True:
+        time.sleep(HEARTBEAT_SECONDS)
+
+        with _lock:
+            work = {model: set(pks) for model, pks in _tracked.items() if pks}
+
+        if not work:
+            continue
+
+        try:
+            now = timezone.now()
+
+            for model, pks in work.items():
+                model.objects.filter(pk__in=pks).update(heartbeat_at=now)
+
+        except Exception:
+            logger.exception("Heartbeat update failed")
+
+        finally:
+            connection.close()
@@ -0,0 +1,792 @@
+# ============================================================
+# BULK UPLOAD INGESTION ENGINE
+# ============================================================
+#
+# Set-based replacement for the old row-by-row upload loop:
+#   1. normalize every column with vectorized pandas ops
+#   2. classify rows as invalid / duplicate / valid in bulk
+#   3. write each class with bulk_create inside one transaction
+#
+# Existing identities are looked up once per batch of phones
+# instead of one `.exists()` query per row.
+#
+# Large files are streamed: CSV in fixed-size chunks, XLSX through
+# openpyxl's read-only row iterator. Every chunk is validated and
+# committed before the next one is read, so memory stays flat.
+#
+# pandas / openpyxl are imported inside the functions that use them,
+# so a worker boots (and answers the health check) without loading
+# them. Plain CSV uploads don't need pandas at all by default: with
+# BULK_UPLOAD_CSV_READER="csv" they go through the stdlib csv path at
+# the bottom of this file, which gives the same rows and counts.
+
+import csv
+import io
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Devotee, DuplicateEntry, InvalidEntry, UploadBatch
+from .normalization import normalize_nakshatra
+from .stats import record_created
+
+
+BATCH_SIZE = 1000
+
+# Rows per streamed chunk (one transaction per chunk)
+CHUNK_SIZE = getattr(settings, "BULK_UPLOAD_CHUNK_SIZE", 5000)
+
+# Files larger than this (bytes) are streamed chunk by chunk;
+# smaller files are still ingested in a single transaction.
+STREAMING_THRESHOLD = getattr(
+    settings, "BULK_UPLOAD_STREAMING_THRESHOLD", 5 * 1024 * 1024
+)
+
+# "csv" (stdlib, no pandas import) or "pandas"
+CSV_READER = getattr(settings, "BULK_UPLOAD_CSV_READER", "csv")
+
+# Keep IN (...) lists well below SQLite / MySQL parameter limits
+LOOKUP_BATCH_SIZE = 500
+
+REQUIRED_COLUMNS = {"name", "countrycode", "phone", "nakshatra"}
+
+IDENTITY_FIELDS = ["name", "countrycode", "phone", "nakshatra"]
+
+
+class UploadError(Exception):
+    """Raised when an uploaded file cannot be ingested (HTTP 400)."""
+
+
+# ============================================================
+# FILE READING
+# ============================================================
+#
+# Every read path drops blank rows with the same rule (is_blank_cell),
+# so a file gives the same rows, counts and skip_rows positions
+# whether it is read whole, streamed in chunks, or by the stdlib csv
+# path below.
+
+def is_blank_cell(value):
+    """Empty, whitespace-only or missing (None / NaN) cell."""
+
+    if value is None:
+        return True
+
+    if isinstance(value, float):
+        return value != value
+
+    return isinstance(value, str) and not value.strip()
+
+
+def drop_blank_rows(df):
+    blank = df.apply(lambda column: column.map(is_blank_cell)).all(axis=1)
+
+    return df[~blank] if blank.any() else df
+
+
+def read_upload(file):
+    import pandas as pd
+
+    if file.name.endswith(".csv"):
+        return pd.read_csv(file)
+
+    if file.name.endswith(".xlsx"):
+        return pd.read_excel(file, engine="openpyxl")
+
+    raise UploadError("Upload CSV or XLSX file only")
+
+
+def _iter_xlsx_chunks(file, chunk_size):
+    """
+    Yield DataFrames of at most `chunk_size` rows from the first sheet
+    using openpyxl's read-only mode (rows are parsed lazily).
+    """
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+
+        header = next(rows, None)
+
+        if header is None:
+            return
+
+        columns = ["" if cell is None else str(cell) for cell in header]
+
+        non_blank = (
+            row[:len(columns)] for row in rows
+            if not all(is_blank_cell(cell) for cell in row[:len(columns)])
+        )
+
+        while True:
+            chunk = list(islice(non_blank, chunk_size))
+
+            if not chunk:
+                return
+
+            yield pd.DataFrame(chunk, columns=columns)
+
+    finally:
+        workbook.close()
+
+
+def iter_upload_chunks(
+    file,
+    chunk_size=CHUNK_SIZE,
+    streaming_threshold=STREAMING_THRESHOLD,
+):
+    """
+    Yield the uploaded file as a sequence of DataFrames.
+
+    Files at or below `streaming_threshold` bytes are yielded as a
+    single frame; larger ones are streamed in `chunk_size` row chunks.
+    """
+    if file.size is not None and file.size <= streaming_threshold:
+        yield drop_blank_rows(read_upload(file))
+        return
+
+    if file.name.endswith(".csv"):
+        import pandas as pd
+
+        for df in pd.read_csv(file, chunksize=chunk_size):
+            yield drop_blank_rows(df)
+        return
+
+    if file.name.endswith(".xlsx"):
+        yield from _iter_xlsx_chunks(file, chunk_size)
+        return
+
+    raise UploadError("Upload CSV or XLSX file only")
+
+
+def count_rows(file):
+    """
+    Cheap data-row estimate used for progress reporting: newline count
+    for CSV, the sheet's declared dimensions for XLSX.
+    """
+    if file.name.endswith(".csv"):
+        lines = 0
+        last = b""
+
+        for block in file.chunks():
+            lines += block.count(b"\n")
+            last = block[-1:]
+
+        if last and last != b"\n":
+            lines += 1
+
+        file.seek(0)
+        return max(lines - 1, 0)
+
+    if file.name.endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file, read_only=True)
+
+        try:
+            total = max((workbook.active.max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+
+        file.seek(0)
+        return total
+
+    raise UploadError("Upload CSV or XLSX file only")
+
+
+# ============================================================
+# COLUMN NORMALIZATION
+# ============================================================
+
+def canonical_column(col):
+    """Upload header -> one of REQUIRED_COLUMNS (or the cleaned header)."""
+
+    col = str(col).strip().lower().replace(" ", "")
+
+    if col in ["name"]:
+        return "name"
+    elif col in ["countrycode", "country_code"]:
+        return "countrycode"
+    elif col in ["phone", "phoneno", "phonenumber"]:
+        return "phone"
+    elif col in ["nakshatra"]:
+        return "nakshatra"
+
+    return col
+
+
+def normalize_columns(df):
+
+    df = df.rename(columns={col: canonical_column(col) for col in df.columns})
+
+    if not REQUIRED_COLUMNS.issubset(set(df.columns)):
+        raise UploadError(f"Missing required columns: {REQUIRED_COLUMNS}")
+
+    return df
+
+
+# ============================================================
+# VALUE NORMALIZATION (VECTORIZED)
+# ============================================================
+
+def _clean_text(series):
+    return series.fillna("").astype(str).str.strip()
+
+
+def _clean_number(series):
+    """
+    Numeric cells come back from pandas as floats (9876543210.0),
+    so integral values are rendered without the decimal part.
+    Anything non-numeric is kept as stripped text.
+    """
+    import pandas as pd
+
+    text = _clean_text(series)
+    numeric = pd.to_numeric(text.where(text != ""), errors="coerce")
+
+    integral = (
+        numeric.notna()
+        & (numeric == numeric.round())
+        & (numeric.abs() < 1e15)
+    )
+
+    text = text.astype(object)
+    text[integral] = numeric[integral].astype("int64").astype(str)
+
+    return text
+
+
+def normalize_rows(df):
+    import pandas as pd
+
+    rows = pd.DataFrame(index=df.index)
+
+    rows["name"] = _clean_text(df["name"]).str.upper()
+    rows["countrycode"] = _clean_number(df["countrycode"])
+    rows["phone"] = _clean_number(df["phone"])
+
+    # Each distinct spelling is normalized once, then mapped back
+    raw_nakshatra = _clean_text(df["nakshatra"])
+    canonical = raw_nakshatra.map({
+        value: normalize_nakshatra(value)
+        for value in raw_nakshatra.unique()
+    })
+
+    rows["nakshatra"] = canonical.fillna(raw_nakshatra.str.upper())
+
+    missing = (rows[IDENTITY_FIELDS] == "").any(axis=1)
+    unknown = ~missing & canonical.isna()
+
+    rows["reason"] = ""
+    rows.loc[missing, "reason"] = "Missing required fields"
+    rows.loc[unknown, "reason"] = "Invalid Nakshatra"
+
+    return rows
+
+
+# ============================================================
+# CLASSIFICATION
+# ============================================================
+
+def lookup_identities(identities, lock=False):
+    """
+    Map each (name, country_code, phone, nakshatra) tuple in
+    `identities` that already exists in Devotee to its id.
+
+    Candidates are fetched by phone in batches, so the lookup costs one
+    query per LOOKUP_BATCH_SIZE distinct phones. With lock=True the
+    rows are read with SELECT ... FOR UPDATE, which also sees rows
+    other transactions committed after this one started.
+    """
+    identities = set(identities)
+
+    phones = sorted({identity[2] for identity in identities})
+    nakshatras = sorted({identity[3] for identity in identities})
+
+    devotees = Devotee.objects.select_for_update() if lock else Devotee.objects
+
+    found = {}
+
+    for start in range(0, len(phones), LOOKUP_BATCH_SIZE):
+        rows = devotees.filter(
+            phone__in=phones[start:start + LOOKUP_BATCH_SIZE],
+            nakshatra__in=nakshatras,
+        ).values_list("id", "name", "country_code", "phone", "nakshatra")
+
+        for pk, *identity in rows:
+            if tuple(identity) in identities:
+                found[tuple(identity)] = pk
+
+    return found
+
+
+def classify_rows(rows):
+    """
+    Split normalized rows into (valid, duplicates, invalid) frames.
+
+    A row is a duplicate when its identity already exists in Devotee
+    or appeared earlier in the same file.
+    """
+    import pandas as pd
+
+    invalid = rows[rows["reason"] != ""]
+    candidates = rows[rows["reason"] == ""]
+
+    if candidates.empty:
+        return candidates, candidates, invalid
+
+    identities = pd.Series(
+        list(zip(*(candidates[field] for field in IDENTITY_FIELDS))),
+        index=candidates.index,
+    )
+
+    in_database = identities.isin(set(lookup_identities(identities)))
+    repeated_in_file = identities.duplicated(keep="first")
+
+    is_duplicate = in_database | repeated_in_file
+
+    return candidates[~is_duplicate], candidates[is_duplicate], invalid
+
+
+# ============================================================
+# WRITING
+# ============================================================
+
+def _records(rows):
+    return zip(
+        rows["name"],
+        rows["countrycode"],
+        rows["phone"],
+        rows["nakshatra"],
+    )
+
+
+def _batch_ids(rows, upload_batch):
+    """
+    Upload batch id of each row: `upload_batch`, unless the frame has
+    an "upload_batch_id" column (reprocessed rows keep the upload they
+    came from, so rolling that upload back still removes them).
+    """
+    if "upload_batch_id" in getattr(rows, "columns", ()):
+        import pandas as pd
+
+        return [None if pd.isna(pk) else int(pk) for pk in rows["upload_batch_id"]]
+
+    return [upload_batch.pk if upload_batch is not None else None] * len(rows)
+
+
+def _split(rows, identities):
+    """(rows whose identity is not in `identities`, rows whose is)."""
+
+    hits = [identity in identities for identity in _records(rows)]
+
+    if isinstance(rows, Rows):
+        return (
+            Rows(row for row, hit in zip(rows, hits) if not hit),
+            Rows(row for row, hit in zip(rows, hits) if hit),
+        )
+
+    import pandas as pd
+
+    mask = pd.Series(hits, index=rows.index, dtype=bool)
+    return rows[~mask], rows[mask]
+
+
+def _concat(rows, more):
+    if not len(more):
+        return rows
+
+    if isinstance(rows, Rows):
+        return Rows(rows + more)
+
+    import pandas as pd
+
+    return pd.concat([rows, more])
+
+
+def _insert_devotees(valid, batch_size, upload_batch):
+    """
+    bulk_create `valid` as Devotee rows. Another upload can commit the
+    same identity between classification and this insert; those rows
+    are looked up again and returned as duplicates: (inserted, moved).
+    """
+    moved = valid[:0] if not isinstance(valid, Rows) else Rows()
+
+    while True:
+        try:
+            # Savepoint: a failed insert leaves the chunk's transaction usable
+            with transaction.atomic():
+                Devotee.objects.bulk_create(
+                    [
+                        Devotee(
+                            name=name,
+                            country_code=country_code,
+                            phone=phone,
+                            nakshatra=nakshatra,
+                            upload_batch_id=batch_id,
+                        )
+                        for (name, country_code, phone, nakshatra), batch_id in zip(
+                            _records(valid), _batch_ids(valid, upload_batch)
+                        )
+                    ],
+                    batch_size=batch_size,
+                )
+
+            return valid, moved
+
+        except IntegrityError:
+            taken = set(lookup_identities(_records(valid), lock=True))
+
+            # Not a lost race: some other constraint failed
+            if not taken:
+                raise
+
+            valid, lost = _split(valid, taken)
+            moved = _concat(moved, lost)
+
+
+def write_rows(valid, duplicates, invalid, batch_size=BATCH_SIZE, upload_batch=None):
+    """
+    Insert the classified rows, tagged with `upload_batch` when given
+    (or their own "upload_batch_id" column), and update the counters
+    (and the batch's counts) in the same transaction.
+
+    Returns the counts written: {"created", "duplicates", "invalid"}.
+    Valid rows that were registered meanwhile count as duplicates.
+    """
+    with transaction.atomic():
+
+        # Updated first: locks the batch row against a concurrent
+        # rollback, and refuses chunks after one
+        if upload_batch is not None:
+            active = UploadBatch.objects.filter(
+                pk=upload_batch.pk,
+                status=UploadBatch.STATUS_ACTIVE,
+            ).update(
+                created_count=F("created_count") + len(valid),
+                duplicate_count=F("duplicate_count") + len(duplicates),
+                invalid_count=F("invalid_count") + len(invalid),
+                rows_committed=F("rows_committed")
+                + len(valid) + len(duplicates) + len(invalid),
+            )
+
+            if not active:
+                raise UploadError("Upload batch was rolled back")
+
+        valid, moved = _insert_devotees(valid, batch_size, upload_batch)
+
+        if len(moved):
+            duplicates = _concat(duplicates, moved)
+
+            if upload_batch is not None:
+                UploadBatch.objects.filter(pk=upload_batch.pk).update(
+                    created_count=F("created_count") - len(moved),
+                    duplicate_count=F("duplicate_count") + len(moved),
+                )
+
+        DuplicateEntry.objects.bulk_create(
+            [
+                DuplicateEntry(
+                    name=name,
+                    country_code=country_code,
+                    phone=phone,
+                    nakshatra=nakshatra,
+                    upload_batch_id=batch_id,
+                )
+                for (name, country_code, phone, nakshatra), batch_id in zip(
+                    _records(duplicates), _batch_ids(duplicates, upload_batch)
+                )
+            ],
+            batch_size=batch_size,
+        )
+
+        InvalidEntry.objects.bulk_create(
+            [
+                InvalidEntry(
+                    name=name,
+                    country_code=country_code,
+                    phone=phone,
+                    nakshatra=nakshatra,
+                    reason=reason,
+                    upload_batch_id=batch_id,
+                )
+                for (name, country_code, phone, nakshatra), reason, batch_id in zip(
+                    _records(invalid), invalid["reason"], _batch_ids(invalid, upload_batch)
+                )
+            ],
+            batch_size=batch_size,
+        )
+
+        record_created(Devotee, valid["nakshatra"])
+        record_created(DuplicateEntry, duplicates["nakshatra"])
+        record_created(InvalidEntry, invalid["nakshatra"])
+
+    return {
+        "created": len(valid),
+        "duplicates": len(duplicates),
+        "invalid": len(invalid),
+    }
+
+
+# ============================================================
+# PLAIN CSV PATH (STDLIB, NO PANDAS)
+# ============================================================
+#
+# Same rules as normalize_rows / classify_rows, applied row by row to
+# csv.reader output. Cells pandas' read_csv would read as missing
+# (blank, "NA", "null", ...) are blank here too, and numeric cells are
+# rendered the way _clean_number renders them. (Non-integral numbers
+# keep their text as typed: "1e20", where pandas can give "1e+20".)
+
+# pandas.read_csv's default na_values
+CSV_NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+}
+
+ROW_FIELDS = IDENTITY_FIELDS + ["reason"]
+
+
+class Rows(list):
+    """
+    Normalized row tuples (ROW_FIELDS order). rows["phone"] returns a
+    column, like the DataFrames write_rows is also given.
+    """
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            index = ROW_FIELDS.index(key)
+            return [row[index] for row in self]
+
+        return super().__getitem__(key)
+
+
+def _plain_text(value):
+    return "" if value is None or value in CSV_NA_VALUES else value.strip()
+
+
+def _plain_number(value):
+    text = _plain_text(value)
+
+    # float() also takes "1_000" and non-ASCII digits; pandas doesn't
+    if not text.isascii() or "_" in text:
+        return text
+
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+
+    if number.is_integer() and abs(number) < 1e15:
+        return str(int(number))
+
+    return text
+
+
+def normalize_record(record, positions, nakshatras):
+    """
+    One csv.reader row -> (name, countrycode, phone, nakshatra, reason).
+    `nakshatras` caches normalize_nakshatra per distinct spelling.
+    """
+    cells = [
+        record[index] if index < len(record) else ""
+        for index in positions
+    ]
+
+    name = _plain_text(cells[0]).upper()
+    country_code = _plain_number(cells[1])
+    phone = _plain_number(cells[2])
+    raw_nakshatra = _plain_text(cells[3])
+
+    if raw_nakshatra not in nakshatras:
+        nakshatras[raw_nakshatra] = normalize_nakshatra(raw_nakshatra)
+
+    canonical = nakshatras[raw_nakshatra]
+    nakshatra = canonical or raw_nakshatra.upper()
+
+    if not (name and country_code and phone and nakshatra):
+        reason = "Missing required fields"
+    elif canonical is None:
+        reason = "Invalid Nakshatra"
+    else:
+        reason = ""
+
+    return (name, country_code, phone, nakshatra, reason)
+
+
+def iter_csv_rows(file, chunk_size=None, skip_rows=0):
+    """
+    Yield Rows of at most `chunk_size` normalized data rows (all of
+    them in one chunk when None), after skipping `skip_rows`.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+    try:
+        # Blank rows (cells missing / whitespace) are skipped, as on
+        # the pandas paths; NA markers count as missing there too
+        records = (
+            record for record in csv.reader(text)
+            if not all(_plain_text(cell) == "" for cell in record)
+        )
+
+        header = [canonical_column(col) for col in next(records, [])]
+
+        if not REQUIRED_COLUMNS.issubset(set(header)):
+            raise UploadError(f"Missing required columns: {REQUIRED_COLUMNS}")
+
+        positions = [header.index(field) for field in IDENTITY_FIELDS]
+        nakshatras = {}
+
+        records = islice(records, skip_rows, None)
+
+        while True:
+            chunk = Rows(
+                normalize_record(record, positions, nakshatras)
+                for record in islice(records, chunk_size)
+            )
+
+            if not chunk:
+                return
+
+            yield chunk
+
+    finally:
+        # Leave the upload itself open (the caller owns it). A generator
+        # collected after the upload was closed has nothing to detach.
+        if not text.closed:
+            text.detach()
+
+
+def classify_records(rows):
+    """classify_rows for Rows: (valid, duplicates, invalid)."""
+
+    invalid = Rows(row for row in rows if row[4])
+    candidates = [row for row in rows if not row[4]]
+
+    in_database = set(lookup_identities(row[:4] for row in candidates))
+
+    valid, duplicates = Rows(), Rows()
+    seen = set()
+
+    for row in candidates:
+        identity = row[:4]
+
+        if identity in in_database or identity in seen:
+            duplicates.append(row)
+        else:
+            valid.append(row)
+            seen.add(identity)
+
+    return valid, duplicates, invalid
+
+
+def ingest_rows(rows, batch_size=BATCH_SIZE, upload_batch=None):
+    """ingest_frame for Rows from iter_csv_rows."""
+
+    valid, duplicates, invalid = classify_records(rows)
+
+    return write_rows(
+        valid,
+        duplicates,
+        invalid,
+        batch_size=batch_size,
+        upload_batch=upload_batch,
+    )
+
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def ingest_frame(df, batch_size=BATCH_SIZE, upload_batch=None):
+    """
+    Ingest an uploaded DataFrame and return the upload summary
+    counts: {"created", "duplicates", "invalid"}.
+    """
+    rows = normalize_rows(normalize_columns(df))
+
+    valid, duplicates, invalid = classify_rows(rows)
+
+    return write_rows(
+        valid,
+        duplicates,
+        invalid,
+        batch_size=batch_size,
+        upload_batch=upload_batch,
+    )
+
+
+def _skip_rows(chunks, skip):
+    """Drop the first `skip` data rows from a stream of DataFrames."""
+
+    for df in chunks:
+        if skip >= len(df):
+            skip -= len(df)
+            continue
+
+        if skip:
+            df = df.iloc[skip:]
+            skip = 0
+
+        yield df
+
+
+def ingest_file(
+    file,
+    chunk_size=CHUNK_SIZE,
+    batch_size=BATCH_SIZE,
+    streaming_threshold=STREAMING_THRESHOLD,
+    on_chunk=None,
+    upload_batch=None,
+    skip_rows=0,
+):
+    """
+    Ingest an uploaded file chunk by chunk and return the combined
+    summary counts. Rows repeated across chunks are still detected,
+    since earlier chunks are already committed to Devotee.
+
+    `on_chunk(summary)` is called with the running totals after each
+    committed chunk. Rows are tagged with `upload_batch` when given.
+
+    `skip_rows` data rows (committed by an earlier, failed attempt) are
+    read but not ingested again.
+    """
+    summary = {"created": 0, "duplicates": 0, "invalid": 0}
+
+    if CSV_READER == "csv" and file.name.endswith(".csv"):
+        small = file.size is not None and file.size <= streaming_threshold
+
+        ingest_chunk = ingest_rows
+        chunks = iter_csv_rows(
+            file,
+            chunk_size=None if small else chunk_size,
+            skip_rows=skip_rows,
+        )
+
+    else:
+        ingest_chunk = ingest_frame
+        chunks = iter_upload_chunks(
+            file,
+            chunk_size=chunk_size,
+            streaming_threshold=streaming_threshold,
+        )
+
+        if skip_rows:
+            chunks = _skip_rows(chunks, skip_rows)
+
+    for chunk in chunks:
+        for key, value in ingest_chunk(
+            chunk, batch_size=batch_size, upload_batch=upload_batch
+        ).items():
+            summary[key] += value
+
+        if on_chunk:
+            on_chunk(dict(summary))
+
+    return summary
@@ -0,0 +1,423 @@
+# ============================================================
+# BACKGROUND IMPORT JOBS
+# ============================================================
+#
+# Uploads are saved to disk, recorded as an ImportJob and handed to
+# a local thread pool, so the HTTP request returns immediately.
+# Reprocessing the invalid table (ReprocessJob) runs on the same pool.
+# Near-duplicate cluster scans run on their own single-thread pool, so
+# a long scan never holds up users' imports.
+# No external broker is needed: the pool lives inside each
+# gunicorn / runserver process.
+#
+# Queued and running work keeps a heartbeat (heartbeats.py). Jobs and
+# scans whose process died are marked FAILED by fail_stale_jobs, which
+# runs when they are polled and before new work is queued.
+
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .dedupe import scan_for_duplicates
+from .heartbeats import is_stale, track, untrack
+from .ingestion import count_rows, ingest_file
+from .models import ClusterScan, ImportJob, ReprocessJob, UploadBatch
+from .reprocess import reprocess_invalids
+from .uploads import (
+    begin_upload,
+    complete_upload,
+    content_hash,
+    release_upload,
+    upload_summary,
+)
+
+
+IMPORT_WORKERS = getattr(settings, "IMPORT_WORKERS", 2)
+
+IMPORT_UPLOAD_DIR = getattr(
+    settings,
+    "IMPORT_UPLOAD_DIR",
+    os.path.join(tempfile.gettempdir(), "temple_imports"),
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=IMPORT_WORKERS,
+    thread_name_prefix="import-job",
+)
+
+# Only one scan runs at a time anyway (the scan view refuses a second)
+_scan_executor = ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix="cluster-scan",
+)
+
+ACTIVE_STATUSES = [ImportJob.STATUS_PENDING, ImportJob.STATUS_RUNNING]
+
+ORPHANED_ERROR = "The server restarted before this finished. Please try again."
+
+
+def _submit(executor, task, model, pk):
+    """Queue task(pk) on `executor`; the row heartbeats until it ends."""
+
+    track(model, pk)
+    executor.submit(task, pk)
+
+
+# ============================================================
+# FAILURE / ORPHAN RECOVERY
+# ============================================================
+
+def _remove_upload(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def fail_import_job(job, error):
+    """Mark a queued / running job FAILED and delete its stored file."""
+
+    failed = ImportJob.objects.filter(
+        pk=job.pk,
+        status__in=ACTIVE_STATUSES,
+    ).update(
+        status=ImportJob.STATUS_FAILED,
+        error=error,
+        finished_at=timezone.now(),
+    )
+
+    if failed:
+        _remove_upload(job.file_path)
+
+    return failed
+
+
+def _fail_stale(model):
+    return model.objects.filter(
+        is_stale(),
+        status__in=[model.STATUS_PENDING, model.STATUS_RUNNING],
+    ).update(
+        status=model.STATUS_FAILED,
+        error=ORPHANED_ERROR,
+        finished_at=timezone.now(),
+    )
+
+
+def fail_stale_jobs():
+    """
+    Mark import jobs, cluster scans and reprocess jobs without a live
+    process behind them FAILED. Returns (jobs, scans, reprocesses)
+    failed.
+    """
+    jobs = 0
+
+    for job in ImportJob.objects.filter(is_stale(), status__in=ACTIVE_STATUSES):
+        jobs += fail_import_job(job, ORPHANED_ERROR)
+
+    return jobs, _fail_stale(ClusterScan), _fail_stale(ReprocessJob)
+
+
+# ============================================================
+# JOB CREATION
+# ============================================================
+
+def _store_upload(file):
+    os.makedirs(IMPORT_UPLOAD_DIR, exist_ok=True)
+
+    extension = os.path.splitext(file.name)[1].lower()
+    path = os.path.join(IMPORT_UPLOAD_DIR, f"{uuid.uuid4().hex}{extension}")
+
+    with open(path, "wb") as destination:
+        for block in file.chunks():
+            destination.write(block)
+
+    return path
+
+
+def create_import_job(file, user=None, force=False):
+    """
+    Persist the uploaded file, create its ImportJob and schedule it
+    on the worker pool once the surrounding transaction commits.
+
+    A file that was already fully ingested is not stored or run again:
+    the job is returned COMPLETED with the original batch's counts.
+    """
+    created_by = user if user and user.is_authenticated else None
+
+    # An orphaned job of the same file must not block it
+    fail_stale_jobs()
+
+    batch, already_ingested = begin_upload(
+        file.name, file.size, content_hash(file), user=user, force=force
+    )
+
+    if already_ingested:
+        now = timezone.now()
+
+        return ImportJob.objects.create(
+            file_name=file.name,
+            file_size=file.size or 0,
+            status=ImportJob.STATUS_COMPLETED,
+            already_ingested=True,
+            total_rows=batch.rows_committed,
+            rows_processed=batch.rows_committed,
+            created_count=batch.created_count,
+            duplicate_count=batch.duplicate_count,
+            invalid_count=batch.invalid_count,
+            upload_batch=batch,
+            created_by=created_by,
+            started_at=now,
+            finished_at=now,
+        )
+
+    try:
+        total_rows = count_rows(file)
+
+        job = ImportJob.objects.create(
+            file_name=file.name,
+            file_path=_store_upload(file),
+            file_size=file.size or 0,
+            total_rows=total_rows,
+            upload_batch=batch,
+            created_by=created_by,
+            heartbeat_at=timezone.now(),
+        )
+
+    except Exception:
+        release_upload(batch)
+        raise
+
+    def queue():
+        # The job holds the batch's lease until it finishes
+        track(UploadBatch, batch.pk)
+        _submit(_executor, run_import_job, ImportJob, job.pk)
+
+    transaction.on_commit(queue)
+
+    return job
+
+
+# ============================================================
+# WORKER
+# ============================================================
+
+def run_import_job(job_id):
+
+    close_old_connections()
+
+    batch_id = ImportJob.objects.filter(pk=job_id).values_list(
+        "upload_batch_id", flat=True
+    ).first()
+
+    try:
+        # Only a still-queued job is started (not one failed meanwhile)
+        claimed = ImportJob.objects.filter(
+            pk=job_id,
+            status=ImportJob.STATUS_PENDING,
+        ).update(
+            status=ImportJob.STATUS_RUNNING,
+            started_at=timezone.now(),
+        )
+
+        if not claimed:
+            return
+
+        job = ImportJob.objects.get(pk=job_id)
+
+        # Rows committed by an earlier, failed import of the same file
+        batch = job.upload_batch
+        skip_rows = batch.rows_committed if batch else 0
+
+        ImportJob.objects.filter(pk=job_id).update(
+            resumed_after_rows=skip_rows,
+            rows_processed=skip_rows,
+        )
+
+        # Counts cover the whole file, like the batch's: what earlier
+        # attempts committed plus this run
+        base = upload_summary(batch) if batch else {
+            "created": 0, "duplicates": 0, "invalid": 0,
+        }
+
+        def totals(summary):
+            return {
+                "rows_processed": skip_rows + sum(summary.values()),
+                "created_count": base["created"] + summary["created"],
+                "duplicate_count": base["duplicates"] + summary["duplicates"],
+                "invalid_count": base["invalid"] + summary["invalid"],
+            }
+
+        def report(summary):
+            ImportJob.objects.filter(pk=job_id).update(**totals(summary))
+
+        try:
+            with open(job.file_path, "rb") as handle:
+                summary = ingest_file(
+                    File(handle, name=job.file_name),
+                    streaming_threshold=0,
+                    on_chunk=report,
+                    upload_batch=batch,
+                    skip_rows=skip_rows,
+                )
+
+        except Exception as e:
+            fail_import_job(job, str(e))
+
+            # The file can be uploaded again and resume from here
+            if batch is not None:
+                release_upload(batch)
+            return
+
+        if batch is not None:
+            complete_upload(batch)
+
+        ImportJob.objects.filter(pk=job_id).update(
+            status=ImportJob.STATUS_COMPLETED,
+            finished_at=timezone.now(),
+            **totals(summary),
+        )
+
+        _remove_upload(job.file_path)
+
+    finally:
+        untrack(ImportJob, job_id)
+        untrack(UploadBatch, batch_id)
+
+        # Pool threads are long-lived; don't leave their connection open
+        connection.close()
+
+
+# ============================================================
+# NEAR-DUPLICATE CLUSTER SCANS
+# ============================================================
+
+def create_cluster_scan(user=None):
+    """Record a ClusterScan and schedule it on the scan pool."""
+
+    scan = ClusterScan.objects.create(
+        created_by=user if user and user.is_authenticated else None,
+        heartbeat_at=timezone.now(),
+    )
+
+    transaction.on_commit(lambda: _submit(_scan_executor, run_cluster_scan, ClusterScan, scan.pk))
+
+    return scan
+
+
+def run_cluster_scan(scan_id):
+
+    close_old_connections()
+
+    try:
+        claimed = ClusterScan.objects.filter(
+            pk=scan_id,
+            status=ClusterScan.STATUS_PENDING,
+        ).update(
+            status=ClusterScan.STATUS_RUNNING,
+            started_at=timezone.now(),
+        )
+
+        if not claimed:
+            return
+
+        scan = ClusterScan.objects.get(pk=scan_id)
+
+        def report(summary):
+            ClusterScan.objects.filter(pk=scan_id).update(**summary)
+
+        try:
+            summary = scan_for_duplicates(scan=scan, on_progress=report)
+
+        except Exception as e:
+            ClusterScan.objects.filter(pk=scan_id).update(
+                status=ClusterScan.STATUS_FAILED,
+                error=str(e),
+                finished_at=timezone.now(),
+            )
+            return
+
+        ClusterScan.objects.filter(pk=scan_id).update(
+            status=ClusterScan.STATUS_COMPLETED,
+            finished_at=timezone.now(),
+            **summary,
+        )
+
+    finally:
+        untrack(ClusterScan, scan_id)
+        connection.close()
+
+
+# ============================================================
+# REPROCESSING INVALID ENTRIES
+# ============================================================
+
+def create_reprocess_job(user=None, filters=None):
+    """
+    Record a ReprocessJob (limited to the list `filters`, if any) and
+    schedule it on the worker pool.
+    """
+    job = ReprocessJob.objects.create(
+        filters=filters or {},
+        created_by=user if user and user.is_authenticated else None,
+        heartbeat_at=timezone.now(),
+    )
+
+    transaction.on_commit(lambda: _submit(_executor, run_reprocess_job, ReprocessJob, job.pk))
+
+    return job
+
+
+def run_reprocess_job(job_id):
+
+    close_old_connections()
+
+    try:
+        claimed = ReprocessJob.objects.filter(
+            pk=job_id,
+            status=ReprocessJob.STATUS_PENDING,
+        ).update(
+            status=ReprocessJob.STATUS_RUNNING,
+            started_at=timezone.now(),
+        )
+
+        if not claimed:
+            return
+
+        filters = ReprocessJob.objects.get(pk=job_id).filters
+
+        def report(summary):
+            ReprocessJob.objects.filter(pk=job_id).update(**summary)
+
+        def fail(error):
+            ReprocessJob.objects.filter(pk=job_id).update(
+                status=ReprocessJob.STATUS_FAILED,
+                error=error,
+                finished_at=timezone.now(),
+            )
+
+        # Chunks moved before a failure stay moved; a new run picks up
+        # the rest
+        try:
+            summary = reprocess_invalids(on_progress=report, filters=filters)
+
+        except IntegrityError:
+            fail("Reprocess conflicts with a concurrent change, please retry")
+            return
+
+        except Exception as e:
+            fail(str(e))
+            return
+
+        ReprocessJob.objects.filter(pk=job_id).update(
+            status=ReprocessJob.STATUS_COMPLETED,
+            finished_at=timezone.now(),
+            **summary,
+        )
+
+    finally:
+        untrack(ReprocessJob, job_id)
+        connection.close()
@@ -0,0 +1,323 @@
+# ============================================================
+# HTTP LOAD TEST (FESTIVAL-DAY COUNTER TRAFFIC)
+# ============================================================
+#
+# Virtual users hit the real HTTP stack (CORS, WhiteNoise, JWT auth,
+# DRF views) over plain HTTP, each one logging in through api/token/
+# and then picking scenarios from a weighted mix until the run ends.
+#
+# Per scenario the run reports throughput and p50 / p95 / p99 latency;
+# check_budget() compares a report with a JSON budget file:
+#
+#   {
+#     "overall":   {"p95_ms": 500, "error_rate": 0.01, "min_rps": 50},
+#     "scenarios": {"list": {"p99_ms": 300}, "upload": {"p95_ms": 4000}}
+#   }
+#
+# Only the standard library is used on the client side, so the
+# harness adds no dependencies.
+
+import csv
+import io
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from .models import Devotee
+from .synthetic import MALE_NAMES, FEMALE_NAMES, UPLOAD_HEADER, generate_rows
+
+
+NAKSHATRAS = [choice[0] for choice in Devotee.NAKSHATRA_CHOICES]
+
+DEFAULT_MIX = {
+    "list": 35,
+    "list_nakshatra": 20,
+    "search": 20,
+    "create": 15,
+    "stats": 8,
+    "upload": 2,
+}
+
+BUDGET_METRICS = ("p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+
+def parse_mix(value):
+    """'list:50,search:30,create:20' -> {"list": 50, ...}"""
+
+    mix = {}
+
+    for part in value.split(","):
+        name, _, weight = part.partition(":")
+        name = name.strip()
+
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+
+        mix[name] = float(weight or 1)
+
+    return mix
+
+
+# ============================================================
+# HTTP CLIENT
+# ============================================================
+
+class LoadTestClient:
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token = None
+        self.last_body = b""
+
+    def request(self, method, path, body=None, content_type=None):
+        """Returns the HTTP status (0 for connection errors)."""
+
+        headers = {"Accept": "application/json"}
+
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if content_type:
+            headers["Content-Type"] = content_type
+
+        request = Request(
+            self.base_url + path,
+            data=body,
+            headers=headers,
+            method=method,
+        )
+
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                self.last_body = response.read()
+                return response.status
+        except HTTPError as e:
+            self.last_body = e.read()
+            return e.code
+        except (URLError, OSError):
+            self.last_body = b""
+            return 0
+
+    def post_json(self, path, data):
+        return self.request("POST", path, json.dumps(data).encode(), "application/json")
+
+    def post_file(self, path, name, content, filename):
+        boundary = uuid.uuid4().hex
+
+        body = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: text/csv\r\n\r\n"
+        ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+
+        return self.request(
+            "POST", path, body, f"multipart/form-data; boundary={boundary}"
+        )
+
+    def login(self, username, password):
+        status = self.post_json("/api/token/", {"username": username, "password": password})
+
+        if status == 200:
+            self.token = json.loads(self.last_body)["access"]
+
+        return status
+
+
+# ============================================================
+# SCENARIOS
+# ============================================================
+#
+# Each returns (HTTP status, statuses that count as success).
+
+def _list(client, rnd, context):
+    return client.request("GET", "/api/devotees/?page_size=50"), {200}
+
+
+def _list_nakshatra(client, rnd, context):
+    nakshatra = rnd.choice(NAKSHATRAS)
+    return client.request("GET", f"/api/devotees/?nakshatra={nakshatra}&page_size=50"), {200}
+
+
+def _search(client, rnd, context):
+    term = rnd.choice(MALE_NAMES + FEMALE_NAMES)[:rnd.randint(3, 6)]
+    return client.request("GET", f"/api/devotees/?search={quote(term)}&page_size=50"), {200}
+
+
+def _stats(client, rnd, context):
+    return client.request("GET", "/api/stats/"), {200}
+
+
+def _create(client, rnd, context):
+    name, country_code, phone, nakshatra = next(
+        generate_rows(1, duplicate_ratio=0, invalid_ratio=0, seed=rnd.random())
+    )
+
+    status = client.post_json("/api/devotees/", {
+        "name": name,
+        "country_code": country_code,
+        "phone": phone,
+        "nakshatra": nakshatra,
+    })
+
+    # 400 = already registered, an expected outcome at the counter
+    return status, {201, 400}
+
+
+def _upload(client, rnd, context):
+    buffer = io.StringIO()
+
+    writer = csv.writer(buffer)
+    writer.writerow(UPLOAD_HEADER)
+    writer.writerows(generate_rows(context["upload_rows"], seed=rnd.random()))
+
+    status = client.post_file(
+        "/api/bulk-upload/", "file", buffer.getvalue().encode(), "load-test.csv"
+    )
+    return status, {200}
+
+
+SCENARIOS = {
+    "list": _list,
+    "list_nakshatra": _list_nakshatra,
+    "search": _search,
+    "create": _create,
+    "stats": _stats,
+    "upload": _upload,
+}
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+
+    if not sorted_values:
+        return 0.0
+
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def _summarize(samples, elapsed):
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+def run_load_test(
+    base_url,
+    username,
+    password,
+    users=10,
+    duration=30,
+    mix=None,
+    think_ms=0,
+    upload_rows=200,
+    seed=None,
+):
+    """Drive `users` concurrent virtual users for `duration` seconds."""
+
+    mix = mix or DEFAULT_MIX
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    context = {"upload_rows": upload_rows}
+
+    samples = {}
+    lock = threading.Lock()
+
+    def record(name, started, ok):
+        latency = (time.perf_counter() - started) * 1000
+        with lock:
+            samples.setdefault(name, []).append((latency, ok))
+
+    deadline = time.perf_counter() + duration
+
+    def virtual_user(number):
+        rnd = random.Random(None if seed is None else seed + number)
+        client = LoadTestClient(base_url)
+
+        started = time.perf_counter()
+        status = client.login(username, password)
+        record("token", started, status == 200)
+
+        if status != 200:
+            return
+
+        while time.perf_counter() < deadline:
+            name = rnd.choices(names, weights)[0]
+
+            started = time.perf_counter()
+            status, expected = SCENARIOS[name](client, rnd, context)
+            record(name, started, status in expected)
+
+            if think_ms:
+                time.sleep(rnd.uniform(0, 2 * think_ms) / 1000)
+
+    run_started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=users, thread_name_prefix="load-user") as pool:
+        list(pool.map(virtual_user, range(users)))
+
+    elapsed = time.perf_counter() - run_started
+
+    return {
+        "users": users,
+        "duration_s": round(elapsed, 2),
+        "mix": mix,
+        "overall": _summarize(
+            [sample for values in samples.values() for sample in values], elapsed
+        ),
+        "scenarios": {
+            name: _summarize(values, elapsed)
+            for name, values in sorted(samples.items())
+        },
+    }
+
+
+# ============================================================
+# BUDGET
+# ============================================================
+
+def check_budget(report, budget):
+    """List of human-readable budget violations (empty = pass)."""
+
+    violations = []
+
+    sections = [("overall", budget.get("overall", {}), report["overall"])]
+    sections += [
+        (name, limits, report["scenarios"].get(name))
+        for name, limits in budget.get("scenarios", {}).items()
+    ]
+
+    for name, limits, result in sections:
+        if result is None:
+            violations.append(f"{name}: no requests were made")
+            continue
+
+        for metric in BUDGET_METRICS + ("error_rate",):
+            if metric in limits and result[metric] > limits[metric]:
+                violations.append(f"{name}: {metric} {result[metric]} > {limits[metric]}")
+
+        if "min_rps" in limits and result["rps"] < limits["min_rps"]:
+            violations.append(f"{name}: rps {result['rps']} < {limits['min_rps']}")
+
+    return violations
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from devotees.purge import PURGE_BATCH_SIZE
+from devotees.retention import ARCHIVED_MODELS, RETENTION_DAYS, archive_old_entries
+
+
+class Command(BaseCommand):
+    help = (
+        "Move duplicate / invalid entries older than the retention period "
+        "into compressed CSV archives (run from cron)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--table",
+            choices=list(ARCHIVED_MODELS),
+            action="append",
+            help="Table to archive (repeatable, default: all)",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=RETENTION_DAYS,
+            help="Archive rows created more than this many days ago",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PURGE_BATCH_SIZE,
+            help="Rows archived and deleted per transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows would be archived",
+        )
+
+    def handle(self, *args, **options):
+        prefix = "[DRY RUN] " if options["dry_run"] else ""
+        outcome = "would be archived" if options["dry_run"] else "archived"
+
+        for table in options["table"] or list(ARCHIVED_MODELS):
+            summary = archive_old_entries(
+                table,
+                days=options["days"],
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{prefix}{table}: {summary['archived']} rows older than "
+                    f"{summary['cutoff']:%Y-%m-%d} {outcome}"
+                    + (f" -> {summary['file']}" if summary["file"] else "")
+                )
+            )
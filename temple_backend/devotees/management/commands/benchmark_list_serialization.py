@@ -0,0 +1,100 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from devotees.fastlist import FastJSONRenderer, orjson, values_plan
+from devotees.models import Devotee, DuplicateEntry, InvalidEntry
+from devotees.serializers import (
+    DevoteeSerializer,
+    DuplicateEntrySerializer,
+    InvalidEntrySerializer,
+)
+
+
+TARGETS = [
+    (Devotee, DevoteeSerializer),
+    (DuplicateEntry, DuplicateEntrySerializer),
+    (InvalidEntry, InvalidEntrySerializer),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare list serialization throughput: ModelSerializer + JSONRenderer "
+        "vs the .values() fast path. Missing rows are seeded inside a "
+        "transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        repeat = options["repeat"]
+
+        self.stdout.write(
+            f"Rows: {rows} | Repeat: {repeat} | "
+            f"Encoder: {'orjson' if orjson else 'json (orjson not installed)'}"
+        )
+
+        with transaction.atomic():
+            for model, serializer_class in TARGETS:
+                self._seed(model, rows)
+
+                queryset = model.objects.order_by("-created_at", "-id")[:rows]
+
+                before, expected = self._best(repeat, lambda: JSONRenderer().render(
+                    serializer_class(queryset, many=True).data
+                ))
+
+                plan = values_plan(serializer_class())
+
+                after, actual = self._best(repeat, lambda: FastJSONRenderer().render(
+                    plan.rows(queryset.values(*plan.fields))
+                ))
+
+                self.stdout.write(
+                    f"{model.__name__:<15} "
+                    f"serializer: {rows / before:>10,.0f} rows/s | "
+                    f"fast path: {rows / after:>10,.0f} rows/s | "
+                    f"speed-up: {before / after:.1f}x | "
+                    f"identical bytes: {expected == actual}"
+                )
+
+            transaction.set_rollback(True)
+
+    def _best(self, repeat, render):
+        best = None
+        output = None
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = render()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+
+        return best, output
+
+    def _seed(self, model, rows):
+        missing = rows - model.objects.count()
+
+        if missing <= 0:
+            return
+
+        nakshatras = [choice[0] for choice in Devotee.NAKSHATRA_CHOICES]
+
+        model.objects.bulk_create(
+            [
+                model(
+                    name=f"BENCH DEVOTEE {i}",
+                    country_code="91",
+                    phone=str(7000000000 + i),
+                    nakshatra=nakshatras[i % len(nakshatras)],
+                )
+                for i in range(missing)
+            ],
+            batch_size=5000,
+        )
@@ -0,0 +1,144 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl"]
+
+# Runs in a fresh interpreter: load the WSGI app the way the server
+# does, then serve one request through it
+CHILD = """
+import io, json, sys, time
+started = time.time()
+
+module, attr = sys.argv[1].rsplit(".", 1)
+application = getattr(__import__(module, fromlist=[attr]), attr)
+loaded = time.time()
+
+statuses = []
+environ = {
+    "REQUEST_METHOD": "GET",
+    "PATH_INFO": sys.argv[2],
+    "QUERY_STRING": "",
+    "SERVER_NAME": sys.argv[3],
+    "SERVER_PORT": "443",
+    "HTTP_HOST": sys.argv[3],
+    "HTTP_X_FORWARDED_PROTO": "https",
+    "wsgi.url_scheme": "https",
+    "wsgi.input": io.BytesIO(),
+    "wsgi.errors": sys.stderr,
+}
+b"".join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+responded = time.time()
+
+print(json.dumps({
+    "started": started,
+    "loaded": loaded,
+    "responded": responded,
+    "status": statuses[0],
+    "heavy_modules": [name for name in sys.argv[4:] if name in sys.modules],
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold-start time: start fresh Python processes that load "
+        "the WSGI application and serve one request (the health check by "
+        "default), and report time-to-first-response"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--path", default="/", help="Request path (default: health check)")
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument(
+            "--max-ms",
+            type=float,
+            help="Fail when the median time-to-first-response is above this",
+        )
+        parser.add_argument("--output", help="Write the results as JSON")
+
+    def handle(self, *args, **options):
+        runs = [self.run_once(options["path"], options["host"]) for _ in range(options["runs"])]
+
+        results = {}
+
+        for name in ["interpreter_ms", "app_load_ms", "first_request_ms", "time_to_first_response_ms"]:
+            timings = [run[name] for run in runs]
+
+            results[name] = {
+                "runs_ms": timings,
+                "min_ms": min(timings),
+                "median_ms": round(statistics.median(timings), 2),
+                "max_ms": max(timings),
+            }
+
+            self.stdout.write(
+                f"{name:<28} median {results[name]['median_ms']:>10.2f} ms | "
+                f"min {results[name]['min_ms']:>10.2f} ms"
+            )
+
+        heavy = runs[-1]["heavy_modules"]
+
+        self.stdout.write(
+            f"Status {runs[-1]['status']}; heavy modules loaded: {', '.join(heavy) or 'none'}"
+        )
+
+        if options["output"]:
+            report = {
+                "path": options["path"],
+                "python": sys.version.split()[0],
+                "status": runs[-1]["status"],
+                "heavy_modules": heavy,
+                "results": results,
+            }
+
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+
+        median = results["time_to_first_response_ms"]["median_ms"]
+
+        if options["max_ms"] is not None and median > options["max_ms"]:
+            raise CommandError(
+                f"Median time-to-first-response {median:.2f} ms is above "
+                f"the {options['max_ms']:.2f} ms budget"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Startup benchmark finished"))
+
+    def run_once(self, path, host):
+        spawned = time.time()
+
+        process = subprocess.run(
+            [
+                sys.executable, "-c", CHILD,
+                settings.WSGI_APPLICATION, path, host, *HEAVY_MODULES,
+            ],
+            cwd=settings.BASE_DIR,
+            env=os.environ.copy(),
+            capture_output=True,
+            text=True,
+        )
+
+        if process.returncode:
+            raise CommandError(f"Startup run failed:\n{process.stderr[-2000:]}")
+
+        run = json.loads(process.stdout.strip().splitlines()[-1])
+
+        ms = lambda start, end: round((end - start) * 1000, 2)
+
+        return {
+            "interpreter_ms": ms(spawned, run["started"]),
+            "app_load_ms": ms(run["started"], run["loaded"]),
+            "first_request_ms": ms(run["loaded"], run["responded"]),
+            "time_to_first_response_ms": ms(spawned, run["responded"]),
+            "status": run["status"],
+            "heavy_modules": run["heavy_modules"],
+        }
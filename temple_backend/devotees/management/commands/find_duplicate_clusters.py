@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from devotees.dedupe import scan_for_duplicates
+
+
+class Command(BaseCommand):
+    help = "Find suspected near-duplicate devotees and queue them for review"
+
+    def handle(self, *args, **kwargs):
+        summary = scan_for_duplicates()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Scanned: {summary['rows_scanned']} | "
+                f"Blocks compared: {summary['blocks_compared']} | "
+                f"Blocks skipped: {summary['blocks_skipped']} | "
+                f"Clusters: {summary['clusters_found']}"
+            )
+        )
@@ -0,0 +1,83 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+import pandas as pd
+
+from devotees.ingestion import CHUNK_SIZE, ingest_frame
+from devotees.synthetic import UPLOAD_HEADER, generate_rows, write_csv, write_xlsx
+
+
+def parse_count(value):
+    """'10k' -> 10000, '1m' -> 1000000, '2500' -> 2500"""
+
+    value = value.strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(value[-1:], 1)
+
+    try:
+        return int(float(value.rstrip("km")) * multiplier)
+    except ValueError:
+        raise CommandError(f"Invalid count: {value}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic devotees (10k / 100k / 1m ...) into the database "
+        "through the bulk upload pipeline, and/or as CSV / XLSX upload files"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=parse_count, help="Rows, e.g. 10k, 100k, 1m")
+        parser.add_argument("--duplicate-ratio", type=float, default=0.05)
+        parser.add_argument("--invalid-ratio", type=float, default=0.02)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--csv", help="Also write the rows to this CSV file")
+        parser.add_argument("--xlsx", help="Also write the rows to this XLSX file")
+        parser.add_argument(
+            "--no-db",
+            action="store_true",
+            help="Only write files, don't load the database",
+        )
+
+    def handle(self, *args, **options):
+
+        def rows():
+            return generate_rows(
+                options["count"],
+                duplicate_ratio=options["duplicate_ratio"],
+                invalid_ratio=options["invalid_ratio"],
+                seed=options["seed"],
+            )
+
+        if options["csv"]:
+            write_csv(rows(), options["csv"])
+            self.stdout.write(f"Wrote {options['csv']}")
+
+        if options["xlsx"]:
+            write_xlsx(rows(), options["xlsx"])
+            self.stdout.write(f"Wrote {options['xlsx']}")
+
+        if options["no_db"]:
+            return
+
+        summary = {"created": 0, "duplicates": 0, "invalid": 0}
+        stream = rows()
+
+        while True:
+            chunk = list(islice(stream, CHUNK_SIZE))
+
+            if not chunk:
+                break
+
+            for key, value in ingest_frame(
+                pd.DataFrame(chunk, columns=UPLOAD_HEADER)
+            ).items():
+                summary[key] += value
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created: {summary['created']} | "
+                f"Duplicates: {summary['duplicates']} | "
+                f"Invalid: {summary['invalid']}"
+            )
+        )
@@ -0,0 +1,125 @@
+import json
+import threading
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+
+from devotees.loadtest import DEFAULT_MIX, check_budget, parse_mix, run_load_test
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the API with concurrent virtual users and report "
+        "throughput and p50/p95/p99 latency per scenario. Without "
+        "--base-url an in-process server is started on a free port. "
+        "Creates devotees and uploads: use a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", help="e.g. http://127.0.0.1:8000 (default: in-process server)")
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--duration", type=float, default=30, help="Seconds")
+        parser.add_argument(
+            "--mix",
+            type=parse_mix,
+            default=DEFAULT_MIX,
+            help="Weighted scenarios, e.g. list:50,search:30,create:20",
+        )
+        parser.add_argument("--think-ms", type=float, default=0, help="Mean pause between requests")
+        parser.add_argument("--upload-rows", type=int, default=200)
+        parser.add_argument("--username", default="loadtest")
+        parser.add_argument("--password", default="loadtest-password")
+        parser.add_argument(
+            "--create-user",
+            action="store_true",
+            help="Create / reset the load-test user in the local database",
+        )
+        parser.add_argument("--seed", type=int)
+        parser.add_argument("--budget", help="JSON budget file; the command fails if it is exceeded")
+        parser.add_argument("--output", help="Write the full report as JSON")
+
+    def handle(self, *args, **options):
+
+        if options["create_user"]:
+            user, _ = User.objects.get_or_create(username=options["username"])
+            user.set_password(options["password"])
+            user.save()
+
+        server = None
+        base_url = options["base_url"]
+
+        if not base_url:
+            server = self.start_server()
+            base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        self.stdout.write(
+            f"Load test: {options['users']} users for {options['duration']}s against {base_url}"
+        )
+
+        try:
+            report = run_load_test(
+                base_url,
+                options["username"],
+                options["password"],
+                users=options["users"],
+                duration=options["duration"],
+                mix=options["mix"],
+                think_ms=options["think_ms"],
+                upload_rows=options["upload_rows"],
+                seed=options["seed"],
+            )
+        finally:
+            if server:
+                server.shutdown()
+                server.server_close()
+
+        self.print_report(report)
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+
+        if options["budget"]:
+            with open(options["budget"]) as handle:
+                violations = check_budget(report, json.load(handle))
+
+            if violations:
+                raise CommandError(
+                    "Budget exceeded:\n  " + "\n  ".join(violations)
+                )
+
+            self.stdout.write(self.style.SUCCESS("Within budget."))
+
+    def start_server(self):
+        # TLS is terminated by the proxy in production; plain HTTP here
+        settings.SECURE_SSL_REDIRECT = False
+
+        server = ThreadedWSGIServer(("127.0.0.1", 0), QuietRequestHandler)
+        server.set_app(get_wsgi_application())
+
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        return server
+
+    def print_report(self, report):
+        rows = [("TOTAL", report["overall"])] + list(report["scenarios"].items())
+
+        self.stdout.write(
+            f"{'scenario':<16}{'requests':>10}{'errors':>8}{'rps':>9}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        )
+
+        for name, result in rows:
+            self.stdout.write(
+                f"{name:<16}{result['requests']:>10}{result['errors']:>8}"
+                f"{result['rps']:>9.1f}{result['p50_ms']:>10.1f}"
+                f"{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+            )
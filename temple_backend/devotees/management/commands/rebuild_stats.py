@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from devotees.stats import rebuild_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute StatCounter rows from the devotee, duplicate and invalid tables"
+
+    def handle(self, *args, **kwargs):
+        drift = rebuild_counts()
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("All counters are accurate."))
+            return
+
+        for (table, nakshatra), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(
+                f"{table} {nakshatra or 'TOTAL'}: {stored} -> {actual}"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {len(drift)} drifted counter(s).")
+        )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from devotees.reprocess import CHUNK_SIZE, reprocess_invalids
+
+
+class Command(BaseCommand):
+    help = "Re-validate every InvalidEntry and move rows that now pass"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be moved",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Rows processed per transaction",
+        )
+
+    def handle(self, *args, **options):
+        summary = reprocess_invalids(
+            dry_run=options["dry_run"],
+            chunk_size=options["chunk_size"],
+        )
+
+        prefix = "[DRY RUN] " if options["dry_run"] else ""
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}Scanned: {summary['scanned']} | "
+                f"To devotees: {summary['moved_to_devotees']} | "
+                f"To duplicates: {summary['moved_to_duplicates']} | "
+                f"Still invalid: {summary['still_invalid']}"
+            )
+        )
@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from devotees.ingestion import ingest_file
+from devotees.synthetic import UPLOAD_HEADER, generate_rows
+
+from .generate_devotees import parse_count
+
+
+BENCHMARK_USER = "benchmark-runner"
+
+
+def upload_file(rows, seed):
+    """Synthetic rows as an in-memory CSV upload."""
+
+    buffer = io.StringIO()
+
+    writer = csv.writer(buffer)
+    writer.writerow(UPLOAD_HEADER)
+    writer.writerows(generate_rows(rows, seed=seed))
+
+    return SimpleUploadedFile(
+        "benchmark.csv",
+        buffer.getvalue().encode(),
+        content_type="text/csv",
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Time bulk upload, filtered list, search, CSV export and "
+        "delete-by-nakshatra against the configured database and write "
+        "the results as JSON. Everything runs in a transaction that is "
+        "rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=parse_count, default=10000, help="e.g. 10k, 100k, 1m")
+        parser.add_argument("--repeat", type=int, default=3)
+        # Differs from generate_devotees' default, so an already loaded
+        # synthetic data set doesn't turn the upload into all duplicates
+        parser.add_argument("--seed", type=int, default=2024)
+        parser.add_argument("--nakshatra", default="ROHINI")
+        parser.add_argument("--label", default="", help="Release / commit label stored with the results")
+        parser.add_argument("--output", help="JSON file (default: benchmark-<timestamp>.json)")
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+        self.results = {}
+
+        rows = options["rows"]
+        nakshatra = options["nakshatra"]
+        started_at = timezone.now()
+
+        with transaction.atomic():
+            user, _ = User.objects.get_or_create(username=BENCHMARK_USER)
+
+            self.client = APIClient(SERVER_NAME="localhost")
+            self.client.force_authenticate(user)
+
+            # Each upload starts from the same (pre-seed) state
+            self.measure(
+                "bulk_upload",
+                lambda: self.client.post(
+                    "/api/bulk-upload/",
+                    {"file": upload_file(rows, options["seed"])},
+                    format="multipart",
+                    secure=True,
+                ),
+                rows=rows,
+                rollback=True,
+            )
+
+            ingest_file(upload_file(rows, options["seed"]))
+
+            self.measure("list_first_page", lambda: self.get("/api/devotees/?page_size=50"))
+            self.measure(
+                "list_filtered",
+                lambda: self.get(f"/api/devotees/?nakshatra={nakshatra}&page_size=50"),
+            )
+            self.measure("search_name", lambda: self.get("/api/devotees/?search=KRISHNAN&page_size=50"))
+            self.measure("search_phone", lambda: self.get("/api/devotees/?search=98&page_size=50"))
+            self.measure("export_csv", lambda: self.get("/api/devotees/export.csv"), rows=rows)
+            self.measure(
+                "export_csv_filtered",
+                lambda: self.get(f"/api/devotees/export.csv?nakshatra={nakshatra}"),
+            )
+            self.measure(
+                "delete_nakshatra_data",
+                lambda: self.client.delete(f"/api/delete-nakshatra/{nakshatra}/", secure=True),
+                rollback=True,
+            )
+
+            transaction.set_rollback(True)
+
+        report = {
+            "label": options["label"],
+            "started_at": started_at.isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "rows": rows,
+            "repeat": self.repeat,
+            "seed": options["seed"],
+            "results": self.results,
+        }
+
+        output = options["output"] or f"benchmark-{started_at:%Y%m%d-%H%M%S}.json"
+
+        with open(output, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+        for name, result in self.results.items():
+            self.stdout.write(
+                f"{name:<24} median {result['median_ms']:>10.2f} ms | "
+                f"min {result['min_ms']:>10.2f} ms"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+    # --------------------------------------------------------
+    # HELPERS
+    # --------------------------------------------------------
+
+    def get(self, path):
+        response = self.client.get(path, secure=True)
+
+        # Streaming exports only do their work while being consumed
+        if response.streaming:
+            b"".join(response.streaming_content)
+
+        return response
+
+    def measure(self, name, call, rows=None, rollback=False):
+        timings = []
+
+        for _ in range(self.repeat):
+            savepoint = transaction.savepoint() if rollback else None
+
+            started = time.perf_counter()
+            response = call()
+            timings.append((time.perf_counter() - started) * 1000)
+
+            if savepoint:
+                transaction.savepoint_rollback(savepoint)
+
+            if response.status_code >= 400:
+                raise CommandError(
+                    f"{name} failed with HTTP {response.status_code}: {response.content[:200]}"
+                )
+
+        median = statistics.median(timings)
+
+        self.results[name] = {
+            "runs_ms": [round(value, 2) for value in timings],
+            "min_ms": round(min(timings), 2),
+            "median_ms": round(median, 2),
+            "max_ms": round(max(timings), 2),
+        }
+
+        if rows:
+            self.results[name]["rows_per_second"] = round(rows / (median / 1000), 1)
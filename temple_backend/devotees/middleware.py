@@ -0,0 +1,295 @@
+# ============================================================
+# REQUEST MIDDLEWARE: SQL PROFILING, READ-REPLICA ROUTING
+# ============================================================
+
+# ------------------------------------------------------------
+# PER-REQUEST SQL PROFILING (OPT-IN)
+# ------------------------------------------------------------
+#
+# Enabled with SQL_PROFILING=True. For a sampled request it records
+# every statement through Django's execute_wrapper hook and reports:
+#
+#   * Server-Timing header   db;dur=12.4;desc="9 queries", app;dur=40.1
+#                            (shown in the browser devtools timing tab)
+#   * one JSON log line      logger "devotees.sql", WARNING when an
+#                            N+1 pattern is found, INFO otherwise
+#
+# A query "shape" is the SQL text with placeholders (parameters are
+# never logged); IN (%s, %s, ...) lists are collapsed so batched
+# lookups of different sizes count as one shape. A shape repeated
+# SQL_PROFILING_N_PLUS_ONE_THRESHOLD times or more is flagged.
+#
+# When disabled the middleware removes itself at startup
+# (MiddlewareNotUsed); unsampled requests only pay one random() call.
+# Queries run while a streaming response is consumed are not counted.
+#
+# Both middlewares are sync and async capable, so the async views under
+# ASGI don't pay a thread hop per middleware.
+
+import json
+import logging
+import random
+import re
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .authentication import CachedJWTAuthentication
+from .routers import (
+    REPLICA_DB,
+    mark_wrote,
+    reading_from,
+    recently_wrote,
+    replica_configured,
+)
+
+
+logger = logging.getLogger("devotees.sql")
+
+PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+WHITESPACE = re.compile(r"\s+")
+
+MAX_SQL_LENGTH = 300
+
+
+def query_shape(sql):
+    return PLACEHOLDER_LIST.sub("%s, ...", WHITESPACE.sub(" ", sql).strip())
+
+
+class QueryRecorder:
+    """execute_wrapper callable collecting (shape, seconds) per query."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    def report(self, slowest, threshold):
+        shapes = {}
+        for sql, _ in self.queries:
+            shape = query_shape(sql)
+            shapes[shape] = shapes.get(shape, 0) + 1
+
+        return {
+            "queries": len(self.queries),
+            "db_ms": round(sum(seconds for _, seconds in self.queries) * 1000, 2),
+            "slowest": [
+                {"ms": round(seconds * 1000, 2), "sql": query_shape(sql)[:MAX_SQL_LENGTH]}
+                for sql, seconds in sorted(
+                    self.queries, key=lambda query: query[1], reverse=True
+                )[:slowest]
+            ],
+            "n_plus_one": [
+                {"count": count, "sql": shape[:MAX_SQL_LENGTH]}
+                for shape, count in sorted(
+                    shapes.items(), key=lambda item: item[1], reverse=True
+                )
+                if count >= threshold
+            ],
+        }
+
+
+def _record_queries(recorder):
+    stack = ExitStack()
+
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(recorder))
+
+    return stack
+
+
+class SQLProfilingMiddleware:
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SQL_PROFILING", False):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "SQL_PROFILING_SAMPLE_RATE", 1.0)
+        self.slowest = getattr(settings, "SQL_PROFILING_SLOWEST", 3)
+        self.threshold = getattr(settings, "SQL_PROFILING_N_PLUS_ONE_THRESHOLD", 10)
+
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+
+        if self.async_mode:
+            return self.__acall__(request)
+
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+
+        with _record_queries(recorder):
+            response = self.get_response(request)
+
+        return self._report(request, response, recorder, started)
+
+    async def __acall__(self, request):
+
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+
+        # The ORM runs in the request's sync thread, whose connections
+        # are not the event loop's: the wrappers are installed there
+        recording = await sync_to_async(_record_queries)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.close)()
+
+        return self._report(request, response, recorder, started)
+
+    def _report(self, request, response, recorder, started):
+        total_ms = round((time.perf_counter() - started) * 1000, 2)
+        report = recorder.report(self.slowest, self.threshold)
+
+        response["Server-Timing"] = (
+            f'db;dur={report["db_ms"]};desc="{report["queries"]} queries", '
+            f"app;dur={total_ms}"
+        )
+
+        logger.log(
+            logging.WARNING if report["n_plus_one"] else logging.INFO,
+            json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "total_ms": total_ms,
+                **report,
+            }),
+        )
+
+        return response
+
+
+# ------------------------------------------------------------
+# READ-REPLICA ROUTING (WHEN DATABASE_REPLICA_URL IS SET)
+# ------------------------------------------------------------
+#
+# Safe-method requests read from the replica unless the caller wrote
+# within REPLICA_STICKY_SECONDS; a successful write request marks its
+# user as sticky. The user comes from the bearer token's claims alone
+# (signature check, no query); DRF still authenticates the request.
+# Streaming responses keep reading from the replica while they are
+# sent, since their queries run after the view has returned.
+
+_token_reader = CachedJWTAuthentication()
+
+
+def _token_user_id(request):
+    header = _token_reader.get_header(request)
+
+    if header is None:
+        return None
+
+    try:
+        raw_token = _token_reader.get_raw_token(header)
+        token = _token_reader.get_validated_token(raw_token) if raw_token else None
+    except AuthenticationFailed:
+        # Bad / expired token: DRF answers 401 for it later
+        return None
+
+    return token.get(jwt_settings.USER_ID_CLAIM) if token else None
+
+
+def _stream_on(alias, content):
+    with reading_from(alias):
+        yield from content
+
+
+async def _astream_on(alias, content):
+    with reading_from(alias):
+        async for part in content:
+            yield part
+
+
+class ReplicaRoutingMiddleware:
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+
+        if self.async_mode:
+            return self.__acall__(request)
+
+        user_id = _token_user_id(request)
+
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+
+            if user_id is not None and response.status_code < 400:
+                mark_wrote(user_id)
+
+            return response
+
+        if user_id is not None and recently_wrote(user_id):
+            return self.get_response(request)
+
+        with reading_from(REPLICA_DB):
+            response = self.get_response(request)
+
+        return _stream_replica(response)
+
+    async def __acall__(self, request):
+
+        user_id = _token_user_id(request)
+
+        if request.method not in SAFE_METHODS:
+            response = await self.get_response(request)
+
+            if user_id is not None and response.status_code < 400:
+                await sync_to_async(mark_wrote)(user_id)
+
+            return response
+
+        if user_id is not None and await sync_to_async(recently_wrote)(user_id):
+            return await self.get_response(request)
+
+        # The context variable is copied into the sync threads the
+        # request's queries run in
+        with reading_from(REPLICA_DB):
+            response = await self.get_response(request)
+
+        return _stream_replica(response)
+
+
+def _stream_replica(response):
+    if response.streaming:
+        stream = _astream_on if response.is_async else _stream_on
+        response.streaming_content = stream(REPLICA_DB, response.streaming_content)
+
+    return response
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.28 on 2026-10-17 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devotees', '0005_importjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='devotee',
+            index=models.Index(fields=['created_at', 'id'], name='devotees_de_created_a5504e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='duplicateentry',
+            index=models.Index(fields=['created_at', 'id'], name='devotees_du_created_25bcc5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invalidentry',
+            index=models.Index(fields=['created_at', 'id'], name='devotees_in_created_106c53_idx'),
+        ),
+    ]
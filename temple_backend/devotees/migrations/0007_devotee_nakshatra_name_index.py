@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-17 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devotees', '0006_created_at_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='devotee',
+            index=models.Index(fields=['nakshatra', 'name'], name='devotees_de_nakshat_16135d_idx'),
+        ),
+    ]
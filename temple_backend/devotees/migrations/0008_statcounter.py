@@ -0,0 +1,45 @@
+# Generated by Django 4.2.28 on 2026-10-17 18:39
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    Devotee = apps.get_model("devotees", "Devotee")
+    DuplicateEntry = apps.get_model("devotees", "DuplicateEntry")
+    InvalidEntry = apps.get_model("devotees", "InvalidEntry")
+    StatCounter = apps.get_model("devotees", "StatCounter")
+
+    counters = [
+        StatCounter(table="DEVOTEE", nakshatra=row["nakshatra"], count=row["total"])
+        for row in Devotee.objects.order_by().values("nakshatra").annotate(total=Count("id"))
+    ]
+    counters.append(StatCounter(table="DUPLICATE", nakshatra="", count=DuplicateEntry.objects.count()))
+    counters.append(StatCounter(table="INVALID", nakshatra="", count=InvalidEntry.objects.count()))
+
+    StatCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devotees', '0007_devotee_nakshatra_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(choices=[('DEVOTEE', 'DEVOTEE'), ('DUPLICATE', 'DUPLICATE'), ('INVALID', 'INVALID')], max_length=20)),
+                ('nakshatra', models.CharField(blank=True, max_length=50)),
+                ('count', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='statcounter',
+            constraint=models.UniqueConstraint(fields=('table', 'nakshatra'), name='unique_stat_counter'),
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.28 on 2026-10-17 18:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('devotees', '0008_statcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClusterScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'PENDING'), ('RUNNING', 'RUNNING'), ('COMPLETED', 'COMPLETED'), ('FAILED', 'FAILED')], db_index=True, default='PENDING', max_length=20)),
+                ('rows_scanned', models.PositiveIntegerField(default=0)),
+                ('blocks_compared', models.PositiveIntegerField(default=0)),
+                ('blocks_skipped', models.PositiveIntegerField(default=0)),
+                ('clusters_found', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cluster_scans', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DuplicateCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nakshatra', models.CharField(max_length=50)),
+                ('phone_key', models.CharField(max_length=15)),
+                ('signature', models.CharField(db_index=True, max_length=40)),
+                ('score', models.FloatField()),
+                ('status', models.CharField(choices=[('PENDING', 'PENDING'), ('MERGED', 'MERGED'), ('DISMISSED', 'DISMISSED')], default='PENDING', max_length=20)),
+                ('merged_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('kept', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='devotees.devotee')),
+                ('scan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='clusters', to='devotees.clusterscan')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DuplicateClusterMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cluster', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='devotees.duplicatecluster')),
+                ('devotee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cluster_memberships', to='devotees.devotee')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='duplicateclustermember',
+            constraint=models.UniqueConstraint(fields=('cluster', 'devotee'), name='unique_cluster_member'),
+        ),
+        migrations.AddIndex(
+            model_name='duplicatecluster',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='devotees_du_status_3a1600_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-17 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devotees', '0009_duplicate_clusters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statcounter',
+            name='version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.28 on 2026-10-17 19:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('devotees', '0010_statcounter_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('ACTIVE', 'ACTIVE'), ('ROLLED_BACK', 'ROLLED_BACK')], db_index=True, default='ACTIVE', max_length=20)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('duplicate_count', models.PositiveIntegerField(default=0)),
+                ('invalid_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('rolled_back_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='devotee',
+            name='upload_batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='devotees', to='devotees.uploadbatch'),
+        ),
+        migrations.AddField(
+            model_name='duplicateentry',
+            name='upload_batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='devotees.uploadbatch'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='upload_batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='devotees.uploadbatch'),
+        ),
+        migrations.AddField(
+            model_name='invalidentry',
+            name='upload_batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invalids', to='devotees.uploadbatch'),
+        ),
+        migrations.AddIndex(
+            model_name='uploadbatch',
+            index=models.Index(fields=['created_at', 'id'], name='devotees_up_created_79b04a_idx'),
+        ),
+    ]
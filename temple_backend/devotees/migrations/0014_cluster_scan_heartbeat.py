@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-17 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devotees', '0013_job_heartbeats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clusterscan',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-17 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devotees', '0016_reprocess_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='resumed_after_rows',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
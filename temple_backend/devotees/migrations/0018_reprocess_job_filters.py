@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-17 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devotees', '0017_import_job_resumed_rows'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reprocessjob',
+            name='filters',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-17 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devotees', '0018_reprocess_job_filters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='already_ingested',
+            field=models.BooleanField(default=False),
+        ),
+    ]
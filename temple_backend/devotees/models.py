@@ -51,6 +51,15 @@ class Devotee(models.Model):
         db_index=True
     )
 
+    # Upload that created the row (NULL when not created by an upload)
+    upload_batch = models.ForeignKey(
+        "UploadBatch",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="devotees",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -59,6 +68,8 @@ class Devotee(models.Model):
         indexes = [
             models.Index(fields=["name", "phone"]),
             models.Index(fields=["nakshatra", "created_at"]),
+            models.Index(fields=["nakshatra", "name"]),
+            models.Index(fields=["created_at", "id"]),
         ]
 
         constraints = [
@@ -82,11 +93,24 @@ class DuplicateEntry(models.Model):
     phone = models.CharField(max_length=15)
     nakshatra = models.CharField(max_length=50)
 
+    # Upload that created the row (NULL when not created by an upload)
+    upload_batch = models.ForeignKey(
+        "UploadBatch",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="duplicates",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
 
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+        ]
+
     def __str__(self):
         return f"DUPLICATE: {self.name} - {self.nakshatra}"
 
@@ -102,10 +126,397 @@ class InvalidEntry(models.Model):
     nakshatra = models.CharField(max_length=50, blank=True)
 
     reason = models.TextField(blank=True)
+
+    # Upload that created the row (NULL when not created by an upload)
+    upload_batch = models.ForeignKey(
+        "UploadBatch",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="invalids",
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+        ]
+
+    def __str__(self):
+        return f"INVALID: {self.name} - {self.reason}"
+
+# ============================================================
+# 📥 IMPORT JOB MODEL (BACKGROUND BULK UPLOADS)
+# ============================================================
+
+class ImportJob(models.Model):
+
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_COMPLETED = "COMPLETED"
+    STATUS_FAILED = "FAILED"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "PENDING"),
+        (STATUS_RUNNING, "RUNNING"),
+        (STATUS_COMPLETED, "COMPLETED"),
+        (STATUS_FAILED, "FAILED"),
+    ]
+
+    file_name = models.CharField(max_length=255)
+    file_path = models.CharField(max_length=500)
+    file_size = models.BigIntegerField(default=0)
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_index=True,
+    )
+
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+
+    # Rows committed by an earlier attempt at the file (included in
+    # rows_processed, but not processed by this job)
+    resumed_after_rows = models.PositiveIntegerField(default=0)
+
+    # The file had been ingested before: nothing was read, the counts
+    # are the earlier upload's
+    already_ingested = models.BooleanField(default=False)
+
+    created_count = models.PositiveIntegerField(default=0)
+    duplicate_count = models.PositiveIntegerField(default=0)
+    invalid_count = models.PositiveIntegerField(default=0)
+
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(
+        "auth.User",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="import_jobs",
+    )
+
+    upload_batch = models.ForeignKey(
+        "UploadBatch",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Refreshed while a live process holds the job (see heartbeats.py)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"IMPORT #{self.pk}: {self.file_name} ({self.status})"
+
+
+# ============================================================
+# 📦 UPLOAD BATCH MODEL (ONE PER BULK UPLOAD / IMPORT JOB)
+# ============================================================
+
+class UploadBatch(models.Model):
+
+    STATUS_ACTIVE = "ACTIVE"
+    STATUS_ROLLED_BACK = "ROLLED_BACK"
+
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, "ACTIVE"),
+        (STATUS_ROLLED_BACK, "ROLLED_BACK"),
+    ]
+
+    file_name = models.CharField(max_length=255)
+    file_size = models.BigIntegerField(default=0)
+
+    # SHA-256 of the file bytes; identical re-uploads are recognized
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_ACTIVE,
+        db_index=True,
+    )
+
+    # Rows written by the upload (kept after a rollback)
+    created_count = models.PositiveIntegerField(default=0)
+    duplicate_count = models.PositiveIntegerField(default=0)
+    invalid_count = models.PositiveIntegerField(default=0)
+
+    # File rows consumed by committed chunks; a failed upload of the
+    # same file resumes after them
+    rows_committed = models.PositiveIntegerField(default=0)
+
+    created_by = models.ForeignKey(
+        "auth.User",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="upload_batches",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    rolled_back_at = models.DateTimeField(null=True, blank=True)
+
+    # Lease: set while an upload / import job writes into the batch and
+    # kept fresh by heartbeats.py; None or stale means nobody holds it
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
 
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+        ]
+
+    def __str__(self):
+        return f"UPLOAD #{self.pk}: {self.file_name} ({self.status})"
+
+
+# ============================================================
+# 📊 STAT COUNTER MODEL (INCREMENTALLY MAINTAINED COUNTS)
+# ============================================================
+
+class StatCounter(models.Model):
+
+    TABLE_DEVOTEE = "DEVOTEE"
+    TABLE_DUPLICATE = "DUPLICATE"
+    TABLE_INVALID = "INVALID"
+
+    TABLE_CHOICES = [
+        (TABLE_DEVOTEE, "DEVOTEE"),
+        (TABLE_DUPLICATE, "DUPLICATE"),
+        (TABLE_INVALID, "INVALID"),
+    ]
+
+    table = models.CharField(max_length=20, choices=TABLE_CHOICES)
+
+    # Devotee counts are kept per nakshatra; duplicate / invalid
+    # totals use an empty nakshatra
+    nakshatra = models.CharField(max_length=50, blank=True)
+
+    count = models.BigIntegerField(default=0)
+
+    # Bumped by every write to the rows this counter covers (count
+    # changes and plain edits); list endpoints derive ETags from it
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["table", "nakshatra"],
+                name="unique_stat_counter",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.table} {self.nakshatra or 'TOTAL'}: {self.count}"
+
+
+# ============================================================
+# 🧩 NEAR-DUPLICATE CLUSTERS (REVIEW QUEUE)
+# ============================================================
+
+class ClusterScan(models.Model):
+
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_COMPLETED = "COMPLETED"
+    STATUS_FAILED = "FAILED"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "PENDING"),
+        (STATUS_RUNNING, "RUNNING"),
+        (STATUS_COMPLETED, "COMPLETED"),
+        (STATUS_FAILED, "FAILED"),
+    ]
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_index=True,
+    )
+
+    rows_scanned = models.PositiveIntegerField(default=0)
+    blocks_compared = models.PositiveIntegerField(default=0)
+    blocks_skipped = models.PositiveIntegerField(default=0)
+    clusters_found = models.PositiveIntegerField(default=0)
+
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(
+        "auth.User",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="cluster_scans",
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Refreshed while a live process holds the scan (see heartbeats.py)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"SCAN #{self.pk} ({self.status})"
+
+
+class ReprocessJob(models.Model):
+    """A background run of reprocess.reprocess_invalids."""
+
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_COMPLETED = "COMPLETED"
+    STATUS_FAILED = "FAILED"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "PENDING"),
+        (STATUS_RUNNING, "RUNNING"),
+        (STATUS_COMPLETED, "COMPLETED"),
+        (STATUS_FAILED, "FAILED"),
+    ]
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_index=True,
+    )
+
+    # List filters (filters.FILTER_PARAMS) limiting the run; {} = all
+    filters = models.JSONField(default=dict, blank=True)
+
+    scanned = models.PositiveIntegerField(default=0)
+    moved_to_devotees = models.PositiveIntegerField(default=0)
+    moved_to_duplicates = models.PositiveIntegerField(default=0)
+    still_invalid = models.PositiveIntegerField(default=0)
+
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(
+        "auth.User",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="reprocess_jobs",
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Refreshed while a live process holds the job (see heartbeats.py)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"REPROCESS #{self.pk} ({self.status})"
+
+
+class DuplicateCluster(models.Model):
+
+    STATUS_PENDING = "PENDING"
+    STATUS_MERGED = "MERGED"
+    STATUS_DISMISSED = "DISMISSED"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "PENDING"),
+        (STATUS_MERGED, "MERGED"),
+        (STATUS_DISMISSED, "DISMISSED"),
+    ]
+
+    scan = models.ForeignKey(
+        ClusterScan,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="clusters",
+    )
+
+    nakshatra = models.CharField(max_length=50)
+
+    # Normalized phone shared by every member (the blocking key)
+    phone_key = models.CharField(max_length=15)
+
+    # Hash of the sorted member ids, so a dismissed group is not
+    # raised again by the next scan
+    signature = models.CharField(max_length=40, db_index=True)
+
+    # Weakest name similarity linking the members (0..1)
+    score = models.FloatField()
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+    )
+
+    kept = models.ForeignKey(
+        Devotee,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    merged_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+        indexes = [
+            models.Index(fields=["status", "created_at", "id"]),
+        ]
+
+    def __str__(self):
+        return f"CLUSTER #{self.pk}: {self.phone_key} - {self.nakshatra} ({self.status})"
+
+
+class DuplicateClusterMember(models.Model):
+
+    cluster = models.ForeignKey(
+        DuplicateCluster,
+        on_delete=models.CASCADE,
+        related_name="members",
+    )
+    devotee = models.ForeignKey(
+        Devotee,
+        on_delete=models.CASCADE,
+        related_name="cluster_memberships",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cluster", "devotee"],
+                name="unique_cluster_member",
+            )
+        ]
+
     def __str__(self):
-        return f"INVALID: {self.name} - {self.reason}"
\ No newline at end of file
+        return f"CLUSTER #{self.cluster_id} -> {self.devotee_id}"
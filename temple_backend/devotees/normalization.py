@@ -0,0 +1,275 @@
+# ============================================================
+# NAKSHATRA NORMALIZATION ENGINE
+# ============================================================
+#
+# One place that turns whatever an operator typed ("Ashwathy",
+# "barani", "Thiruvadhira", "Mrigashira" ...) into a canonical
+# Devotee.NAKSHATRA_CHOICES value. Used by the serializer, bulk upload,
+# delete-by-nakshatra and the list filters.
+#
+# Everything is built once at import:
+#   * SKELETON_INDEX  phonetic skeleton -> canonical name, covering the
+#                     27 names plus known Malayalam / Tamil / Sanskrit
+#                     spellings
+#   * DELETE_INDEX    symmetric-delete index over the skeletons, so a
+#                     fuzzy lookup only scores a handful of candidates
+#                     instead of every known spelling
+#
+# Fuzzy matching is deliberately narrow: one typo in a spelling of at
+# least FUZZY_MIN_LENGTH letters, with the same first letter and about
+# the same length, that isn't a known spelling plus a suffix. Short
+# words and ordinary names ("Rohan", "Moon", "Kavitha", "Revanth") are
+# never turned into a nakshatra. Destructive paths and list filters use
+# exact_nakshatra (known spellings only).
+#
+# Results per raw input are memoized with an LRU cache.
+
+import re
+from functools import lru_cache
+
+from .models import Devotee
+
+
+CANONICAL_NAKSHATRAS = [choice[0] for choice in Devotee.NAKSHATRA_CHOICES]
+
+# Known transliterations / alternate names, per canonical nakshatra
+KNOWN_VARIANTS = {
+    "ASWATHY": ["ASWATHI", "ASHWATHY", "ASHWATHI", "ASWINI", "ASHWINI", "ASVINI"],
+    "BHARANI": ["BARANI", "BHARINI"],
+    "KARTHIKA": ["KARTIKA", "KARTHIGAI", "KRITTIKA", "KRITHIKA", "KARTHIKAI"],
+    "ROHINI": ["ROHINY"],
+    "MAKAYIRAM": ["MAKIRAYAM", "MAKEERAM", "MAGAYIRAM", "MRIGASHIRA", "MRIGASIRA", "MIRUGASIRISHAM"],
+    "THIRUVATHIRA": ["THIRUVADHIRA", "TIRUVATIRA", "THIRUVATHIRAI", "ARDRA", "AARDRA"],
+    "PUNARTHAM": ["PUNARTAM", "PUNARPOOSAM", "PUNARVASU"],
+    "POOYAM": ["PUYAM", "POOSAM", "PUSHYA", "PUSYA"],
+    "AYILYAM": ["AAYILYAM", "AYILLYAM", "AYILIYAM", "ASHLESHA", "ASLESHA"],
+    "MAKAM": ["MAKHAM", "MAGAM", "MAGHA", "MAKHA"],
+    "POORAM": ["PURAM", "PURVA PHALGUNI", "POORVA PHALGUNI"],
+    "UTHRAM": ["UTRAM", "UTHIRAM", "UTTARA PHALGUNI", "UTHRA PHALGUNI"],
+    "ATHAM": ["ATTAM", "HASTHAM", "HASTAM", "HASTA", "HASTHA"],
+    "CHITHIRA": ["CHITRA", "CHITHRA", "CHITHIRAI", "CHITTIRAI"],
+    "CHOTHI": ["CHODHI", "CHOTI", "SWATHI", "SWATI", "SVATI"],
+    "VISHAKHAM": ["VISAKHAM", "VISHAKAM", "VISAKAM", "VISHAKHA", "VISAKHA"],
+    "ANIZHAM": ["ANIZAM", "ANILAM", "ANUSHAM", "ANURADHA"],
+    "THRIKKETTA": ["THRIKETTA", "TRIKKETTA", "THRIKKETA", "KETTAI", "JYESHTA", "JYESHTHA"],
+    "MOOLAM": ["MULAM", "MOOLA", "MULA"],
+    "POORADAM": ["PURADAM", "POORAADAM", "PURVA ASHADHA", "POORVASHADA"],
+    "UTHRADAM": ["UTRADAM", "UTHIRADAM", "UTTARA ASHADHA", "UTTARASHADA"],
+    "THIRUVONAM": ["TIRUVONAM", "THIRUONAM", "SHRAVANA", "SRAVANA"],
+    "AVITTAM": ["AVITAM", "DHANISHTA", "DHANISHTHA", "DANISHTA"],
+    "CHATHAYAM": ["CHATAYAM", "SADAYAM", "SHATABHISHA", "SATHABHISHA"],
+    "POORURUTTATHI": ["POORORUTTATHI", "PURURUTTATHI", "POORATTATHI", "PURATTATHI", "PURVA BHADRAPADA", "POORVABHADRA"],
+    "UTHRUTTATHI": ["UTHRATTATHI", "UTHRITTATHI", "UTRATTATHI", "UTTARA BHADRAPADA", "UTTARABHADRA"],
+    "REVATHI": ["REVATHY", "REVATI", "REVATHEE"],
+}
+
+# Ordered spelling rules that fold transliteration noise together
+SKELETON_RULES = [
+    ("aa", "a"),
+    ("ee", "i"),
+    ("oo", "u"),
+    ("th", "t"),
+    ("dh", "d"),
+    ("bh", "b"),
+    ("kh", "k"),
+    ("gh", "g"),
+    ("ph", "p"),
+    ("sh", "s"),
+    ("zh", "z"),
+    ("w", "v"),
+]
+
+# Maximum edit distance accepted by the fuzzy matcher
+MAX_DISTANCE = 1
+
+# Shorter skeletons are only matched exactly
+FUZZY_MIN_LENGTH = 6
+
+NON_LETTERS = re.compile(r"[^a-z]")
+REPEATED_LETTERS = re.compile(r"(.)\1+")
+
+
+# ============================================================
+# SKELETON
+# ============================================================
+
+def skeleton(value):
+    """
+    Reduce a spelling to a phonetic skeleton:
+    'Ashwathy' -> 'asvati', 'Bharani' -> 'barani'.
+    """
+    value = NON_LETTERS.sub("", value.lower())
+
+    for old, new in SKELETON_RULES:
+        value = value.replace(old, new)
+
+    value = REPEATED_LETTERS.sub(r"\1", value)
+
+    if value.endswith("y"):
+        value = value[:-1] + "i"
+
+    return value
+
+
+# ============================================================
+# EDIT DISTANCE
+# ============================================================
+
+def edit_distance(a, b):
+    """Optimal string alignment distance (adjacent swaps cost 1)."""
+
+    if a == b:
+        return 0
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + cost,
+            )
+
+            if (
+                i > 1 and j > 1
+                and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+            ):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+
+        previous_previous, previous = previous, current
+
+    return previous[-1]
+
+
+def _deletes(value, depth):
+    """All strings reachable from `value` by deleting up to `depth` letters."""
+
+    found = {value}
+    frontier = {value}
+
+    for _ in range(depth):
+        frontier = {
+            word[:i] + word[i + 1:]
+            for word in frontier
+            for i in range(len(word))
+        }
+        found |= frontier
+
+    return found
+
+
+# ============================================================
+# LOOKUP TABLES (BUILT ONCE AT IMPORT)
+# ============================================================
+
+def _build_skeleton_index():
+    index = {}
+
+    for canonical in CANONICAL_NAKSHATRAS:
+        for spelling in [canonical] + KNOWN_VARIANTS.get(canonical, []):
+            index.setdefault(skeleton(spelling), canonical)
+
+    return index
+
+
+def _build_delete_index(keys):
+    index = {}
+
+    for key in keys:
+        for variant in _deletes(key, MAX_DISTANCE):
+            index.setdefault(variant, set()).add(key)
+
+    return index
+
+
+SKELETON_INDEX = _build_skeleton_index()
+
+DELETE_INDEX = _build_delete_index(SKELETON_INDEX)
+
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+
+def fuzzy_match(key):
+    """
+    Closest canonical nakshatra for a skeleton within MAX_DISTANCE, or
+    None when the key is too short, nothing is close enough or two
+    different nakshatras are equally close.
+    """
+    if len(key) < FUZZY_MIN_LENGTH:
+        return None
+
+    candidates = set()
+    for variant in _deletes(key, MAX_DISTANCE):
+        candidates |= DELETE_INDEX.get(variant, set())
+
+    best_distance = MAX_DISTANCE + 1
+    best = set()
+
+    for candidate in candidates:
+
+        # A typo keeps the first letter and (about) the length; a known
+        # spelling plus a suffix is another word ("Chitran")
+        if (
+            candidate[0] != key[0]
+            or abs(len(candidate) - len(key)) > 1
+            or key.startswith(candidate)
+        ):
+            continue
+
+        distance = edit_distance(key, candidate)
+
+        if distance > MAX_DISTANCE:
+            continue
+
+        if distance < best_distance:
+            best_distance = distance
+            best = {SKELETON_INDEX[candidate]}
+        elif distance == best_distance:
+            best.add(SKELETON_INDEX[candidate])
+
+    if len(best) == 1:
+        return best.pop()
+
+    return None
+
+
+@lru_cache(maxsize=4096)
+def exact_nakshatra(value):
+    """
+    Canonical nakshatra name for a known spelling (canonical name or a
+    KNOWN_VARIANTS entry, up to the skeleton rules), or None. No typo
+    tolerance: used where a wrong guess would delete or hide rows.
+    """
+    if not value:
+        return None
+
+    return SKELETON_INDEX.get(skeleton(str(value)))
+
+
+@lru_cache(maxsize=4096)
+def normalize_nakshatra(value):
+    """
+    Canonical nakshatra name for a raw input, or None if it cannot be
+    recognised. Tries an exact skeleton match first, then fuzzy.
+    """
+    if not value:
+        return None
+
+    key = skeleton(str(value))
+
+    if not key:
+        return None
+
+    if key in SKELETON_INDEX:
+        return SKELETON_INDEX[key]
+
+    return fuzzy_match(key)
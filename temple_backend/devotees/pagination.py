@@ -0,0 +1,40 @@
+# ============================================================
+# KEYSET (CURSOR) PAGINATION
+# ============================================================
+#
+# Cursor pagination never uses OFFSET over the whole table: each page
+# starts from the position encoded in the cursor, so response time and
+# payload size stay constant as tables grow, and pages don't shift
+# when new rows are inserted while a client is paging.
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Newest-first pages ordered by (-created_at, -id).
+
+    With ?nakshatra= the scan is served by the (nakshatra, created_at)
+    index on Devotee; unfiltered lists use the (created_at, id) indexes.
+
+    ?ordering=name|-name|created_at|-created_at switches the sort key;
+    id is always appended as a tie-breaker. Views without a name column
+    narrow the choice with their own `ordering_fields`.
+    """
+
+    ordering = ("-created_at", "-id")
+    ordering_fields = ("name", "created_at")
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "MAX_PAGE_SIZE", 500)
+
+    def get_ordering(self, request, queryset, view):
+        requested = request.query_params.get("ordering", "").strip()
+
+        allowed = getattr(view, "ordering_fields", self.ordering_fields)
+
+        if requested.lstrip("-") not in allowed:
+            return self.ordering
+
+        tie_breaker = "-id" if requested.startswith("-") else "id"
+        return (requested, tie_breaker)
@@ -0,0 +1,73 @@
+# ============================================================
+# BATCHED PURGES
+# ============================================================
+#
+# Large set deletes (a whole nakshatra, every duplicate / invalid)
+# are run as a series of bounded DELETE ... WHERE id IN (...) batches
+# in id order, one transaction per batch. Memory stays flat, row locks
+# are released after every batch, and registrations at the counter
+# keep going while a purge runs.
+#
+# QuerySet.delete() already takes the fast path when no signal
+# listeners or cascades apply to the model (Collector.can_fast_delete):
+# a batch is then a single DELETE without loading rows into Python.
+# Otherwise the collector handles the batch, so cascades still run,
+# but never on more than one batch.
+#
+# The counters are adjusted per batch by the rows the DELETE removed.
+
+from django.conf import settings
+from django.db import router, transaction
+
+from .stats import record_bulk_deleted
+
+
+PURGE_BATCH_SIZE = getattr(settings, "PURGE_BATCH_SIZE", 2000)
+
+
+def _delete_batch(model, ids, using):
+
+    batch = model._base_manager.using(using).filter(pk__in=ids)
+
+    _, per_model = batch.delete()
+    return per_model.get(model._meta.label, 0)
+
+
+def delete_batch(model, ids, nakshatra=""):
+    """
+    Delete the rows of `model` with the given ids in one transaction,
+    adjust the counters and return the number of rows deleted.
+    """
+    using = router.db_for_write(model)
+
+    with transaction.atomic(using=using):
+        removed = _delete_batch(model, ids, using)
+        record_bulk_deleted(model, removed, nakshatra)
+
+    return removed
+
+
+def purge(queryset, nakshatra="", batch_size=PURGE_BATCH_SIZE):
+    """
+    Delete every row of `queryset` in batches and return the number of
+    rows deleted. `nakshatra` is the counter to adjust for Devotee
+    purges (see stats.counter_key).
+    """
+    model = queryset.model
+    using = router.db_for_write(model)
+    ids = queryset.using(using).order_by("pk").values_list("pk", flat=True)
+
+    deleted = 0
+    last_pk = None
+
+    while True:
+        pending = ids if last_pk is None else ids.filter(pk__gt=last_pk)
+        batch = list(pending[:batch_size])
+
+        if not batch:
+            break
+
+        last_pk = batch[-1]
+        deleted += delete_batch(model, batch, nakshatra)
+
+    return deleted
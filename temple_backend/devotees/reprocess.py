@@ -0,0 +1,118 @@
+# ============================================================
+# REPROCESS INVALID ENTRIES
+# ============================================================
+#
+# Re-runs every InvalidEntry through the current upload rules
+# (normalization engine included). Rows that now pass move to Devotee,
+# or to DuplicateEntry when the identity is already registered, with
+# the same set-based classification and bulk writes as bulk_upload.
+#
+# The table is walked in id order, one chunk per transaction, so
+# memory stays flat and the hot tables are never locked for long.
+# Moved rows keep their upload_batch, so rolling the upload back still
+# removes them. A real run is a background ReprocessJob (jobs.py).
+
+from django.db import transaction
+
+from .filters import filter_devotees
+from .ingestion import classify_rows, normalize_rows, write_rows
+from .models import InvalidEntry
+from .stats import record_bulk_deleted
+
+
+CHUNK_SIZE = 5000
+
+COLUMNS = ["id", "name", "countrycode", "phone", "nakshatra", "upload_batch_id"]
+
+
+def _identities(rows):
+    return set(zip(rows["name"], rows["countrycode"], rows["phone"], rows["nakshatra"]))
+
+
+def reprocess_invalids(dry_run=False, chunk_size=CHUNK_SIZE, on_progress=None, filters=None):
+    """
+    Move now-valid InvalidEntry rows out of the invalid table, or only
+    those matching the list `filters` (see filters.filter_devotees).
+
+    With dry_run=True nothing is written; the returned counts are what
+    a real run would do. on_progress(summary) is called after each
+    chunk.
+    """
+    import pandas as pd
+
+    summary = {
+        "scanned": 0,
+        "moved_to_devotees": 0,
+        "moved_to_duplicates": 0,
+        "still_invalid": 0,
+    }
+
+    # Identities a dry run would have created in earlier chunks
+    planned = set()
+
+    entries = filter_devotees(InvalidEntry.objects.all(), filters or {})
+
+    last_id = 0
+
+    while True:
+        chunk = list(
+            entries.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list(
+                "id", "name", "country_code", "phone", "nakshatra", "upload_batch_id"
+            )[:chunk_size]
+        )
+
+        if not chunk:
+            break
+
+        last_id = chunk[-1][0]
+
+        frame = pd.DataFrame(chunk, columns=COLUMNS).set_index("id")
+
+        rows = normalize_rows(frame)
+        rows["upload_batch_id"] = frame["upload_batch_id"]
+
+        valid, duplicates, invalid = classify_rows(rows)
+
+        if dry_run:
+            repeated = pd.Series(
+                [identity in planned for identity in zip(
+                    valid["name"], valid["countrycode"], valid["phone"], valid["nakshatra"]
+                )],
+                index=valid.index,
+                dtype=bool,
+            )
+            duplicates = pd.concat([duplicates, valid[repeated]])
+            valid = valid[~repeated]
+            planned |= _identities(valid)
+
+            written = {"created": len(valid), "duplicates": len(duplicates)}
+
+        else:
+            with transaction.atomic():
+
+                # Rows deleted since the chunk was read (e.g. their
+                # upload was rolled back) are not brought back
+                present = list(
+                    InvalidEntry.objects.select_for_update()
+                    .filter(id__in=valid.index.tolist() + duplicates.index.tolist())
+                    .values_list("id", flat=True)
+                )
+                valid = valid[valid.index.isin(present)]
+                duplicates = duplicates[duplicates.index.isin(present)]
+
+                written = write_rows(valid, duplicates, invalid.iloc[:0])
+
+                deleted, _ = InvalidEntry.objects.filter(id__in=present).delete()
+                record_bulk_deleted(InvalidEntry, deleted)
+
+        summary["scanned"] += len(chunk)
+        summary["moved_to_devotees"] += written["created"]
+        summary["moved_to_duplicates"] += written["duplicates"]
+        summary["still_invalid"] += len(invalid)
+
+        if on_progress is not None:
+            on_progress(summary)
+
+    return summary
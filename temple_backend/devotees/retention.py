@@ -0,0 +1,147 @@
+# ============================================================
+# RETENTION / ARCHIVAL OF DUPLICATE AND INVALID ENTRIES
+# ============================================================
+#
+# Every bulk upload adds DuplicateEntry / InvalidEntry rows that are
+# rarely looked at again. Rows older than RETENTION_DAYS are moved out
+# of the hot tables into gzip-compressed CSV files under ARCHIVE_DIR:
+#
+#   archive/duplicates/duplicates_20260101-20260630_20261001T020000.csv.gz
+#   archive/invalids/invalids_...csv.gz
+#
+# (first row date - cutoff date _ run timestamp, UTC). One file per
+# table per run, all model columns, UTC ISO timestamps. A file is never
+# overwritten: a second run in the same second (or a retry) gets a
+# numbered name, e.g. ..._20261001T020000_2.csv.gz.
+#
+# The old rows are walked in id order in batches. Each batch is written
+# and flushed to disk (fsync) before it is deleted from the table, so
+# a crash can at worst archive a batch twice, never lose it. Deletes
+# go through purge.delete_batch() and keep the StatCounter rows right.
+
+import csv
+import gzip
+import itertools
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import DuplicateEntry, InvalidEntry
+from .purge import PURGE_BATCH_SIZE, delete_batch
+
+
+RETENTION_DAYS = getattr(settings, "RETENTION_DAYS", 180)
+ARCHIVE_DIR = getattr(settings, "ARCHIVE_DIR", "archive")
+
+ARCHIVED_MODELS = {
+    "duplicates": DuplicateEntry,
+    "invalids": InvalidEntry,
+}
+
+
+def _format(value):
+    if isinstance(value, datetime):
+        return value.astimezone(dt_timezone.utc).isoformat()
+
+    return value
+
+
+class _Archive:
+    """gzip CSV file that is created on the first batch only."""
+
+    def __init__(self, table, fields, cutoff):
+        self.table = table
+        self.fields = fields
+        self.cutoff = cutoff
+        self.path = None
+        self.raw = None
+        self.handle = None
+        self.writer = None
+
+    def _open(self, first_created_at):
+        directory = Path(ARCHIVE_DIR) / self.table
+        directory.mkdir(parents=True, exist_ok=True)
+
+        stamp = timezone.now().strftime("%Y%m%dT%H%M%S")
+        span = f"{first_created_at:%Y%m%d}-{self.cutoff:%Y%m%d}"
+
+        name = f"{self.table}_{span}_{stamp}"
+
+        for attempt in itertools.count(1):
+            suffix = "" if attempt == 1 else f"_{attempt}"
+            self.path = directory / f"{name}{suffix}.csv.gz"
+
+            try:
+                self.raw = open(self.path, "xb")
+                break
+            except FileExistsError:
+                continue
+
+        self.handle = gzip.open(self.raw, "wt", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.handle)
+        self.writer.writerow(self.fields)
+
+    def write(self, rows, created_at_index):
+        if self.handle is None:
+            self._open(rows[0][created_at_index])
+
+        self.writer.writerows([_format(value) for value in row] for row in rows)
+
+        # Rows must be on disk before they leave the database
+        self.handle.flush()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.raw.close()
+
+
+def archive_old_entries(table, days=RETENTION_DAYS, batch_size=PURGE_BATCH_SIZE, dry_run=False):
+    """
+    Archive and delete `table` ("duplicates" / "invalids") rows created
+    more than `days` days ago. Returns a summary dict.
+    """
+    model = ARCHIVED_MODELS[table]
+    cutoff = timezone.now() - timedelta(days=days)
+
+    old = model.objects.filter(created_at__lt=cutoff)
+
+    if dry_run:
+        return {"table": table, "cutoff": cutoff, "archived": old.count(), "file": None}
+
+    fields = [field.attname for field in model._meta.concrete_fields]
+    pk_index = fields.index(model._meta.pk.attname)
+    created_at_index = fields.index("created_at")
+
+    rows = old.order_by("pk").values_list(*fields)
+    archive = _Archive(table, fields, cutoff)
+
+    archived = 0
+    last_pk = None
+
+    try:
+        while True:
+            pending = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+            batch = list(pending[:batch_size])
+
+            if not batch:
+                break
+
+            last_pk = batch[-1][pk_index]
+
+            archive.write(batch, created_at_index)
+            archived += delete_batch(model, [row[pk_index] for row in batch])
+    finally:
+        archive.close()
+
+    return {
+        "table": table,
+        "cutoff": cutoff,
+        "archived": archived,
+        "file": str(archive.path) if archive.path else None,
+    }
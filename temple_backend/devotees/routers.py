@@ -0,0 +1,94 @@
+# ============================================================
+# PRIMARY / READ-REPLICA DATABASE ROUTING
+# ============================================================
+#
+# With DATABASE_REPLICA_URL set, settings.DATABASES gets a "replica"
+# alias next to "default" (the primary) and this router is installed.
+#
+#   * writes, migrations and every query of a write request -> primary
+#   * GET / HEAD / OPTIONS requests (lists, stats, exports, the async
+#     read views)                                              -> replica
+#   * a user who wrote within REPLICA_STICKY_SECONDS           -> primary
+#     (read-your-writes; see ReplicaRoutingMiddleware)
+#
+# The choice is request scoped: the middleware sets a context variable
+# for the request (and while a streaming export is being sent), and
+# the router reads it. Code outside a request (management commands,
+# import jobs, cluster scans) always uses the primary, and so do reads
+# of other apps' tables (auth users, sessions): a login must never
+# fail because a new account has not reached the replica yet.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+PRIMARY_DB = "default"
+REPLICA_DB = "replica"
+
+REPLICATED_APPS = {"devotees"}
+
+STICKY_SECONDS = getattr(settings, "REPLICA_STICKY_SECONDS", 5)
+
+_read_db = ContextVar("read_db", default=None)
+
+
+def replica_configured():
+    return REPLICA_DB in settings.DATABASES
+
+
+@contextmanager
+def reading_from(alias):
+    """Route reads in this block (and this context) to `alias`."""
+
+    token = _read_db.set(alias)
+    try:
+        yield
+    finally:
+        _read_db.reset(token)
+
+
+# ============================================================
+# READ-YOUR-WRITES STICKINESS
+# ============================================================
+#
+# Stored in Django's cache, so it is shared between workers when
+# CACHES points at a shared backend (Redis / Memcached / database);
+# the default local-memory cache only covers the worker that wrote.
+
+def _sticky_key(user_id):
+    return f"replica-sticky:{user_id}"
+
+
+def mark_wrote(user_id):
+    cache.set(_sticky_key(user_id), True, STICKY_SECONDS)
+
+
+def recently_wrote(user_id):
+    return cache.get(_sticky_key(user_id), False)
+
+
+# ============================================================
+# ROUTER
+# ============================================================
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in REPLICATED_APPS:
+            return PRIMARY_DB
+
+        return _read_db.get() or PRIMARY_DB
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary, never migrated directly
+        return db == PRIMARY_DB
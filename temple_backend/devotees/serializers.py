@@ -1,18 +1,43 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Devotee, DuplicateEntry, InvalidEntry
 
+from .models import (
+    ClusterScan,
+    Devotee,
+    DuplicateCluster,
+    DuplicateEntry,
+    InvalidEntry,
+    ImportJob,
+    ReprocessJob,
+    UploadBatch,
+)
+from .normalization import normalize_nakshatra
 
-# ============================================================
-# 🔥 SAFE NORMALIZATION FUNCTION
-# ============================================================
 
-def normalize_string(value):
+DUPLICATE_MESSAGE = "This devotee is already registered under this Nakshatra."
+
+DUPLICATE_CONSTRAINT = "unique_devotee_per_nakshatra"
+
+
+def is_duplicate_error(error):
     """
-    Normalize string safely:
-    - lowercase
-    - remove spaces only
+    True when an IntegrityError comes from the one-devotee-per-nakshatra
+    constraint. MySQL and PostgreSQL name the constraint in the message;
+    SQLite lists its columns instead.
     """
-    return value.strip().lower().replace(" ", "")
+    message = str(error)
+
+    if DUPLICATE_CONSTRAINT in message:
+        return True
+
+    table = Devotee._meta.db_table
+    columns = ", ".join(
+        f"{table}.{Devotee._meta.get_field(name).column}"
+        for name in ["name", "country_code", "phone", "nakshatra"]
+    )
+
+    return f"UNIQUE constraint failed: {columns}" in message
 
 
 # ============================================================
@@ -21,11 +46,18 @@ def normalize_string(value):
 
 class DevoteeSerializer(serializers.ModelSerializer):
 
+    # Plain CharField so raw spellings reach validate_nakshatra
+    # (a ChoiceField would reject them before normalization)
+    nakshatra = serializers.CharField(max_length=50)
+
     class Meta:
         model = Devotee
-        fields = "__all__"
+        fields = ["id", "name", "country_code", "phone", "nakshatra", "created_at"]
         read_only_fields = ["created_at"]
 
+        # Uniqueness is left to the database constraint
+        validators = []
+
     # ------------------------------
     # NAME VALIDATION
     # ------------------------------
@@ -73,75 +105,49 @@ class DevoteeSerializer(serializers.ModelSerializer):
     # ------------------------------
     def validate_nakshatra(self, value):
 
-        input_normalized = normalize_string(value)
-
-        # 🔹 Explicit synonym handling FIRST (most important)
-        synonym_map = {
-            # ASWATHY variations
-            "aswathi": "ASWATHY",
-            "aswathy": "ASWATHY",
-
-            # BHARANI variations
-            "bharani": "BHARANI",
-            "barani": "BHARANI",
-        }
+        # Shared engine: synonyms, transliterations and typos
+        nakshatra = normalize_nakshatra(value)
 
-        if input_normalized in synonym_map:
-            return synonym_map[input_normalized]
+        if nakshatra is None:
+            raise serializers.ValidationError("Invalid Nakshatra selected.")
 
-        # 🔹 Direct match from model choices
-        normalized_map = {
-            normalize_string(choice[0]): choice[0].upper()
-            for choice in Devotee.NAKSHATRA_CHOICES
-        }
-
-        if input_normalized in normalized_map:
-            return normalized_map[input_normalized]
-
-        raise serializers.ValidationError("Invalid Nakshatra selected.")
+        return nakshatra
 
     # ------------------------------
-    # DUPLICATE PROTECTION (SAFE FOR UPDATE)
+    # DUPLICATE PROTECTION (DATABASE-ENFORCED)
     # ------------------------------
-    def validate(self, data):
+    # No pre-check query: the INSERT / UPDATE itself hits the
+    # unique_devotee_per_nakshatra constraint, which is also
+    # correct when two counters register the same devotee at once.
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic(savepoint=False):
+                return super().create(validated_data)
+        except IntegrityError as error:
+            if not is_duplicate_error(error):
+                raise
+            raise serializers.ValidationError({"duplicate": [DUPLICATE_MESSAGE]})
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic(savepoint=False):
+                return super().update(instance, validated_data)
+        except IntegrityError as error:
+            if not is_duplicate_error(error):
+                raise
+            raise serializers.ValidationError({"duplicate": [DUPLICATE_MESSAGE]})
 
-        name = data.get(
-            "name",
-            self.instance.name if self.instance else None
-        )
-        phone = data.get(
-            "phone",
-            self.instance.phone if self.instance else None
-        )
-        country_code = data.get(
-            "country_code",
-            self.instance.country_code if self.instance else None
-        )
-        nakshatra = data.get(
-            "nakshatra",
-            self.instance.nakshatra if self.instance else None
-        )
-
-        # Skip duplicate check if missing any field
-        if not all([name, phone, country_code, nakshatra]):
-            return data
-
-        queryset = Devotee.objects.filter(
-            name=name,
-            phone=phone,
-            country_code=country_code,
-            nakshatra=nakshatra
-        )
 
-        if self.instance:
-            queryset = queryset.exclude(id=self.instance.id)
-
-        if queryset.exists():
-            raise serializers.ValidationError({
-                "duplicate": "This devotee is already registered under this Nakshatra."
-            })
+# ============================================================
+# 📦 BATCH ITEM SERIALIZER (NO PER-ROW DB QUERIES)
+# ============================================================
 
-        return data
+class DevoteeBatchItemSerializer(DevoteeSerializer):
+    """
+    Field validation only. Batch endpoints resolve duplicates for all
+    items with one set-based lookup instead of a query per item.
+    """
 
 
 # ============================================================
@@ -151,7 +157,7 @@ class DevoteeSerializer(serializers.ModelSerializer):
 class DuplicateEntrySerializer(serializers.ModelSerializer):
     class Meta:
         model = DuplicateEntry
-        fields = "__all__"
+        exclude = ["upload_batch"]
         read_only_fields = ["created_at"]
 
 
@@ -162,5 +168,171 @@ class DuplicateEntrySerializer(serializers.ModelSerializer):
 class InvalidEntrySerializer(serializers.ModelSerializer):
     class Meta:
         model = InvalidEntry
-        fields = "__all__"
-        read_only_fields = ["created_at"]
\ No newline at end of file
+        exclude = ["upload_batch"]
+        read_only_fields = ["created_at"]
+
+
+# ============================================================
+# 📥 IMPORT JOB SERIALIZER (PROGRESS REPORTING)
+# ============================================================
+
+class ImportJobSerializer(serializers.ModelSerializer):
+
+    elapsed_seconds = serializers.SerializerMethodField()
+    rows_per_second = serializers.SerializerMethodField()
+    eta_seconds = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id",
+            "file_name",
+            "file_size",
+            "status",
+            "total_rows",
+            "rows_processed",
+            "resumed_after_rows",
+            "already_ingested",
+            "created_count",
+            "duplicate_count",
+            "invalid_count",
+            "upload_batch",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "elapsed_seconds",
+            "rows_per_second",
+            "eta_seconds",
+        ]
+        read_only_fields = fields
+
+    def get_elapsed_seconds(self, obj):
+        if not obj.started_at:
+            return None
+
+        end = obj.finished_at or timezone.now()
+        return round((end - obj.started_at).total_seconds(), 2)
+
+    def get_rows_per_second(self, obj):
+        elapsed = self.get_elapsed_seconds(obj)
+
+        if not elapsed:
+            return None
+
+        # Rows resumed from an earlier attempt took no time in this one
+        processed = max(obj.rows_processed - obj.resumed_after_rows, 0)
+
+        return round(processed / elapsed, 1)
+
+    def get_eta_seconds(self, obj):
+        if obj.status == ImportJob.STATUS_COMPLETED:
+            return 0
+
+        rate = self.get_rows_per_second(obj)
+
+        if not rate or obj.total_rows is None:
+            return None
+
+        remaining = max(obj.total_rows - obj.rows_processed, 0)
+        return round(remaining / rate, 1)
+
+
+# ============================================================
+# 📦 UPLOAD BATCH SERIALIZER
+# ============================================================
+
+class UploadBatchSerializer(serializers.ModelSerializer):
+
+    created_by = serializers.CharField(
+        source="created_by.username", default=None, read_only=True
+    )
+
+    class Meta:
+        model = UploadBatch
+        fields = [
+            "id",
+            "file_name",
+            "file_size",
+            "content_hash",
+            "status",
+            "created_count",
+            "duplicate_count",
+            "invalid_count",
+            "rows_committed",
+            "created_by",
+            "created_at",
+            "completed_at",
+            "rolled_back_at",
+        ]
+        read_only_fields = fields
+
+
+# ============================================================
+# 🧩 NEAR-DUPLICATE CLUSTER SERIALIZERS
+# ============================================================
+
+class DuplicateClusterSerializer(serializers.ModelSerializer):
+
+    members = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DuplicateCluster
+        fields = [
+            "id",
+            "nakshatra",
+            "phone_key",
+            "score",
+            "status",
+            "kept",
+            "merged_count",
+            "members",
+            "created_at",
+            "resolved_at",
+        ]
+        read_only_fields = fields
+
+    def get_members(self, obj):
+        # Uses the prefetched members, oldest registration first
+        devotees = sorted(
+            (member.devotee for member in obj.members.all()),
+            key=lambda devotee: (devotee.created_at, devotee.pk),
+        )
+        return DevoteeSerializer(devotees, many=True).data
+
+
+class ClusterScanSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ClusterScan
+        fields = [
+            "id",
+            "status",
+            "rows_scanned",
+            "blocks_compared",
+            "blocks_skipped",
+            "clusters_found",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class ReprocessJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReprocessJob
+        fields = [
+            "id",
+            "status",
+            "filters",
+            "scanned",
+            "moved_to_devotees",
+            "moved_to_duplicates",
+            "still_invalid",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
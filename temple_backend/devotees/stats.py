@@ -0,0 +1,227 @@
+# ============================================================
+# INCREMENTAL STAT COUNTERS
+# ============================================================
+#
+# /api/stats/ reads a handful of StatCounter rows instead of running
+# COUNT(*) over the devotee / duplicate / invalid tables. Every write
+# path adjusts the counters inside the same transaction as the data
+# change; `manage.py rebuild_stats` recomputes them if they drift.
+#
+# Each counter also carries a version that every write bumps, which
+# the list endpoints turn into ETags (see read_version).
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+
+from .models import Devotee, DuplicateEntry, InvalidEntry, StatCounter
+
+
+TABLE_FOR_MODEL = {
+    Devotee: StatCounter.TABLE_DEVOTEE,
+    DuplicateEntry: StatCounter.TABLE_DUPLICATE,
+    InvalidEntry: StatCounter.TABLE_INVALID,
+}
+
+
+def counter_key(model, nakshatra=""):
+    """(table, nakshatra) key for a row of `model`."""
+    if model is Devotee:
+        return (StatCounter.TABLE_DEVOTEE, nakshatra)
+
+    return (TABLE_FOR_MODEL[model], "")
+
+
+# ============================================================
+# ADJUSTING
+# ============================================================
+
+def _bump(table, nakshatra, delta):
+    return StatCounter.objects.filter(
+        table=table,
+        nakshatra=nakshatra,
+    ).update(
+        count=F("count") + delta,
+        version=F("version") + 1,
+        updated_at=timezone.now(),
+    )
+
+
+def _adjust(table, nakshatra, delta):
+
+    if _bump(table, nakshatra, delta):
+        return
+
+    try:
+        with transaction.atomic():
+            StatCounter.objects.create(
+                table=table,
+                nakshatra=nakshatra,
+                count=delta,
+                version=1,
+            )
+    except IntegrityError:
+        # Another writer created the row first
+        _bump(table, nakshatra, delta)
+
+
+def adjust_counts(deltas):
+    """
+    Apply a mapping of {(table, nakshatra): delta} to the counters.
+    Keys are applied in sorted order so concurrent writers lock the
+    counter rows in the same order. A zero delta (rows changed but
+    cancelled out) still bumps the version.
+    """
+    for (table, nakshatra), delta in sorted(deltas.items()):
+        _adjust(table, nakshatra, delta)
+
+
+def record_created(model, nakshatras):
+    """Count newly inserted rows of `model` (one nakshatra per row)."""
+    adjust_counts(
+        Counter(counter_key(model, nakshatra) for nakshatra in nakshatras)
+    )
+
+
+def record_deleted(model, nakshatras):
+    """Uncount deleted rows of `model` (one nakshatra per row)."""
+    deltas = Counter(counter_key(model, nakshatra) for nakshatra in nakshatras)
+    adjust_counts({key: -delta for key, delta in deltas.items()})
+
+
+def record_bulk_deleted(model, deleted, nakshatra=""):
+    """Uncount `deleted` rows removed by a set-based delete."""
+    if deleted:
+        adjust_counts({counter_key(model, nakshatra): -deleted})
+
+
+def record_updated(model, nakshatras):
+    """Bump versions for rows edited in place (counts unchanged)."""
+    adjust_counts({counter_key(model, nakshatra): 0 for nakshatra in nakshatras})
+
+
+# ============================================================
+# READING / REBUILDING
+# ============================================================
+
+def _stats_from_counters(counters):
+
+    by_nakshatra = {
+        choice[0]: 0 for choice in Devotee.NAKSHATRA_CHOICES
+    }
+    duplicates = 0
+    invalids = 0
+
+    for table, nakshatra, count in counters:
+        if table == StatCounter.TABLE_DEVOTEE:
+            by_nakshatra[nakshatra] = count
+        elif table == StatCounter.TABLE_DUPLICATE:
+            duplicates += count
+        elif table == StatCounter.TABLE_INVALID:
+            invalids += count
+
+    return {
+        "devotees": {
+            "total": sum(by_nakshatra.values()),
+            "by_nakshatra": by_nakshatra,
+        },
+        "duplicates": duplicates,
+        "invalids": invalids,
+    }
+
+
+def _counter_rows():
+    return StatCounter.objects.values_list("table", "nakshatra", "count")
+
+
+def read_stats():
+    return _stats_from_counters(_counter_rows())
+
+
+async def aread_stats():
+    return _stats_from_counters([row async for row in _counter_rows()])
+
+
+def _version_aggregate(model, nakshatra):
+    counters = StatCounter.objects.filter(table=TABLE_FOR_MODEL[model])
+
+    if nakshatra is not None:
+        counters = counters.filter(nakshatra=counter_key(model, nakshatra)[1])
+
+    return counters, {"version": Sum("version"), "last_modified": Max("updated_at")}
+
+
+def read_version(model, nakshatra=None):
+    """
+    (version, last_modified) for the rows of `model`, optionally
+    narrowed to one nakshatra. Any write to those rows changes it.
+    """
+    counters, aggregates = _version_aggregate(model, nakshatra)
+    result = counters.aggregate(**aggregates)
+
+    return result["version"] or 0, result["last_modified"]
+
+
+async def aread_version(model, nakshatra=None):
+    counters, aggregates = _version_aggregate(model, nakshatra)
+    result = await counters.aaggregate(**aggregates)
+
+    return result["version"] or 0, result["last_modified"]
+
+
+def compute_counts():
+    """Exact counts from the data tables, keyed like StatCounter rows."""
+
+    counts = {
+        (StatCounter.TABLE_DEVOTEE, row["nakshatra"]): row["total"]
+        for row in Devotee.objects.order_by()
+        .values("nakshatra")
+        .annotate(total=Count("id"))
+    }
+
+    counts[(StatCounter.TABLE_DUPLICATE, "")] = DuplicateEntry.objects.count()
+    counts[(StatCounter.TABLE_INVALID, "")] = InvalidEntry.objects.count()
+
+    return counts
+
+
+def rebuild_counts():
+    """
+    Reset drifted counters to exact values. Returns the counters
+    that had drifted as {(table, nakshatra): (stored, actual)}.
+    """
+    with transaction.atomic():
+
+        actual = compute_counts()
+
+        stored = {
+            (table, nakshatra): count
+            for table, nakshatra, count in StatCounter.objects
+            .select_for_update()
+            .values_list("table", "nakshatra", "count")
+        }
+
+        drift = {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in set(stored) | set(actual)
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
+
+        for (table, nakshatra), (_, count) in drift.items():
+            StatCounter.objects.update_or_create(
+                table=table,
+                nakshatra=nakshatra,
+                defaults={"count": count},
+            )
+
+        # Drift means rows changed behind the counters' back;
+        # invalidate every cached list as well
+        if drift:
+            StatCounter.objects.update(
+                version=F("version") + 1,
+                updated_at=timezone.now(),
+            )
+
+    return drift
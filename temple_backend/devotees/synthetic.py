@@ -0,0 +1,189 @@
+# ============================================================
+# SYNTHETIC DEVOTEE DATA
+# ============================================================
+#
+# Deterministic (seeded) generator of upload-shaped rows for load and
+# benchmark runs: Kerala-style names, Indian / Gulf / US phone numbers,
+# all 27 nakshatras with the spellings operators actually type, plus
+# configurable shares of duplicate and invalid rows.
+#
+# Rows are produced lazily, so 1M-row files and database loads run in
+# constant memory. The same seed always yields the same rows, which
+# keeps CSV, XLSX and database copies of a data set identical.
+
+import csv
+import random
+from collections import deque
+
+from .models import Devotee
+from .normalization import KNOWN_VARIANTS
+
+
+# Header as operators write it; normalize_columns() maps it
+UPLOAD_HEADER = ["Name", "Country Code", "Phone", "Nakshatra"]
+
+MALE_NAMES = [
+    "RAMESH", "SURESH", "RAJESH", "ANIL", "SUNIL", "VIJAYAN", "GOPALAKRISHNAN",
+    "UNNIKRISHNAN", "SREEKUMAR", "HARIDAS", "MOHANAN", "SASIDHARAN", "RAVINDRAN",
+    "NARAYANAN", "KRISHNAN", "BALAKRISHNAN", "SIVARAMAN", "JAYAN", "MANOJ",
+    "PRAKASH", "SANTHOSH", "BIJU", "SAJEEV", "ARJUN", "ADITHYAN", "ABHIJITH",
+    "VISHNU", "AKHIL", "ANANDU", "GOKUL", "HARIKRISHNAN", "SREENATH",
+]
+
+FEMALE_NAMES = [
+    "LAKSHMI", "SREEDEVI", "GEETHA", "SUSHAMA", "RADHA", "AMBIKA", "SARASWATHI",
+    "PARVATHY", "SINDHU", "BINDU", "DEEPA", "REKHA", "SREEJA", "ANJALI", "ARYA",
+    "GAYATHRI", "DEVIKA", "KAVYA", "MEERA", "NANDANA", "KRISHNENDU", "ATHIRA",
+    "REVATHY", "SUMA", "USHA", "VASANTHA", "INDIRA", "KAMALAM", "SATHYABHAMA",
+]
+
+FAMILY_NAMES = [
+    "NAIR", "MENON", "PILLAI", "KURUP", "WARRIER", "NAMBOODIRI", "NAMBIAR",
+    "PANICKER", "KAIMAL", "UNNITHAN", "VARMA", "POTTY", "EMBRANTHIRI",
+]
+
+FEMALE_SUFFIXES = ["AMMA", "KUTTY", "DEVI"]
+
+# (country code, share, national number length, leading digits)
+PHONE_PLANS = [
+    ("91", 0.86, 10, "6789"),
+    ("971", 0.05, 9, "5"),
+    ("966", 0.03, 9, "5"),
+    ("965", 0.02, 8, "569"),
+    ("1", 0.02, 10, "23456789"),
+    ("44", 0.02, 10, "7"),
+]
+
+UNKNOWN_NAKSHATRAS = ["SUNDAY", "NA", "NOT KNOWN", "ROHINIYA", "XYZ", "12"]
+
+# Duplicates repeat one of the most recent identities
+DUPLICATE_WINDOW = 10000
+
+
+# ============================================================
+# FIELD GENERATORS
+# ============================================================
+
+def _initial(rnd):
+    return rnd.choice("ABCGKMNPRSTUV")
+
+
+def make_name(rnd):
+    """'RAMESH K', 'K. RAMESH', 'GEETHA NAIR', 'SREEDEVI AMMA' ..."""
+
+    female = rnd.random() < 0.5
+    given = rnd.choice(FEMALE_NAMES if female else MALE_NAMES)
+    style = rnd.random()
+
+    if style < 0.35:
+        return f"{given} {_initial(rnd)}"
+    if style < 0.55:
+        return f"{_initial(rnd)}. {given}"
+    if style < 0.75:
+        return f"{given} {rnd.choice(FAMILY_NAMES)}"
+    if style < 0.85 and female:
+        return f"{given} {rnd.choice(FEMALE_SUFFIXES)}"
+    if style < 0.95:
+        return f"{given} {_initial(rnd)} {_initial(rnd)}"
+
+    return given
+
+
+def make_phone(rnd):
+    """(country_code, phone) following the PHONE_PLANS mix."""
+
+    pick = rnd.random()
+    cumulative = 0.0
+
+    for code, share, length, leading in PHONE_PLANS:
+        cumulative += share
+        if pick < cumulative:
+            break
+
+    number = rnd.choice(leading) + "".join(
+        rnd.choice("0123456789") for _ in range(length - 1)
+    )
+
+    return code, number
+
+
+def make_nakshatra(rnd, canonical):
+    """The canonical name, or now and then a known local spelling."""
+
+    variants = KNOWN_VARIANTS.get(canonical, [])
+
+    if variants and rnd.random() < 0.15:
+        return rnd.choice(variants).title()
+
+    return canonical
+
+
+# ============================================================
+# ROW STREAM
+# ============================================================
+
+def generate_rows(count, duplicate_ratio=0.05, invalid_ratio=0.02, seed=42):
+    """
+    Yield `count` upload rows as (name, country_code, phone, nakshatra)
+    string tuples.
+    """
+    rnd = random.Random(seed)
+    nakshatras = [choice[0] for choice in Devotee.NAKSHATRA_CHOICES]
+    recent = deque(maxlen=DUPLICATE_WINDOW)
+
+    for _ in range(count):
+        pick = rnd.random()
+
+        if pick < invalid_ratio:
+            name = make_name(rnd)
+            country_code, phone = make_phone(rnd)
+            nakshatra = rnd.choice(nakshatras)
+
+            problem = rnd.random()
+            if problem < 0.4:
+                nakshatra = rnd.choice(UNKNOWN_NAKSHATRAS)
+            elif problem < 0.7:
+                phone = ""
+            else:
+                name = ""
+
+            yield name, country_code, phone, nakshatra
+            continue
+
+        if pick < invalid_ratio + duplicate_ratio and recent:
+            name, country_code, phone, canonical = rnd.choice(recent)
+            yield name, country_code, phone, make_nakshatra(rnd, canonical)
+            continue
+
+        name = make_name(rnd)
+        country_code, phone = make_phone(rnd)
+        canonical = rnd.choice(nakshatras)
+
+        recent.append((name, country_code, phone, canonical))
+
+        yield name, country_code, phone, make_nakshatra(rnd, canonical)
+
+
+# ============================================================
+# FILE WRITERS
+# ============================================================
+
+def write_csv(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(UPLOAD_HEADER)
+        writer.writerows(rows)
+
+
+def write_xlsx(rows, path):
+    from openpyxl import Workbook
+
+    # write_only streams rows to disk instead of holding the sheet
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Devotees")
+
+    sheet.append(UPLOAD_HEADER)
+    for row in rows:
+        sheet.append(list(row))
+
+    workbook.save(path)
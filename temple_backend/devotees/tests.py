@@ -1,3 +1,1630 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import ingestion, jobs, middleware, retention, views
+from .authentication import user_cache
+from .dedupe import scan_for_duplicates
+from .ingestion import ingest_file
+from .models import (
+    ClusterScan,
+    Devotee,
+    DuplicateCluster,
+    DuplicateClusterMember,
+    DuplicateEntry,
+    ImportJob,
+    InvalidEntry,
+    ReprocessJob,
+    StatCounter,
+    UploadBatch,
+)
+from .uploads import begin_upload, content_hash, release_upload, rollback_upload_batch
+from .normalization import exact_nakshatra, normalize_nakshatra
+from .purge import purge
+from .routers import PRIMARY_DB, REPLICA_DB, PrimaryReplicaRouter
+from .serializers import DUPLICATE_MESSAGE, DevoteeSerializer, ImportJobSerializer
+from .stats import read_stats, record_created
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+class APITestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("tester", password="secret")
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path, **extra):
+        return self.client.get(path, secure=True, **extra)
+
+    def post(self, path, data=None, **extra):
+        return self.client.post(path, data, format="json", secure=True, **extra)
+
+    def delete(self, path):
+        return self.client.delete(path, secure=True)
+
+
+UPLOAD_HEADER = "name,countrycode,phone,nakshatra\n"
+
+
+def csv_upload(rows, name="upload.csv"):
+    """Rows of (name, country code, phone, nakshatra) as a CSV upload."""
+
+    lines = [UPLOAD_HEADER] + [",".join(row) + "\n" for row in rows]
+
+    return SimpleUploadedFile(name, "".join(lines).encode(), content_type="text/csv")
+
+
+def sample_rows(count, start=0):
+    return [
+        (f"DEVOTEE {i}", "91", f"98{i:08d}", "ROHINI")
+        for i in range(start, start + count)
+    ]
+
+
+def xlsx_upload(rows, name="upload.xlsx"):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Name", "Country Code", "Phone", "Nakshatra"])
+
+    for row in rows:
+        sheet.append(list(row))
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+def stored_file(content=b"name,countrycode,phone,nakshatra\n"):
+    handle, path = tempfile.mkstemp(suffix=".csv")
+
+    with os.fdopen(handle, "wb") as destination:
+        destination.write(content)
+
+    return path
+
+
+# Worker threads close their connection; not inside a test transaction
+no_connection_close = mock.patch.multiple(
+    jobs,
+    connection=mock.DEFAULT,
+    close_old_connections=mock.DEFAULT,
+)
+
+
+def devotee(name="RAVI", phone="9876543210", nakshatra="ROHINI", country_code="91"):
+    row = Devotee.objects.create(
+        name=name,
+        country_code=country_code,
+        phone=phone,
+        nakshatra=nakshatra,
+    )
+    record_created(Devotee, [nakshatra])
+
+    return row
+
+
+# ============================================================
+# NAKSHATRA NORMALIZATION
+# ============================================================
+
+class NormalizeNakshatraTests(SimpleTestCase):
+
+    # Ordinary names / words that must never become a nakshatra
+    NOT_NAKSHATRAS = [
+        "Rohan", "Rohit", "Moon", "Kavitha", "Avatar", "Latha", "Hasan",
+        "Atom", "Anil", "Revanth", "Bharath", "Makkal", "Chitran", "Ravi",
+        "Sita", "Krishnan", "Lakshmi", "Anitha", "Mohan", "Radha", "Geetha",
+        "Usha", "Asha", "Uma", "Mala", "Pooja", "Hari", "Vishnu", "Kannan",
+        "Manoj", "Rahul", "", "123",
+    ]
+
+    SPELLINGS = {
+        "Ashwathy": "ASWATHY",
+        "aswathi": "ASWATHY",
+        "barani": "BHARANI",
+        "Thiruvadhira": "THIRUVATHIRA",
+        "Mrigashira": "MAKAYIRAM",
+        "Revathy": "REVATHI",
+        "makam": "MAKAM",
+        " Rohini ": "ROHINI",
+        "Visakham": "VISHAKHAM",
+        "Poorattathi": "POORURUTTATHI",
+    }
+
+    # One typo in a long enough spelling
+    TYPOS = {
+        "Thiruvathra": "THIRUVATHIRA",
+        "Uthradom": "UTHRADAM",
+        "Thrikkatta": "THRIKKETTA",
+        "Chathayum": "CHATHAYAM",
+    }
+
+    def test_names_and_words_are_not_matched(self):
+        for value in self.NOT_NAKSHATRAS:
+            with self.subTest(value=value):
+                self.assertIsNone(normalize_nakshatra(value))
+                self.assertIsNone(exact_nakshatra(value))
+
+    def test_known_spellings(self):
+        for value, expected in self.SPELLINGS.items():
+            with self.subTest(value=value):
+                self.assertEqual(normalize_nakshatra(value), expected)
+                self.assertEqual(exact_nakshatra(value), expected)
+
+    def test_typos_only_match_fuzzily(self):
+        for value, expected in self.TYPOS.items():
+            with self.subTest(value=value):
+                self.assertEqual(normalize_nakshatra(value), expected)
+                self.assertIsNone(exact_nakshatra(value))
+
+    def test_two_typos_are_rejected(self):
+        self.assertIsNone(normalize_nakshatra("Thiruvtra"))
+        self.assertIsNone(normalize_nakshatra("Revanth"))
+
+
+class NakshatraPathTests(APITestCase):
+
+    def test_delete_needs_a_known_spelling(self):
+        devotee(nakshatra="MOOLAM")
+
+        response = self.delete("/api/delete-nakshatra/Moon/")
+
+        self.assertEqual(response.data["deleted"], 0)
+        self.assertEqual(Devotee.objects.count(), 1)
+
+        response = self.delete("/api/delete-nakshatra/Mulam/")
+
+        self.assertEqual(response.data["deleted"], 1)
+
+    def test_filter_needs_a_known_spelling(self):
+        devotee(nakshatra="AVITTAM")
+
+        response = self.get("/api/devotees/?nakshatra=Avittam")
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response = self.get("/api/devotees/?nakshatra=Avitham")
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response = self.get("/api/devotees/?nakshatra=Kavitha")
+        self.assertEqual(len(response.data["results"]), 0)
+
+    def test_register_rejects_a_name_as_nakshatra(self):
+        response = self.post(
+            "/api/devotees/",
+            {"name": "Ravi", "country_code": "91", "phone": "9876543210", "nakshatra": "Rohan"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("nakshatra", response.data)
+
+
+# ============================================================
+# DUPLICATE REGISTRATION
+# ============================================================
+
+class DuplicateRegistrationTests(APITestCase):
+
+    RAVI = {"name": "Ravi", "country_code": "91", "phone": "9876543210", "nakshatra": "Rohini"}
+
+    def test_post_duplicate(self):
+        self.assertEqual(self.post("/api/devotees/", self.RAVI).status_code, 201)
+
+        response = self.post("/api/devotees/", self.RAVI)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["duplicate"], [DUPLICATE_MESSAGE])
+        self.assertEqual(Devotee.objects.count(), 1)
+
+    def test_put_duplicate(self):
+        devotee(name="RAVI", phone="9876543210")
+        sita = devotee(name="SITA", phone="9000000001")
+
+        response = self.client.put(f"/api/devotees/{sita.pk}/", self.RAVI, format="json", secure=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["duplicate"], [DUPLICATE_MESSAGE])
+
+        sita.refresh_from_db()
+        self.assertEqual(sita.name, "SITA")
+
+    def test_other_integrity_errors_are_not_duplicates(self):
+        serializer = DevoteeSerializer(data=self.RAVI)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        error = IntegrityError("FOREIGN KEY constraint failed")
+
+        with mock.patch("rest_framework.serializers.ModelSerializer.create", side_effect=error):
+            with self.assertRaises(IntegrityError):
+                serializer.save()
+
+
+# ============================================================
+# LIST SEARCH / FILTERS / ORDERING
+# ============================================================
+
+class ListFilterTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.ramesh = devotee(name="RAMESH", phone="9800000001")
+        self.suresh = devotee(name="SURESH KUMAR", phone="9800000002")
+        self.rama = devotee(name="RAMA", phone="9700000003", nakshatra="MAKAM")
+
+    def names(self, query):
+        response = self.get(f"/api/devotees/?{query}")
+
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(row["name"] for row in response.data["results"])
+
+    def test_search(self):
+        self.assertEqual(self.names("search=98"), ["RAMESH", "SURESH KUMAR"])
+        self.assertEqual(self.names("search=kumar"), ["SURESH KUMAR"])
+        self.assertEqual(self.names("search=ram"), ["RAMA", "RAMESH"])
+
+    def test_prefixes(self):
+        self.assertEqual(self.names("name_prefix=ram"), ["RAMA", "RAMESH"])
+        self.assertEqual(self.names("name_prefix=kumar"), [])
+        self.assertEqual(self.names("phone_prefix=97"), ["RAMA"])
+
+    def test_filters_combine(self):
+        self.assertEqual(self.names("name_prefix=ram&nakshatra=Rohini"), ["RAMESH"])
+
+    def test_created_date_range(self):
+        day = timezone.make_aware(datetime(2026, 3, 10, 23, 30))
+
+        Devotee.objects.filter(pk=self.ramesh.pk).update(created_at=day - timedelta(days=1))
+        Devotee.objects.filter(pk=self.suresh.pk).update(created_at=day)
+        Devotee.objects.filter(pk=self.rama.pk).update(created_at=day + timedelta(days=1))
+
+        self.assertEqual(self.names("created_from=2026-03-10&created_to=2026-03-10"), ["SURESH KUMAR"])
+        self.assertEqual(self.names("created_from=2026-03-10"), ["RAMA", "SURESH KUMAR"])
+        self.assertEqual(self.names("created_to=2026-03-10"), ["RAMESH", "SURESH KUMAR"])
+
+    def test_upload_batch(self):
+        batch, _ = begin_upload("upload.csv", 0, "hash")
+        Devotee.objects.filter(pk=self.rama.pk).update(upload_batch=batch)
+
+        self.assertEqual(self.names(f"upload_batch={batch.pk}"), ["RAMA"])
+
+    def test_bad_values_are_refused(self):
+        for query in ("created_from=10-03-2026", "created_to=soon", "upload_batch=x"):
+            with self.subTest(query=query):
+                self.assertEqual(self.get(f"/api/devotees/?{query}").status_code, 400)
+
+    def test_ordering_with_cursor(self):
+        for i in range(4):
+            devotee(name=f"BALU {i}", phone=f"96000000{i:02d}")
+
+        for ordering in ("name", "-name", "created_at", "-created_at"):
+            with self.subTest(ordering=ordering):
+                response = self.get(f"/api/devotees/?ordering={ordering}&page_size=2")
+                rows = list(response.data["results"])
+
+                while response.data["next"]:
+                    response = self.client.get(response.data["next"], secure=True)
+                    rows.extend(response.data["results"])
+
+                field = ordering.lstrip("-")
+                expected = sorted(
+                    Devotee.objects.values("id", field),
+                    key=lambda row: (row[field], row["id"]),
+                    reverse=ordering.startswith("-"),
+                )
+
+                self.assertEqual([row["id"] for row in rows], [row["id"] for row in expected])
+
+
+# ============================================================
+# STATS COUNTERS
+# ============================================================
+
+class StatsTests(APITestCase):
+
+    def register(self, name, phone, nakshatra="Rohini"):
+        return self.post(
+            "/api/devotees/",
+            {"name": name, "country_code": "91", "phone": phone, "nakshatra": nakshatra},
+        )
+
+    def stats(self):
+        response = self.get("/api/stats/")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+
+        return (
+            data["devotees"]["total"],
+            data["devotees"]["by_nakshatra"]["ROHINI"],
+            data["devotees"]["by_nakshatra"]["MAKAM"],
+            data["duplicates"],
+            data["invalids"],
+        )
+
+    def test_counters_follow_writes(self):
+        ravi = self.register("Ravi", "9000000001").data
+        self.register("Sita", "9000000002", nakshatra="Makam")
+        self.assertEqual(self.stats(), (2, 1, 1, 0, 0))
+
+        self.client.put(
+            f"/api/devotees/{ravi['id']}/",
+            {"name": "Ravi", "country_code": "91", "phone": "9000000001", "nakshatra": "Makam"},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(self.stats(), (2, 0, 2, 0, 0))
+
+        self.delete(f"/api/devotees/{ravi['id']}/")
+        self.assertEqual(self.stats(), (1, 0, 1, 0, 0))
+
+        # 3 new, 1 already registered, 1 invalid
+        rows = sample_rows(3) + [("SITA", "91", "9000000002", "MAKAM"), ("X", "91", "1", "Moon")]
+        response = self.client.post(
+            "/api/bulk-upload/", {"file": csv_upload(rows)}, format="multipart", secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stats(), (4, 3, 1, 1, 1))
+
+        self.delete("/api/delete-nakshatra/Rohini/")
+        self.delete("/api/delete-all-invalids/")
+        self.assertEqual(self.stats(), (1, 0, 1, 1, 0))
+
+    def test_rebuild_stats_repairs_drift(self):
+        self.register("Ravi", "9000000001")
+        DuplicateEntry.objects.create(name="RAVI", country_code="91", phone="9000000001", nakshatra="ROHINI")
+
+        StatCounter.objects.update(count=99)
+
+        out = io.StringIO()
+        call_command("rebuild_stats", stdout=out)
+
+        self.assertIn("DEVOTEE ROHINI: 99 -> 1", out.getvalue())
+        self.assertIn("Rebuilt 3 drifted counter(s).", out.getvalue())
+        self.assertEqual(self.stats(), (1, 1, 0, 1, 0))
+
+        out = io.StringIO()
+        call_command("rebuild_stats", stdout=out)
+
+        self.assertIn("All counters are accurate.", out.getvalue())
+
+
+# ============================================================
+# CSV EXPORT
+# ============================================================
+
+class ExportTests(APITestCase):
+
+    def test_filtered_export_streams_matching_rows(self):
+        for i in range(3):
+            devotee(name=f"RAVI {i}", phone=f"980000000{i}")
+        devotee(name="SITA", phone="9700000009", nakshatra="MAKAM")
+
+        response = self.get("/api/devotees/export.csv?nakshatra=Rohini&search=ravi")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn("ROHINI_", response["Content-Disposition"])
+
+        body = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(body)))
+
+        self.assertEqual(rows[0], ["id", "name", "country_code", "phone", "nakshatra", "created_at"])
+        self.assertEqual(len(rows) - 1, 3)
+        self.assertEqual({row[4] for row in rows[1:]}, {"ROHINI"})
+
+
+# ============================================================
+# FAST LIST PATH
+# ============================================================
+
+class FastListTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        devotee(name="RAVI", phone="9000000001")
+        devotee(name="SITA", phone="9000000002", nakshatra="MAKAM")
+        Devotee.objects.filter(name="SITA").update(
+            created_at=datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+        )
+
+        InvalidEntry.objects.create(name="R\u2028\u0939\u093f", phone="", nakshatra="Moon", reason="Invalid Nakshatra")
+
+    def assertSameBytes(self, path, viewset):
+        fast = self.get(path)
+
+        with mock.patch.object(views, "values_plan", return_value=None), \
+                mock.patch.object(viewset, "renderer_classes", [JSONRenderer]):
+            stock = self.get(path)
+
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, stock.content)
+
+        return fast.content
+
+    def test_fast_list_matches_the_serializer(self):
+        for time_zone in ["Asia/Kolkata", "UTC"]:
+            with self.subTest(time_zone=time_zone), self.settings(TIME_ZONE=time_zone):
+                devotees = self.assertSameBytes("/api/devotees/", views.DevoteeViewSet)
+                self.assertSameBytes("/api/devotees/?ordering=name", views.DevoteeViewSet)
+                invalids = self.assertSameBytes("/api/invalids/", views.InvalidEntryViewSet)
+
+                self.assertIn(b'"previous":null', devotees)
+                self.assertIn(b"\\u2028", invalids)
+
+        # Last run was in UTC
+        self.assertIn(b'"2024-01-02T03:04:05.678901Z"', devotees)
+
+
+# ============================================================
+# SQL PROFILING MIDDLEWARE
+# ============================================================
+
+@override_settings(SQL_PROFILING=True, SQL_PROFILING_N_PLUS_ONE_THRESHOLD=3)
+class SQLProfilingTests(APITestCase):
+
+    def profiled(self, queries):
+        def view(request):
+            for pk in range(queries):
+                Devotee.objects.filter(pk=pk).exists()
+            return HttpResponse()
+
+        return middleware.SQLProfilingMiddleware(view)(RequestFactory().get("/api/devotees/"))
+
+    def test_server_timing_header(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with self.assertLogs("devotees.sql", "INFO") as logs:
+            response = client.get("/api/devotees/", secure=True)
+
+        self.assertEqual(json.loads(logs.records[0].getMessage())["status"], 200)
+        self.assertRegex(
+            response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$'
+        )
+
+    def test_repeated_queries_are_flagged(self):
+        with self.assertLogs("devotees.sql", "INFO") as logs:
+            response = self.profiled(queries=2)
+
+        self.assertIn('desc="2 queries"', response["Server-Timing"])
+        self.assertEqual(logs.records[0].levelname, "INFO")
+
+        with self.assertLogs("devotees.sql", "WARNING") as logs:
+            self.profiled(queries=3)
+
+        report = json.loads(logs.records[0].getMessage())
+
+        self.assertEqual(report["queries"], 3)
+        self.assertEqual([shape["count"] for shape in report["n_plus_one"]], [3])
+        self.assertIn("devotees_devotee", report["n_plus_one"][0]["sql"])
+
+
+# ============================================================
+# BACKGROUND JOBS: ORPHAN RECOVERY
+# ============================================================
+
+class OrphanedJobTests(APITestCase):
+
+    def job(self, heartbeat_age, status=ImportJob.STATUS_RUNNING):
+        return ImportJob.objects.create(
+            file_name="upload.csv",
+            file_path=stored_file(),
+            status=status,
+            heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age),
+        )
+
+    def test_polling_fails_a_job_without_heartbeat(self):
+        job = self.job(heartbeat_age=3600)
+
+        response = self.get(f"/api/import-jobs/{job.pk}/")
+
+        self.assertEqual(response.data["status"], ImportJob.STATUS_FAILED)
+        self.assertEqual(response.data["error"], jobs.ORPHANED_ERROR)
+        self.assertFalse(os.path.exists(job.file_path))
+
+    def test_live_jobs_are_left_alone(self):
+        job = self.job(heartbeat_age=5, status=ImportJob.STATUS_PENDING)
+
+        response = self.get(f"/api/import-jobs/{job.pk}/")
+
+        self.assertEqual(response.data["status"], ImportJob.STATUS_PENDING)
+        self.assertTrue(os.path.exists(job.file_path))
+        os.remove(job.file_path)
+
+    def test_failed_job_deletes_its_file(self):
+        job = self.job(heartbeat_age=0, status=ImportJob.STATUS_PENDING)
+
+        with open(job.file_path, "wb") as handle:
+            handle.write(b"not,a,valid\nupload,file,here\n")
+
+        with no_connection_close:
+            jobs.run_import_job(job.pk)
+
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, ImportJob.STATUS_FAILED)
+        self.assertIn("Missing required columns", job.error)
+        self.assertFalse(os.path.exists(job.file_path))
+
+    def test_a_failed_job_is_not_started(self):
+        job = self.job(heartbeat_age=3600, status=ImportJob.STATUS_PENDING)
+        jobs.fail_stale_jobs()
+
+        with no_connection_close:
+            jobs.run_import_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.STATUS_FAILED)
+        self.assertIsNone(job.started_at)
+
+    def test_orphaned_scan_does_not_block_new_scans(self):
+        ClusterScan.objects.create(
+            status=ClusterScan.STATUS_RUNNING,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+
+        response = self.post("/api/duplicate-clusters/scan/")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(
+            ClusterScan.objects.filter(status=ClusterScan.STATUS_FAILED).count(), 1
+        )
+
+    def test_running_scan_still_blocks(self):
+        ClusterScan.objects.create(
+            status=ClusterScan.STATUS_RUNNING,
+            heartbeat_at=timezone.now(),
+        )
+
+        response = self.post("/api/duplicate-clusters/scan/")
+
+        self.assertEqual(response.status_code, 409)
+
+
+# ============================================================
+# UPLOAD BATCHES: LEASES AND RESUME
+# ============================================================
+
+class UploadLeaseTests(APITestCase):
+
+    def upload(self, file):
+        return self.client.post(
+            "/api/bulk-upload/", {"file": file}, format="multipart", secure=True
+        )
+
+    def partial_batch(self, rows, committed, heartbeat_age=None):
+        """Batch for `rows` with the first `committed` rows ingested."""
+
+        batch, _ = begin_upload("upload.csv", 0, content_hash(csv_upload(rows)))
+        ingest_file(csv_upload(rows[:committed]), upload_batch=batch)
+
+        if heartbeat_age is None:
+            release_upload(batch)
+        else:
+            UploadBatch.objects.filter(pk=batch.pk).update(
+                heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age)
+            )
+
+        return batch
+
+    def test_upload_in_progress_is_refused(self):
+        rows = sample_rows(10)
+        batch = self.partial_batch(rows, committed=4, heartbeat_age=5)
+
+        response = self.upload(csv_upload(rows))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["upload_batch"], batch.pk)
+        self.assertIsNone(response.data["import_job"])
+        self.assertEqual(Devotee.objects.count(), 4)
+
+    def test_stale_lease_is_taken_over_and_resumed(self):
+        rows = sample_rows(10)
+        batch = self.partial_batch(rows, committed=4, heartbeat_age=3600)
+
+        response = self.upload(csv_upload(rows))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["upload_batch"], batch.pk)
+        self.assertEqual(response.data["resumed_after_rows"], 4)
+        self.assertEqual(response.data["created"], 10)
+        self.assertEqual(response.data["duplicates"], 0)
+
+        batch.refresh_from_db()
+        self.assertIsNotNone(batch.completed_at)
+        self.assertIsNone(batch.heartbeat_at)
+
+    def test_failed_upload_releases_its_lease(self):
+        rows = sample_rows(10)
+
+        with mock.patch("devotees.views.ingest_file", side_effect=RuntimeError("boom")):
+            response = self.upload(csv_upload(rows))
+
+        self.assertEqual(response.status_code, 500)
+        self.assertIsNone(UploadBatch.objects.get().heartbeat_at)
+
+        response = self.upload(csv_upload(rows))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 10)
+
+    def test_orphaned_job_does_not_block_the_file(self):
+        rows = sample_rows(10)
+        batch = self.partial_batch(rows, committed=4, heartbeat_age=3600)
+
+        ImportJob.objects.create(
+            file_name="upload.csv",
+            status=ImportJob.STATUS_RUNNING,
+            upload_batch=batch,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+
+        response = self.client.post(
+            "/api/import-jobs/", {"file": csv_upload(rows)}, format="multipart", secure=True
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(
+            ImportJob.objects.filter(status=ImportJob.STATUS_FAILED).count(), 1
+        )
+
+    def import_job(self, rows, **data):
+        return self.client.post(
+            "/api/import-jobs/", {"file": csv_upload(rows), **data}, format="multipart", secure=True
+        )
+
+    def test_reupload_of_an_ingested_file(self):
+        rows = sample_rows(3)
+
+        self.assertEqual(self.upload(csv_upload(rows)).data["created"], 3)
+
+        response = self.import_job(rows)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["already_ingested"])
+        self.assertEqual(response.data["created_count"], 3)
+
+        response = self.import_job(rows, force="true")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(response.data["already_ingested"])
+
+    def test_file_is_ingested_again_once_its_rows_are_gone(self):
+        rows = sample_rows(3)
+        self.upload(csv_upload(rows))
+
+        self.delete("/api/delete-nakshatra/Rohini/")
+
+        response = self.import_job(rows)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(response.data["already_ingested"])
+        self.assertEqual(UploadBatch.objects.count(), 2)
+
+    def test_resumed_job_rate_counts_only_this_run(self):
+        job = ImportJob(
+            status=ImportJob.STATUS_RUNNING,
+            total_rows=204,
+            rows_processed=104,
+            resumed_after_rows=100,
+            started_at=timezone.now() - timedelta(seconds=10),
+        )
+
+        data = ImportJobSerializer(job).data
+
+        self.assertEqual(data["rows_per_second"], 0.4)
+        self.assertEqual(data["eta_seconds"], 250.0)
+
+    def test_sync_upload_is_marked_deprecated(self):
+        response = self.upload(csv_upload(sample_rows(2)))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Deprecation"], "true")
+        self.assertIn("/api/import-jobs/", response["Link"])
+
+    def test_rollback_removes_the_upload(self):
+        devotee(name="SITA", phone="9000000001")
+
+        rows = sample_rows(5) + [("SITA", "91", "9000000001", "ROHINI"), ("X", "91", "1", "Moon")]
+        response = self.upload(csv_upload(rows))
+        batch_id = response.data["upload_batch"]
+
+        self.assertEqual(Devotee.objects.count(), 6)
+
+        # A cluster kept on / containing an uploaded devotee
+        uploaded = Devotee.objects.get(name="DEVOTEE 0")
+        cluster = DuplicateCluster.objects.create(
+            nakshatra="ROHINI", phone_key=uploaded.phone, signature="x", score=1.0, kept=uploaded
+        )
+        DuplicateClusterMember.objects.create(cluster=cluster, devotee=uploaded)
+
+        response = self.post(f"/api/upload-batches/{batch_id}/rollback/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["deleted"], {"devotees": 5, "duplicates": 1, "invalids": 1})
+        self.assertEqual(Devotee.objects.count(), 1)
+        self.assertFalse(DuplicateClusterMember.objects.exists())
+
+        cluster.refresh_from_db()
+        self.assertIsNone(cluster.kept)
+
+        stats = read_stats()
+        self.assertEqual(
+            (stats["devotees"]["total"], stats["duplicates"], stats["invalids"]), (1, 0, 0)
+        )
+
+        response = self.post(f"/api/upload-batches/{batch_id}/rollback/")
+        self.assertEqual(response.status_code, 409)
+
+    def test_resumed_job_reports_whole_file_totals(self):
+        rows = sample_rows(10) + sample_rows(2)
+        batch = self.partial_batch(rows, committed=4)
+
+        job = jobs.create_import_job(csv_upload(rows), user=self.user)
+
+        with no_connection_close:
+            jobs.run_import_job(job.pk)
+
+        job.refresh_from_db()
+        batch.refresh_from_db()
+
+        self.assertEqual(job.status, ImportJob.STATUS_COMPLETED)
+        self.assertEqual(job.rows_processed, 12)
+        self.assertEqual(job.resumed_after_rows, 4)
+        self.assertEqual(
+            (job.created_count, job.duplicate_count, job.invalid_count),
+            (10, 2, 0),
+        )
+        self.assertEqual(
+            (batch.created_count, batch.duplicate_count, batch.invalid_count),
+            (10, 2, 0),
+        )
+        self.assertFalse(os.path.exists(job.file_path))
+
+
+# ============================================================
+# INGESTION: READ PATHS
+# ============================================================
+
+class ReadPathTests(TestCase):
+
+    # Blank interior rows, a whitespace-only row and one invalid row
+    ROWS = (
+        sample_rows(3)
+        + [(None, None, None, None), (None, None, None, None)]
+        + [("X", "91", "9811111111", "NOT A STAR")]
+        + [("  ", None, "", None)]
+        + sample_rows(3, start=3)
+        + sample_rows(1)
+    )
+
+    EXPECTED = {"created": 6, "duplicates": 1, "invalid": 1}
+
+    def ingest(self, upload, reader="csv", **options):
+        with mock.patch.object(ingestion, "CSV_READER", reader):
+            return ingest_file(upload, **options)
+
+    def csv_rows(self):
+        return [
+            tuple("" if cell is None else cell for cell in row)
+            for row in self.ROWS
+        ]
+
+    def ingest_on_every_path(self, make_upload, readers, **options):
+        """Summaries for each reader, read whole and streamed."""
+
+        for reader in readers:
+            for streaming in (False, True):
+                with self.subTest(reader=reader, streaming=streaming):
+                    summary = self.ingest(
+                        make_upload(),
+                        reader=reader,
+                        streaming_threshold=0 if streaming else 10**9,
+                        chunk_size=2,
+                        **options,
+                    )
+                    Devotee.objects.all().delete()
+
+                    yield summary
+
+    def test_xlsx_whole_and_streamed_agree(self):
+        results = list(self.ingest_on_every_path(
+            lambda: xlsx_upload(self.ROWS), readers=["csv"]
+        ))
+
+        self.assertEqual(results, [self.EXPECTED] * 2)
+
+    def test_csv_readers_agree(self):
+        results = list(self.ingest_on_every_path(
+            lambda: csv_upload(self.csv_rows()), readers=["csv", "pandas"]
+        ))
+
+        self.assertEqual(results, [self.EXPECTED] * 4)
+
+    def test_skip_rows_points_at_the_same_rows(self):
+        # Skips 3 valid rows and the invalid one (blank rows don't
+        # count); the repeated first row is new again, since each run
+        # starts from an empty table
+        expected = {"created": 4, "duplicates": 0, "invalid": 0}
+
+        results = list(self.ingest_on_every_path(
+            lambda: xlsx_upload(self.ROWS), readers=["csv"], skip_rows=4
+        )) + list(self.ingest_on_every_path(
+            lambda: csv_upload(self.csv_rows()), readers=["csv", "pandas"], skip_rows=4
+        ))
+
+        self.assertEqual(results, [expected] * 6)
+
+    def test_csv_reader_outlives_its_upload(self):
+        upload = csv_upload(sample_rows(4))
+
+        chunks = ingestion.iter_csv_rows(upload, chunk_size=2)
+        self.assertEqual(len(next(chunks)), 2)
+
+        # Upload closed first, generator collected afterwards
+        upload.close()
+        chunks.close()
+
+        # Closed while the upload is open: the upload stays usable
+        upload = csv_upload(sample_rows(4))
+
+        chunks = ingestion.iter_csv_rows(upload, chunk_size=2)
+        next(chunks)
+        chunks.close()
+
+        self.assertFalse(upload.closed)
+        upload.seek(0)
+        self.assertTrue(upload.read().startswith(UPLOAD_HEADER.encode()))
+
+
+# ============================================================
+# BATCH CREATE / UPDATE / CONVERT
+# ============================================================
+
+class BatchTests(APITestCase):
+
+    def batch(self, create=(), update=()):
+        return self.post("/api/devotees/batch/", {"create": list(create), "update": list(update)})
+
+    def statuses(self, results):
+        return [result["status"] for result in results]
+
+    def test_create_and_update(self):
+        ravi = devotee(phone="9000000001")
+
+        response = self.batch(
+            create=[
+                {"name": "Ravi", "country_code": "91", "phone": "9000000001", "nakshatra": "Rohini"},
+                {"name": "Sita", "country_code": "91", "phone": "9000000002", "nakshatra": "Makam"},
+                {"name": "Sita", "country_code": "91", "phone": "9000000003", "nakshatra": "Moon"},
+            ],
+            update=[{"id": ravi.pk, "nakshatra": "Bharani"}, {"id": 0}],
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.statuses(response.data["create"]), ["duplicate", "created", "invalid"])
+        self.assertEqual(self.statuses(response.data["update"]), ["updated", "not_found"])
+
+        ravi.refresh_from_db()
+        self.assertEqual(ravi.nakshatra, "BHARANI")
+
+        by_nakshatra = read_stats()["devotees"]["by_nakshatra"]
+        self.assertEqual((by_nakshatra["ROHINI"], by_nakshatra["BHARANI"], by_nakshatra["MAKAM"]), (0, 1, 1))
+
+    def test_convert(self):
+        devotee(phone="9000000001")
+        upload = UploadBatch.objects.create(file_name="upload.csv")
+
+        entries = [
+            InvalidEntry.objects.create(
+                name="Ravi", country_code="91", phone=phone, nakshatra=nakshatra,
+                reason="Invalid Nakshatra", upload_batch=upload,
+            )
+            for phone, nakshatra in [("9000000002", "Rohini"), ("9000000001", "Rohini"), ("9000000003", "Moon")]
+        ]
+
+        response = self.post("/api/invalids/convert/", {"items": [
+            entries[0].pk,
+            {"id": entries[1].pk},
+            {"id": entries[2].pk, "nakshatra": "Sun"},
+        ]})
+
+        self.assertEqual(self.statuses(response.data["results"]), ["created", "duplicate", "invalid"])
+        self.assertEqual(list(InvalidEntry.objects.values_list("pk", flat=True)), [entries[2].pk])
+        self.assertEqual(DuplicateEntry.objects.count(), 1)
+
+        stats = read_stats()
+        self.assertEqual((stats["devotees"]["total"], stats["duplicates"]), (2, 1))
+
+        # Converted rows stay part of their upload, so a rollback removes them
+        self.assertEqual(Devotee.objects.get(phone="9000000002").upload_batch, upload)
+        self.assertEqual(DuplicateEntry.objects.get().upload_batch, upload)
+
+    def test_merged_duplicates_keep_their_upload(self):
+        upload = UploadBatch.objects.create(file_name="upload.csv")
+
+        devotee(name="RAMESH KUMAR", phone="9876543210")
+        devotee(name="RAMESH K", phone="+91 98765 43210")
+        Devotee.objects.filter(name="RAMESH K").update(upload_batch=upload)
+
+        scan_for_duplicates()
+
+        response = self.post(
+            "/api/duplicate-clusters/merge/", {"items": [DuplicateCluster.objects.get().pk]}
+        )
+
+        self.assertEqual(self.statuses(response.data["results"]), ["merged"])
+        self.assertEqual(DuplicateEntry.objects.get().upload_batch, upload)
+
+    def test_malformed_update_items_are_reported_per_item(self):
+        ravi = devotee()
+
+        response = self.batch(update=[[ravi.pk], "x", 5, None, {"id": ravi.pk, "name": "Ravi K"}])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.statuses(response.data["update"]),
+            ["invalid", "invalid", "invalid", "invalid", "updated"],
+        )
+        self.assertIn("non_field_errors", response.data["update"][0]["errors"])
+
+    def test_malformed_convert_items_are_reported_per_item(self):
+        response = self.post("/api/invalids/convert/", {"items": [[1], {"a": 1}, True, 999]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.statuses(response.data["results"]),
+            ["invalid", "not_found", "invalid", "not_found"],
+        )
+
+    def test_swapping_phones_is_a_validation_error(self):
+        first = devotee(phone="9000000001")
+        second = devotee(phone="9000000002")
+
+        response = self.batch(update=[
+            {"id": first.pk, "phone": "9000000002"},
+            {"id": second.pk, "phone": "9000000001"},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.statuses(response.data["update"]), ["invalid", "invalid"])
+
+        first.refresh_from_db()
+        self.assertEqual(first.phone, "9000000001")
+
+    def test_moving_onto_a_row_kept_by_another_item(self):
+        first = devotee(phone="9000000001")
+        second = devotee(phone="9000000002")
+
+        response = self.batch(update=[
+            {"id": first.pk, "phone": "9000000002"},
+            {"id": second.pk, "name": "RAVI"},
+        ])
+
+        self.assertEqual(self.statuses(response.data["update"]), ["invalid", "updated"])
+
+    def test_two_items_moving_to_the_same_values(self):
+        first = devotee(phone="9000000001")
+        second = devotee(phone="9000000002")
+
+        response = self.batch(update=[
+            {"id": first.pk, "phone": "9000000003"},
+            {"id": second.pk, "phone": "9000000003"},
+            {"id": second.pk, "name": "Ravi K"},
+        ])
+
+        self.assertEqual(self.statuses(response.data["update"]), ["updated", "invalid", "invalid"])
+
+    def test_update_onto_a_created_row_is_a_duplicate(self):
+        first = devotee(phone="9000000001")
+
+        response = self.batch(
+            create=[{"name": "Ravi", "country_code": "91", "phone": "9000000002", "nakshatra": "Rohini"}],
+            update=[{"id": first.pk, "phone": "9000000002"}],
+        )
+
+        self.assertEqual(self.statuses(response.data["create"]), ["created"])
+        self.assertEqual(self.statuses(response.data["update"]), ["duplicate"])
+
+
+# ============================================================
+# RETENTION
+# ============================================================
+
+class RetentionTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        patcher = mock.patch.object(retention, "ARCHIVE_DIR", directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def old_duplicate(self, days=365):
+        entry = DuplicateEntry.objects.create(
+            name="RAVI", country_code="91", phone="9876543210", nakshatra="ROHINI"
+        )
+        record_created(DuplicateEntry, [entry.nakshatra])
+        DuplicateEntry.objects.filter(pk=entry.pk).update(
+            created_at=timezone.now() - timedelta(days=days)
+        )
+
+    def test_old_rows_are_archived_then_deleted(self):
+        self.old_duplicate()
+        self.old_duplicate(days=200)
+        self.old_duplicate(days=10)
+
+        summary = retention.archive_old_entries("duplicates", batch_size=1)
+
+        self.assertEqual(summary["archived"], 2)
+        self.assertEqual(DuplicateEntry.objects.count(), 1)
+        self.assertEqual(read_stats()["duplicates"], 1)
+
+        with gzip.open(summary["file"], "rt", encoding="utf-8", newline="") as handle:
+            rows = list(csv.DictReader(handle))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["phone"], "9876543210")
+
+    def test_runs_in_the_same_second_get_their_own_file(self):
+        now = timezone.now()
+
+        with mock.patch.object(retention.timezone, "now", return_value=now):
+            files = []
+
+            for _ in range(3):
+                self.old_duplicate()
+                summary = retention.archive_old_entries("duplicates")
+
+                self.assertEqual(summary["archived"], 1)
+                files.append(summary["file"])
+
+        self.assertEqual(len(set(files)), 3)
+        self.assertTrue(files[1].endswith("_2.csv.gz"))
+        self.assertTrue(all(os.path.exists(path) for path in files))
+
+
+# ============================================================
+# REPROCESSING INVALID ENTRIES
+# ============================================================
+
+class ReprocessTests(APITestCase):
+
+    def invalid(self, phone, nakshatra="Rohini", upload_batch=None):
+        return InvalidEntry.objects.create(
+            name="Ravi",
+            country_code="91",
+            phone=phone,
+            nakshatra=nakshatra,
+            reason="Invalid Nakshatra",
+            upload_batch=upload_batch,
+        )
+
+    def test_dry_run_answers_in_the_request(self):
+        self.invalid("9000000001")
+
+        response = self.post("/api/invalids/reprocess/", {"dry_run": True})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["moved_to_devotees"], 1)
+        self.assertEqual(InvalidEntry.objects.count(), 1)
+        self.assertFalse(ReprocessJob.objects.exists())
+
+    def test_reprocess_runs_as_a_job(self):
+        self.invalid("9000000001")
+        self.invalid("9000000002", nakshatra="Moon")
+
+        response = self.post("/api/invalids/reprocess/")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], ReprocessJob.STATUS_PENDING)
+
+        job_id = response.data["id"]
+
+        # Only one at a time
+        self.assertEqual(self.post("/api/invalids/reprocess/").status_code, 409)
+
+        with no_connection_close:
+            jobs.run_reprocess_job(job_id)
+
+        response = self.get(f"/api/reprocess-jobs/{job_id}/")
+
+        self.assertEqual(response.data["status"], ReprocessJob.STATUS_COMPLETED)
+        self.assertEqual(response.data["scanned"], 2)
+        self.assertEqual(response.data["moved_to_devotees"], 1)
+        self.assertEqual(response.data["still_invalid"], 1)
+
+    def test_reprocess_is_limited_to_the_list_filter(self):
+        self.invalid("9000000001")
+        self.invalid("9100000002")
+
+        response = self.post("/api/invalids/reprocess/", {"search": "90"})
+
+        self.assertEqual(response.data["filters"], {"search": "90"})
+
+        with no_connection_close:
+            jobs.run_reprocess_job(response.data["id"])
+
+        job = ReprocessJob.objects.get()
+
+        self.assertEqual((job.scanned, job.moved_to_devotees), (1, 1))
+        self.assertEqual(list(InvalidEntry.objects.values_list("phone", flat=True)), ["9100000002"])
+
+    def test_bad_filter_is_refused(self):
+        response = self.post("/api/invalids/reprocess/", {"created_from": "yesterday"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ReprocessJob.objects.exists())
+
+    def test_moved_rows_keep_their_upload(self):
+        batch, _ = begin_upload("upload.csv", 0, "hash")
+        self.invalid("9000000001", upload_batch=batch)
+        self.invalid("9000000002")
+
+        job = ReprocessJob.objects.create()
+
+        with no_connection_close:
+            jobs.run_reprocess_job(job.pk)
+
+        self.assertEqual(Devotee.objects.filter(upload_batch=batch).count(), 1)
+
+        _, deleted = rollback_upload_batch(batch.pk)
+
+        self.assertEqual(deleted["devotees"], 1)
+        self.assertEqual(Devotee.objects.count(), 1)
+
+
+# ============================================================
+# INGESTION: OVERLAPPING UPLOADS
+# ============================================================
+
+class InsertRaceTests(TestCase):
+
+    def ingest_losing_a_race(self, reader):
+        """
+        Ingest 5 rows while "another upload" commits row 2 between
+        the duplicate lookup and the insert.
+        """
+        lookup = ingestion.lookup_identities
+
+        def racing_lookup(identities, lock=False):
+            found = lookup(identities, lock=lock)
+
+            if not lock and not Devotee.objects.exists():
+                name, _, phone, _ = sample_rows(1, start=2)[0]
+                devotee(name=name, phone=phone)
+
+            return found
+
+        batch, _ = begin_upload("upload.csv", 0, f"hash-{reader}")
+
+        with mock.patch.object(ingestion, "CSV_READER", reader), \
+                mock.patch.object(ingestion, "lookup_identities", racing_lookup):
+            summary = ingest_file(csv_upload(sample_rows(5)), upload_batch=batch)
+
+        batch.refresh_from_db()
+
+        return summary, batch
+
+    def test_rows_registered_meanwhile_become_duplicates(self):
+        for reader in ("csv", "pandas"):
+            with self.subTest(reader=reader):
+                summary, batch = self.ingest_losing_a_race(reader)
+
+                self.assertEqual(summary, {"created": 4, "duplicates": 1, "invalid": 0})
+                self.assertEqual((batch.created_count, batch.duplicate_count), (4, 1))
+                self.assertEqual(Devotee.objects.count(), 5)
+                self.assertEqual(DuplicateEntry.objects.count(), 1)
+
+                stats = read_stats()
+                self.assertEqual((stats["devotees"]["total"], stats["duplicates"]), (5, 1))
+
+                Devotee.objects.all().delete()
+                DuplicateEntry.objects.all().delete()
+                StatCounter.objects.all().delete()
+
+
+# ============================================================
+# CONDITIONAL LISTS (ETAG / 304)
+# ============================================================
+
+class ConditionalListTests(APITestCase):
+
+    def test_list_is_not_modified_until_a_write(self):
+        self.post("/api/devotees/", {"name": "Ravi", "country_code": "91", "phone": "9000000001", "nakshatra": "Rohini"})
+
+        first = self.get("/api/devotees/")
+        etag = first["ETag"]
+
+        self.assertEqual(self.get("/api/devotees/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Another query string is another ETag
+        self.assertNotEqual(self.get("/api/devotees/?page=1")["ETag"], etag)
+
+        self.post("/api/devotees/", {"name": "Sita", "country_code": "91", "phone": "9000000002", "nakshatra": "Makam"})
+
+        response = self.get("/api/devotees/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_nakshatra_list_ignores_other_nakshatras(self):
+        ravi = self.post(
+            "/api/devotees/",
+            {"name": "Ravi", "country_code": "91", "phone": "9000000001", "nakshatra": "Rohini"},
+        ).data
+
+        etag = self.get("/api/devotees/?nakshatra=Rohini")["ETag"]
+
+        self.post("/api/devotees/", {"name": "Sita", "country_code": "91", "phone": "9000000002", "nakshatra": "Makam"})
+
+        response = self.get("/api/devotees/?nakshatra=Rohini", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.post("/api/devotees/batch/", {"update": [{"id": ravi["id"], "name": "Ravi K"}]})
+
+        response = self.get("/api/devotees/?nakshatra=Rohini", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+# ============================================================
+# PURGES
+# ============================================================
+
+class PurgeTests(APITestCase):
+
+    def test_purge_deletes_in_batches_and_keeps_counters(self):
+        for i in range(5):
+            devotee(phone=f"900000000{i}", nakshatra="ROHINI")
+        devotee(phone="9000000009", nakshatra="MAKAM")
+
+        deleted = purge(Devotee.objects.filter(nakshatra="ROHINI"), nakshatra="ROHINI", batch_size=2)
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(Devotee.objects.count(), 1)
+
+        by_nakshatra = read_stats()["devotees"]["by_nakshatra"]
+        self.assertEqual((by_nakshatra["ROHINI"], by_nakshatra["MAKAM"]), (0, 1))
+
+    def test_delete_all_duplicates(self):
+        for i in range(3):
+            DuplicateEntry.objects.create(name="RAVI", country_code="91", phone=f"900000000{i}", nakshatra="ROHINI")
+            record_created(DuplicateEntry, ["ROHINI"])
+
+        response = self.delete("/api/delete-all-duplicates/")
+
+        self.assertEqual(response.data["deleted"], 3)
+        self.assertFalse(DuplicateEntry.objects.exists())
+        self.assertEqual(read_stats()["duplicates"], 0)
+
+    def test_fast_deletes_do_not_load_rows(self):
+        for i in range(5):
+            DuplicateEntry.objects.create(name="RAVI", country_code="91", phone=f"900000000{i}", nakshatra="ROHINI")
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted = purge(DuplicateEntry.objects.all(), batch_size=2)
+
+        self.assertEqual(deleted, 5)
+
+        statements = [query["sql"] for query in queries if "devotees_duplicateentry" in query["sql"]]
+
+        # One DELETE per batch; only ids are ever selected
+        self.assertEqual(sum(sql.startswith("DELETE") for sql in statements), 3)
+        self.assertFalse(any('"devotees_duplicateentry"."name"' in sql for sql in statements))
+
+
+# ============================================================
+# NEAR-DUPLICATE CLUSTERS
+# ============================================================
+
+class DedupeTests(APITestCase):
+
+    def test_scan_and_merge(self):
+        kept = devotee(name="RAMESH KUMAR", phone="9876543210")
+        devotee(name="RAMESH K", phone="+91 98765 43210")
+        devotee(name="SURESH", phone="9876543210")
+
+        summary = scan_for_duplicates()
+
+        self.assertEqual(summary["clusters_found"], 1)
+
+        cluster = DuplicateCluster.objects.get()
+        response = self.post("/api/duplicate-clusters/merge/", {"items": [cluster.pk, cluster.pk + 1]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["merged", "not_found"],
+        )
+        self.assertEqual(response.data["results"][0]["kept"], kept.pk)
+
+        self.assertEqual(
+            sorted(Devotee.objects.values_list("name", flat=True)), ["RAMESH KUMAR", "SURESH"]
+        )
+        self.assertEqual(DuplicateEntry.objects.get().name, "RAMESH K")
+
+        stats = read_stats()
+        self.assertEqual((stats["devotees"]["total"], stats["duplicates"]), (2, 1))
+
+        # A merged cluster is not merged again
+        response = self.post("/api/duplicate-clusters/merge/", {"items": [cluster.pk]})
+        self.assertNotEqual(response.data["results"][0]["status"], "merged")
+
+
+# ============================================================
+# READ-REPLICA ROUTING
+# ============================================================
+
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        patcher = mock.patch.object(middleware, "replica_configured", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+
+    def request(self, method, user_id, status=200):
+        """Run a request through the middleware; returns the read aliases."""
+
+        seen = {}
+
+        def view(request):
+            seen["devotee"] = self.router.db_for_read(Devotee)
+            seen["user"] = self.router.db_for_read(User)
+            return HttpResponse(status=status)
+
+        request = getattr(self.factory, method)("/api/devotees/")
+
+        with mock.patch.object(middleware, "_token_user_id", return_value=user_id):
+            middleware.ReplicaRoutingMiddleware(view)(request)
+
+        return seen
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(
+            self.request("get", user_id=1),
+            {"devotee": REPLICA_DB, "user": PRIMARY_DB},
+        )
+
+    def test_writes_go_to_the_primary(self):
+        self.assertEqual(self.request("post", user_id=1)["devotee"], PRIMARY_DB)
+
+    def test_reads_after_a_write_stick_to_the_primary(self):
+        self.request("post", user_id=1)
+
+        self.assertEqual(self.request("get", user_id=1)["devotee"], PRIMARY_DB)
+
+        # Other users, and anonymous requests, still use the replica
+        self.assertEqual(self.request("get", user_id=2)["devotee"], REPLICA_DB)
+        self.assertEqual(self.request("get", user_id=None)["devotee"], REPLICA_DB)
+
+    def test_failed_writes_are_not_sticky(self):
+        self.request("post", user_id=1, status=400)
+
+        self.assertEqual(self.request("get", user_id=1)["devotee"], REPLICA_DB)
+
+    def test_stickiness_expires(self):
+        with mock.patch("devotees.routers.STICKY_SECONDS", 0.01):
+            self.request("post", user_id=1)
+
+        time.sleep(0.05)
+
+        self.assertEqual(self.request("get", user_id=1)["devotee"], REPLICA_DB)
+
+    def test_outside_a_request_reads_use_the_primary(self):
+        self.assertEqual(self.router.db_for_read(Devotee), PRIMARY_DB)
+
+
+# ============================================================
+# CACHED JWT USER LOOKUP
+# ============================================================
+
+class UserCacheTests(TestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+
+        self.user = User.objects.create_user("tester", password="secret")
+
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+
+    def get(self):
+        return self.client.get("/api/stats/", secure=True)
+
+    def counts(self):
+        stats = user_cache.stats()
+        return stats["size"], stats["hits"], stats["misses"]
+
+    def test_hits_and_misses_are_counted(self):
+        size, hits, misses = self.counts()
+
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.counts(), (1, hits, misses + 1))
+
+        with self.assertNumQueries(1):  # the stats read only
+            self.assertEqual(self.get().status_code, 200)
+
+        self.assertEqual(self.counts(), (1, hits + 1, misses + 1))
+
+    def test_password_change_drops_the_user(self):
+        self.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password("changed")
+            self.user.save()
+
+        self.assertEqual(self.counts()[0], 0)
+
+        # Loaded again, with the new password hash
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.counts()[0], 1)
+
+    def test_deactivated_user_is_refused(self):
+        self.assertEqual(self.get().status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_deleted_user_is_refused(self):
+        self.assertEqual(self.get().status_code, 200)
+
+        self.user.delete()
+
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_lookup_racing_an_invalidation_is_not_cached(self):
+        load = JWTAuthentication.get_user
+
+        def load_then_change(authenticator, token):
+            user = load(authenticator, token)
+
+            # The user is saved while the lookup is in flight
+            self.user.save()
+            return user
+
+        with mock.patch.object(JWTAuthentication, "get_user", load_then_change):
+            self.assertEqual(self.get().status_code, 200)
+
+        self.assertEqual(self.counts()[0], 0)
+
+    def test_stats_are_staff_only(self):
+        self.assertEqual(self.client.get("/api/auth-cache/", secure=True).status_code, 403)
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        user_cache.clear()
+
+        response = self.client.get("/api/auth-cache/", secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hit_rate", response.data)
+
+
+# ============================================================
+# ASYNC READ ENDPOINTS
+# ============================================================
+
+class AsyncViewTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("tester", password="secret")
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+        # Three rows share a timestamp, so the cursor must break ties on id
+        same_time = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            row = devotee(name=f"RAVI {i}", phone=f"900000000{i}")
+            if i < 3:
+                Devotee.objects.filter(pk=row.pk).update(created_at=same_time)
+
+    def get(self, path):
+        return self.async_client.get(
+            path, secure=True, headers={"Authorization": f"Bearer {self.token}"}
+        )
+
+    async def test_jwt_required(self):
+        for headers in [{}, {"Authorization": "Bearer not-a-token"}]:
+            with self.subTest(headers=headers):
+                response = await self.async_client.get("/api/async/devotees/", secure=True, headers=headers)
+
+                self.assertEqual(response.status_code, 401)
+                self.assertIn("Bearer", response["WWW-Authenticate"])
+
+        response = await self.get("/api/async/stats/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["devotees"]["total"], 5)
+
+    async def test_keyset_pages_cover_every_row_once(self):
+        expected = [
+            pk async for pk in Devotee.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        ]
+
+        seen = []
+        url = "/api/async/devotees/?page_size=2"
+
+        while url:
+            response = await self.get(url)
+            self.assertEqual(response.status_code, 200)
+
+            page = response.json()
+            self.assertIsNone(page["previous"])
+
+            seen.extend(row["id"] for row in page["results"])
+            url = page["next"]
+
+        self.assertEqual(seen, expected)
+
+    async def test_invalid_cursor(self):
+        response = await self.get("/api/async/devotees/?cursor=bm9wZQ")
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(SQL_PROFILING=True)
+    async def test_middleware_runs_in_async_mode(self):
+        with self.assertLogs("devotees.sql", "INFO") as logs:
+            response = await self.get("/api/async/devotees/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("queries", response["Server-Timing"])
+
+        # Queries run in the sync thread are recorded too
+        self.assertGreater(json.loads(logs.records[0].getMessage())["queries"], 0)
+
+    async def test_replica_routing_in_async_mode(self):
+        router = PrimaryReplicaRouter()
+        seen = {}
+
+        def view(request):
+            seen["devotee"] = router.db_for_read(Devotee)
+            return HttpResponse()
+
+        with mock.patch.object(middleware, "replica_configured", return_value=True), \
+                mock.patch.object(middleware, "_token_user_id", return_value=None):
+            routing = middleware.ReplicaRoutingMiddleware(sync_to_async(view))
+
+            self.assertTrue(iscoroutinefunction(routing))
+            await routing(RequestFactory().get("/api/devotees/"))
+
+        self.assertEqual(seen["devotee"], REPLICA_DB)
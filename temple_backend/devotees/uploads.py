@@ -0,0 +1,232 @@
+# ============================================================
+# UPLOAD BATCHES (TAGGING AND ROLLBACK)
+# ============================================================
+#
+# Every bulk upload / import job records an UploadBatch, and each
+# Devotee, DuplicateEntry and InvalidEntry row it writes points at it
+# through an indexed foreign key.
+#
+# Rolling a batch back removes all of its rows with the batched purge
+# (purge.py), per table (per nakshatra for Devotee, so the counters get
+# exact counts). Tables nothing points at are deleted without loading
+# rows; devotee batches go through Django's delete collector, so memory
+# stays bounded by PURGE_BATCH_SIZE. Rows pointing at the deleted
+# devotees (cluster memberships, kept devotees) are cleared first with
+# set-based statements, following each foreign key's on_delete.
+#
+# Uploads are fingerprinted with a streaming SHA-256 of the file bytes
+# (begin_upload):
+#   * same file already fully ingested, and its rows not all deleted
+#     since (purges, archiving) -> the original summary is returned and
+#     nothing is read or written again
+#   * same file being ingested right now (live lease) -> UploadInProgress
+#   * same file partly ingested (failed upload / import job) -> the
+#     upload continues in the same batch after batch.rows_committed
+#   * otherwise (or a rolled-back batch) -> a new batch
+#
+# Whoever ingests into a batch holds its lease (heartbeat_at, kept
+# fresh by heartbeats.py while the upload request / import job runs).
+# The lease is taken under a row lock, so two requests for the same
+# file can never both resume the batch; a lease whose holder died
+# goes stale after JOB_STALE_SECONDS and can be taken over.
+
+import hashlib
+
+from django.db import models, transaction
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.utils import timezone
+
+from .heartbeats import stale_cutoff
+from .models import Devotee, DuplicateEntry, ImportJob, InvalidEntry, UploadBatch
+from .purge import purge
+
+
+class RollbackError(Exception):
+    """Raised when a batch cannot be rolled back (HTTP 409)."""
+
+
+class UploadInProgress(Exception):
+    """Raised when the same file is already being ingested (HTTP 409)."""
+
+    def __init__(self, batch):
+        super().__init__("This file is already being uploaded")
+        self.batch = batch
+
+        # The import job ingesting it, if it isn't a direct upload
+        self.job = ImportJob.objects.filter(
+            upload_batch=batch,
+            status__in=[ImportJob.STATUS_PENDING, ImportJob.STATUS_RUNNING],
+        ).first()
+
+
+# ============================================================
+# FINGERPRINTING / RESUME
+# ============================================================
+
+def content_hash(file):
+    """SHA-256 hex digest of an uploaded file, read in chunks."""
+
+    digest = hashlib.sha256()
+
+    for block in file.chunks():
+        digest.update(block)
+
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def upload_summary(batch):
+    return {
+        "created": batch.created_count,
+        "duplicates": batch.duplicate_count,
+        "invalid": batch.invalid_count,
+    }
+
+
+def _lease_held(batch):
+    return batch.heartbeat_at is not None and batch.heartbeat_at >= stale_cutoff()
+
+
+def _owns_rows(batch):
+    return (
+        batch.devotees.exists()
+        or batch.duplicates.exists()
+        or batch.invalids.exists()
+    )
+
+
+def begin_upload(file_name, file_size, digest, user=None, force=False):
+    """
+    Batch to ingest a file into: (batch, already_ingested). A completed
+    earlier batch of the same content is returned as is while it still
+    owns rows; a partial one is resumed. `force` always starts a new
+    batch.
+
+    Unless already_ingested, the caller now holds the batch's lease and
+    must end with complete_upload or release_upload.
+    """
+    with transaction.atomic():
+
+        if not force:
+            batch = (
+                UploadBatch.objects.select_for_update()
+                .filter(content_hash=digest, status=UploadBatch.STATUS_ACTIVE)
+                .order_by("-created_at", "-id")
+                .first()
+            )
+
+            # Its rows were all deleted since: ingest the file again
+            if batch is not None and batch.completed_at is not None:
+                if _owns_rows(batch):
+                    return batch, True
+
+                batch = None
+
+            if batch is not None:
+                if _lease_held(batch):
+                    raise UploadInProgress(batch)
+
+                batch.heartbeat_at = timezone.now()
+                batch.save(update_fields=["heartbeat_at"])
+
+                return batch, False
+
+        batch = UploadBatch.objects.create(
+            file_name=file_name,
+            file_size=file_size or 0,
+            content_hash=digest,
+            created_by=user if user and user.is_authenticated else None,
+            heartbeat_at=timezone.now(),
+        )
+
+    return batch, False
+
+
+def complete_upload(batch):
+    UploadBatch.objects.filter(pk=batch.pk).update(
+        completed_at=timezone.now(),
+        heartbeat_at=None,
+    )
+    batch.refresh_from_db()
+
+
+def release_upload(batch):
+    """Give up the lease after a failed attempt (it can be resumed)."""
+
+    UploadBatch.objects.filter(pk=batch.pk).update(heartbeat_at=None)
+
+
+# ============================================================
+# ROLLBACK
+# ============================================================
+
+def _clear_references(model, rows):
+    """Apply on_delete for rows of other tables that point at `rows`."""
+
+    # Same relations Django's delete collector follows (hidden ones too)
+    for relation in get_candidate_relations_to_delete(model._meta):
+        field = relation.field
+        on_delete = field.remote_field.on_delete
+
+        related = relation.related_model._base_manager.filter(
+            **{f"{field.name}__in": rows}
+        )
+
+        if on_delete is models.CASCADE:
+            related.delete()
+        elif on_delete is models.SET_NULL:
+            related.update(**{field.name: None})
+        elif on_delete is not models.DO_NOTHING:
+            raise RollbackError(
+                f"Cannot roll back: {relation.related_model.__name__} "
+                f"references {model.__name__}"
+            )
+
+
+def _delete_devotees(batch):
+    rows = Devotee.objects.filter(upload_batch=batch)
+
+    _clear_references(Devotee, rows)
+
+    nakshatras = rows.order_by().values_list("nakshatra", flat=True).distinct()
+
+    deleted = 0
+
+    for nakshatra in sorted(nakshatras):
+        deleted += purge(rows.filter(nakshatra=nakshatra), nakshatra=nakshatra)
+
+    return deleted
+
+
+def _delete_entries(model, batch):
+    rows = model.objects.filter(upload_batch=batch)
+
+    _clear_references(model, rows)
+
+    return purge(rows)
+
+
+def rollback_upload_batch(batch_id):
+    """
+    Delete every row written by the batch, mark it ROLLED_BACK and
+    return (batch, {"devotees", "duplicates", "invalids"} deleted counts).
+    """
+    with transaction.atomic():
+
+        # Waits for an in-flight import chunk of this batch to commit
+        batch = UploadBatch.objects.select_for_update().get(pk=batch_id)
+
+        if batch.status != UploadBatch.STATUS_ACTIVE:
+            raise RollbackError(f"Upload batch is already {batch.status}")
+
+        deleted = {
+            "devotees": _delete_devotees(batch),
+            "duplicates": _delete_entries(DuplicateEntry, batch),
+            "invalids": _delete_entries(InvalidEntry, batch),
+        }
+
+        batch.status = UploadBatch.STATUS_ROLLED_BACK
+        batch.rolled_back_at = timezone.now()
+        batch.save(update_fields=["status", "rolled_back_at"])
+
+    return batch, deleted
@@ -1,14 +1,23 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import (
     DevoteeViewSet,
     DuplicateEntryViewSet,
     InvalidEntryViewSet,
+    DuplicateClusterViewSet,
+    UploadBatchViewSet,
     register,
     bulk_upload,
+    create_import,
+    import_job_status,
+    cluster_scan_status,
+    reprocess_job_status,
     delete_nakshatra_data,
     delete_all_duplicates,   # ✅ NEW
     delete_all_invalids,     # ✅ NEW
+    stats,
+    auth_cache_stats,
 )
 
 router = DefaultRouter()
@@ -22,12 +31,35 @@ router.register(r'duplicates', DuplicateEntryViewSet, basename='duplicate')
 # Invalids
 router.register(r'invalids', InvalidEntryViewSet, basename='invalid')
 
+# Near-duplicate review queue
+router.register(r'duplicate-clusters', DuplicateClusterViewSet, basename='duplicate-cluster')
+
+# Bulk uploads (list + rollback)
+router.register(r'upload-batches', UploadBatchViewSet, basename='upload-batch')
+
+export_csv = {"get": "export_csv"}
+
 urlpatterns = [
 
+    # Streaming CSV exports (same filters as the list endpoints)
+    path('devotees/export.csv', DevoteeViewSet.as_view(export_csv), name='devotee-export'),
+    path('duplicates/export.csv', DuplicateEntryViewSet.as_view(export_csv), name='duplicate-export'),
+    path('invalids/export.csv', InvalidEntryViewSet.as_view(export_csv), name='invalid-export'),
+
     path('register/', register, name='register-devotee'),
 
     path('bulk-upload/', bulk_upload, name='bulk-upload'),
 
+    # Background uploads (poll the job for progress)
+    path('import-jobs/', create_import, name='import-jobs'),
+    path('import-jobs/<int:job_id>/', import_job_status, name='import-job-detail'),
+
+    # Near-duplicate scan progress (started via duplicate-clusters/scan/)
+    path('cluster-scans/<int:scan_id>/', cluster_scan_status, name='cluster-scan-detail'),
+
+    # Reprocess progress (started via invalids/reprocess/)
+    path('reprocess-jobs/<int:job_id>/', reprocess_job_status, name='reprocess-job-detail'),
+
     path(
         'delete-nakshatra/<str:nakshatra_name>/',
         delete_nakshatra_data,
@@ -37,6 +69,21 @@ urlpatterns = [
     # ✅ NEW FAST DELETE APIs
     path('delete-all-duplicates/', delete_all_duplicates, name='delete-all-duplicates'),
     path('delete-all-invalids/', delete_all_invalids, name='delete-all-invalids'),
+
+    # Counts per nakshatra + duplicate / invalid totals
+    path('stats/', stats, name='stats'),
+
+    # Hit / miss counters of the JWT user cache (per process)
+    path('auth-cache/', auth_cache_stats, name='auth-cache'),
+
+    # Async read paths (run natively under temple_backend.asgi)
+    path('async/devotees/', async_views.devotee_list, name='async-devotee-list'),
+    path('async/duplicates/', async_views.duplicate_list, name='async-duplicate-list'),
+    path('async/invalids/', async_views.invalid_list, name='async-invalid-list'),
+    path('async/stats/', async_views.stats, name='async-stats'),
+    path('async/devotees/export.csv', async_views.devotee_export, name='async-devotee-export'),
+    path('async/duplicates/export.csv', async_views.duplicate_export, name='async-duplicate-export'),
+    path('async/invalids/export.csv', async_views.invalid_export, name='async-invalid-export'),
 ]
 
 urlpatterns += router.urls
@@ -2,62 +2,542 @@
 # IMPORTS
 # ============================================================
 
+from functools import wraps
+
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.decorators import action, api_view, permission_classes, parser_classes
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+from rest_framework.renderers import BrowsableAPIRenderer
 
 from django.contrib.auth.models import User
-from django.db import IntegrityError
-
-import pandas as pd
-
-from .models import Devotee, DuplicateEntry, InvalidEntry
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from .authentication import user_cache
+from .batch import MAX_BATCH_ITEMS, convert_invalids, create_devotees, update_devotees
+from .conditional import is_not_modified, list_etag, set_validators
+from .dedupe import dismiss_cluster, merge_clusters
+from .exports import stream_csv
+from .fastlist import FastJSONRenderer, values_plan
+from .filters import DevoteeQueryFilter, filter_devotees, filter_params, nakshatra_param
+from .heartbeats import beating
+from .ingestion import UploadError, ingest_file
+from .jobs import (
+    create_cluster_scan,
+    create_import_job,
+    create_reprocess_job,
+    fail_stale_jobs,
+)
+from .models import (
+    ClusterScan,
+    Devotee,
+    DuplicateCluster,
+    DuplicateEntry,
+    InvalidEntry,
+    ImportJob,
+    ReprocessJob,
+    UploadBatch,
+)
+from .normalization import exact_nakshatra
+from .purge import purge
+from .reprocess import reprocess_invalids
+from .uploads import (
+    RollbackError,
+    UploadInProgress,
+    begin_upload,
+    complete_upload,
+    content_hash,
+    release_upload,
+    rollback_upload_batch,
+    upload_summary,
+)
+from .stats import (
+    counter_key,
+    adjust_counts,
+    read_stats,
+    read_version,
+    record_created,
+    record_deleted,
+    record_updated,
+)
 from .serializers import (
+    ClusterScanSerializer,
     DevoteeSerializer,
+    DuplicateClusterSerializer,
     DuplicateEntrySerializer,
     InvalidEntrySerializer,
+    ImportJobSerializer,
+    ReprocessJobSerializer,
+    UploadBatchSerializer,
 )
 
 
+# ============================================================
+# STAT COUNTER MAINTENANCE (SHARED BY ALL VIEWSETS)
+# ============================================================
+
+class CounterMaintainedMixin:
+    """
+    Keeps StatCounter rows in step with single-row creates,
+    updates and deletes, in the same transaction as the write.
+    """
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            instance = serializer.save()
+            record_created(type(instance), [instance.nakshatra])
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old_nakshatra = serializer.instance.nakshatra
+            instance = serializer.save()
+            model = type(instance)
+
+            if old_nakshatra != instance.nakshatra:
+                adjust_counts({
+                    counter_key(model, old_nakshatra): -1,
+                    counter_key(model, instance.nakshatra): 1,
+                })
+            else:
+                record_updated(model, [instance.nakshatra])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            nakshatra = instance.nakshatra
+            instance.delete()
+            record_deleted(type(instance), [nakshatra])
+
+
+# ============================================================
+# CONDITIONAL GET ON LISTS (SHARED BY ALL VIEWSETS)
+# ============================================================
+
+class ConditionalListMixin:
+    """
+    List responses carry an ETag built from the table's StatCounter
+    version (per nakshatra with ?nakshatra=) and the full query string.
+    A matching If-None-Match gets 304 before any query or
+    serialization runs.
+    """
+
+    def list(self, request, *args, **kwargs):
+        model = self.queryset.model
+
+        nakshatra = nakshatra_param(request.query_params)
+        version, last_modified = read_version(model, nakshatra or None)
+
+        etag = list_etag(
+            model, version, request.get_full_path(), request.accepted_renderer.format
+        )
+
+        if is_not_modified(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+
+        return set_validators(response, etag, last_modified)
+
+
+# ============================================================
+# FAST LIST SERIALIZATION (SHARED BY ALL VIEWSETS)
+# ============================================================
+
+class FastListMixin:
+    """
+    JSON list pages are built from `.values()` rows instead of model
+    instances + ModelSerializer, with identical output bytes.
+    """
+
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request, *args, **kwargs):
+        plan = values_plan(self.get_serializer())
+
+        if plan is None or request.accepted_renderer.format != "json":
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values(*plan.fields)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.rows(page))
+
+        return Response(plan.rows(queryset))
+
+
+# ============================================================
+# STREAMING CSV EXPORT (SHARED BY ALL VIEWSETS)
+# ============================================================
+
+class CsvExportMixin:
+    """
+    GET <list>/export.csv streams the filtered list as CSV, using the
+    same query parameters as the list endpoint.
+    """
+
+    export_fields = []
+    export_name = ""
+
+    def export_csv(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by(
+            "-created_at", "-id"
+        )
+
+        label = request.query_params.get("nakshatra", "").strip().upper()
+        label = label or self.export_name
+        today = timezone.localdate().isoformat()
+
+        return stream_csv(queryset, self.export_fields, f"{label}_{today}.csv")
+
+
 # ============================================================
 # DEVOTEE VIEWSET
 # ============================================================
 
-class DevoteeViewSet(viewsets.ModelViewSet):
+class DevoteeViewSet(
+    CounterMaintainedMixin,
+    ConditionalListMixin,
+    FastListMixin,
+    CsvExportMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Devotee.objects.all().order_by("-created_at")
     serializer_class = DevoteeSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [DevoteeQueryFilter]
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        nakshatra = self.request.query_params.get("nakshatra")
+    export_fields = ["id", "name", "country_code", "phone", "nakshatra", "created_at"]
+    export_name = "ALL_DEVOTEES"
 
-        if nakshatra:
-            queryset = queryset.filter(nakshatra=nakshatra.upper())
+    # --------------------------------------------------------
+    # POST devotees/batch/  {"create": [...], "update": [...]}
+    # --------------------------------------------------------
+    @action(detail=False, methods=["post"], url_path="batch")
+    def batch(self, request):
 
-        return queryset
+        create = request.data.get("create", [])
+        update = request.data.get("update", [])
+
+        if not isinstance(create, list) or not isinstance(update, list):
+            return Response(
+                {"error": "'create' and 'update' must be lists"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(create) + len(update) > MAX_BATCH_ITEMS:
+            return Response(
+                {"error": f"A batch can contain at most {MAX_BATCH_ITEMS} items"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            with transaction.atomic():
+                created = create_devotees(create)
+                updated = update_devotees(update)
+        except IntegrityError:
+            return Response(
+                {"error": "Batch conflicts with a concurrent change, please retry"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(
+            {"create": created, "update": updated},
+            status=status.HTTP_200_OK,
+        )
 
 
 # ============================================================
 # DUPLICATE ENTRY VIEWSET
 # ============================================================
 
-class DuplicateEntryViewSet(viewsets.ModelViewSet):
+class DuplicateEntryViewSet(
+    CounterMaintainedMixin,
+    ConditionalListMixin,
+    FastListMixin,
+    CsvExportMixin,
+    viewsets.ModelViewSet,
+):
     queryset = DuplicateEntry.objects.all().order_by("-created_at")
     serializer_class = DuplicateEntrySerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [DevoteeQueryFilter]
+
+    export_fields = ["id", "name", "country_code", "phone", "nakshatra", "created_at"]
+    export_name = "ALL_DUPLICATES"
 
 
 # ============================================================
 # INVALID ENTRY VIEWSET
 # ============================================================
 
-class InvalidEntryViewSet(viewsets.ModelViewSet):
+class InvalidEntryViewSet(
+    CounterMaintainedMixin,
+    ConditionalListMixin,
+    FastListMixin,
+    CsvExportMixin,
+    viewsets.ModelViewSet,
+):
     queryset = InvalidEntry.objects.all().order_by("-created_at")
     serializer_class = InvalidEntrySerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [DevoteeQueryFilter]
+
+    export_fields = ["id", "name", "country_code", "phone", "nakshatra", "reason", "created_at"]
+    export_name = "ALL_INVALIDS"
+
+    # --------------------------------------------------------
+    # POST invalids/convert/  {"items": [id | {"id": ..., fields}]}
+    # --------------------------------------------------------
+    @action(detail=False, methods=["post"], url_path="convert")
+    def convert(self, request):
+
+        items = request.data.get("items", [])
+
+        if not isinstance(items, list):
+            return Response(
+                {"error": "'items' must be a list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(items) > MAX_BATCH_ITEMS:
+            return Response(
+                {"error": f"A batch can contain at most {MAX_BATCH_ITEMS} items"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            with transaction.atomic():
+                results = convert_invalids(items)
+        except IntegrityError:
+            return Response(
+                {"error": "Batch conflicts with a concurrent change, please retry"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    # --------------------------------------------------------
+    # POST invalids/reprocess/  {"dry_run": true, "search": ..., ...}
+    # (a real run is a background job; poll reprocess-jobs/<id>/)
+    # The list filters (?nakshatra=, ?search=, ...) limit the run;
+    # "Convert All" in the web app sends its current filter.
+    # --------------------------------------------------------
+    @action(detail=False, methods=["post"], url_path="reprocess")
+    def reprocess(self, request):
+
+        dry_run = str(
+            request.data.get("dry_run", request.query_params.get("dry_run", ""))
+        ).lower() in ("1", "true", "yes")
+
+        filters = filter_params({**request.query_params.dict(), **request.data})
+
+        # Bad dates / ids are a 400 now, not a failed job later
+        filter_devotees(InvalidEntry.objects.none(), filters)
+
+        if dry_run:
+            return Response(
+                {
+                    "message": "Dry run completed",
+                    "dry_run": True,
+                    "filters": filters,
+                    **reprocess_invalids(dry_run=True, filters=filters),
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        # A job orphaned by a restart must not block new ones
+        fail_stale_jobs()
+
+        running = ReprocessJob.objects.filter(
+            status__in=[ReprocessJob.STATUS_PENDING, ReprocessJob.STATUS_RUNNING]
+        ).first()
+
+        if running is not None:
+            return Response(
+                {"error": "Invalid entries are already being reprocessed", "job": running.pk},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        job = create_reprocess_job(user=request.user, filters=filters)
+
+        return Response(
+            ReprocessJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+# ============================================================
+# NEAR-DUPLICATE CLUSTERS (REVIEW + BULK MERGE)
+# ============================================================
+
+class DuplicateClusterViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = DuplicateClusterSerializer
+    permission_classes = [IsAuthenticated]
+    ordering_fields = ("created_at",)
+
+    def get_queryset(self):
+        queryset = DuplicateCluster.objects.prefetch_related("members__devotee")
+
+        # ?status=PENDING|MERGED|DISMISSED
+        cluster_status = self.request.query_params.get("status", "").strip().upper()
+        if cluster_status:
+            queryset = queryset.filter(status=cluster_status)
+
+        return queryset
+
+    # --------------------------------------------------------
+    # POST duplicate-clusters/scan/  (runs in the background)
+    # --------------------------------------------------------
+    @action(detail=False, methods=["post"], url_path="scan")
+    def scan(self, request):
+
+        # A scan orphaned by a restart must not block new ones
+        fail_stale_jobs()
+
+        running = ClusterScan.objects.filter(
+            status__in=[ClusterScan.STATUS_PENDING, ClusterScan.STATUS_RUNNING]
+        ).first()
+
+        if running is not None:
+            return Response(
+                {"error": "A scan is already running", "scan": running.pk},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        scan = create_cluster_scan(user=request.user)
+
+        return Response(
+            ClusterScanSerializer(scan).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    # --------------------------------------------------------
+    # POST duplicate-clusters/merge/  {"items": [id | {"id": ..., "keep": ...}]}
+    # --------------------------------------------------------
+    @action(detail=False, methods=["post"], url_path="merge")
+    def merge(self, request):
+
+        items = request.data.get("items", [])
+
+        if not isinstance(items, list):
+            return Response(
+                {"error": "'items' must be a list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(items) > MAX_BATCH_ITEMS:
+            return Response(
+                {"error": f"A batch can contain at most {MAX_BATCH_ITEMS} items"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            results = merge_clusters(items)
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    # --------------------------------------------------------
+    # POST duplicate-clusters/<id>/dismiss/  (not duplicates)
+    # --------------------------------------------------------
+    @action(detail=True, methods=["post"], url_path="dismiss")
+    def dismiss(self, request, pk=None):
+
+        cluster = self.get_object()
+
+        if cluster.status != DuplicateCluster.STATUS_PENDING:
+            return Response(
+                {"error": f"Cluster is already {cluster.status}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dismiss_cluster(cluster)
+
+        return Response(
+            DuplicateClusterSerializer(cluster).data,
+            status=status.HTTP_200_OK,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def cluster_scan_status(request, scan_id):
+
+    fail_stale_jobs()
+
+    scan = ClusterScan.objects.filter(pk=scan_id).first()
+
+    if scan is None:
+        return Response(
+            {"error": "Cluster scan not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response(ClusterScanSerializer(scan).data, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def reprocess_job_status(request, job_id):
+
+    fail_stale_jobs()
+
+    job = ReprocessJob.objects.filter(pk=job_id).first()
+
+    if job is None:
+        return Response(
+            {"error": "Reprocess job not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response(ReprocessJobSerializer(job).data, status=status.HTTP_200_OK)
+
+
+# ============================================================
+# UPLOAD BATCHES (LIST + ROLLBACK OF A WHOLE UPLOAD)
+# ============================================================
+
+class UploadBatchViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = UploadBatchSerializer
+    permission_classes = [IsAuthenticated]
+    ordering_fields = ("created_at",)
+
+    def get_queryset(self):
+        queryset = UploadBatch.objects.select_related("created_by")
+
+        # ?status=ACTIVE|ROLLED_BACK
+        batch_status = self.request.query_params.get("status", "").strip().upper()
+        if batch_status:
+            queryset = queryset.filter(status=batch_status)
+
+        return queryset
+
+    # --------------------------------------------------------
+    # POST upload-batches/<id>/rollback/  (removes every row of the upload)
+    # --------------------------------------------------------
+    @action(detail=True, methods=["post"], url_path="rollback")
+    def rollback(self, request, pk=None):
+
+        batch = self.get_object()
+
+        try:
+            batch, deleted = rollback_upload_batch(batch.pk)
+        except RollbackError as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(
+            {
+                "message": f"Upload '{batch.file_name}' rolled back",
+                "deleted": deleted,
+                "batch": UploadBatchSerializer(batch).data,
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 # ============================================================
@@ -110,12 +590,36 @@ def register(request):
 
 
 # ============================================================
-# BULK FILE UPLOAD
+# BULK FILE UPLOAD (DEPRECATED: USE import-jobs/)
 # ============================================================
+#
+# Ingests the file inside the request, so a large upload holds a
+# worker (and can hit the proxy timeout). The web app uses the
+# background import-jobs/ endpoint; this one stays for scripts and the
+# benchmark / load-test commands, and says so in its headers.
+
+def _deprecated(successor):
+    """Add Deprecation / successor Link headers (RFC 8594) to a view."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+
+            response["Deprecation"] = "true"
+            response["Link"] = f'<{reverse(successor)}>; rel="successor-version"'
+
+            return response
+
+        return wrapped
+
+    return decorator
+
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
+@_deprecated("import-jobs")
 def bulk_upload(request):
 
     file = request.FILES.get("file")
@@ -126,136 +630,145 @@ def bulk_upload(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    # force=true ingests the file even if it was uploaded before
+    force = str(request.data.get("force", "")).lower() in ("1", "true", "yes")
+
     try:
 
-        if file.name.endswith(".csv"):
-            df = pd.read_csv(file)
-        elif file.name.endswith(".xlsx"):
-            df = pd.read_excel(file, engine="openpyxl")
-        else:
+        batch, already_ingested = begin_upload(
+            file.name,
+            file.size,
+            content_hash(file),
+            user=request.user,
+            force=force,
+        )
+
+        # ✅ Same file again: answer with the original result
+        if already_ingested:
             return Response(
-                {"error": "Upload CSV or XLSX file only"},
-                status=status.HTTP_400_BAD_REQUEST,
+                {
+                    "message": "This file was already uploaded",
+                    "upload_batch": batch.pk,
+                    "already_uploaded": True,
+                    **upload_summary(batch),
+                },
+                status=status.HTTP_200_OK,
             )
 
-        df.columns = (
-            df.columns
-            .str.strip()
-            .str.lower()
-            .str.replace(" ", "")
+        resumed_after = batch.rows_committed
+
+        try:
+            # Holds the batch's lease while this request writes into it
+            with beating(UploadBatch, batch.pk):
+                ingest_file(file, upload_batch=batch, skip_rows=resumed_after)
+        except Exception:
+            release_upload(batch)
+            raise
+
+        complete_upload(batch)
+
+        return Response(
+            {
+                "message": "Bulk upload completed",
+                "upload_batch": batch.pk,
+                "resumed_after_rows": resumed_after,
+                **upload_summary(batch),
+            },
+            status=status.HTTP_200_OK,
         )
 
-        column_mapping = {}
+    except UploadInProgress as e:
+        return Response(
+            {
+                "error": str(e),
+                "upload_batch": e.batch.pk,
+                "import_job": e.job.pk if e.job else None,
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
 
-        for col in df.columns:
-            if col in ["name"]:
-                column_mapping[col] = "name"
-            elif col in ["countrycode", "country_code"]:
-                column_mapping[col] = "countrycode"
-            elif col in ["phone", "phoneno", "phonenumber"]:
-                column_mapping[col] = "phone"
-            elif col in ["nakshatra"]:
-                column_mapping[col] = "nakshatra"
+    except UploadError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
-        df = df.rename(columns=column_mapping)
+    except Exception as e:
+        return Response(
+            {"error": f"File processing error: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
 
-        required_columns = {"name", "countrycode", "phone", "nakshatra"}
 
-        if not required_columns.issubset(set(df.columns)):
-            return Response(
-                {"error": f"Missing required columns: {required_columns}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+# ============================================================
+# BACKGROUND IMPORT JOBS
+# ============================================================
 
-        valid_nakshatras = [
-            choice[0].upper() for choice in Devotee.NAKSHATRA_CHOICES
-        ]
-
-        created_count = 0
-        duplicate_count = 0
-        invalid_count = 0
-
-        for _, row in df.iterrows():
-
-            name = str(row.get("name", "")).strip().upper()
-            country_code = str(row.get("countrycode", "")).strip()
-            phone_raw = row.get("phone")
-            raw_nakshatra = str(row.get("nakshatra", "")).strip().lower()
-
-            phone = ""
-            if pd.notna(phone_raw):
-                try:
-                    phone = str(int(float(phone_raw)))
-                except:
-                    phone = str(phone_raw).strip()
-
-            if not name or not phone or not raw_nakshatra or not country_code:
-                InvalidEntry.objects.create(
-                    name=name,
-                    country_code=country_code,
-                    phone=phone,
-                    nakshatra=raw_nakshatra.upper(),
-                    reason="Missing required fields",
-                )
-                invalid_count += 1
-                continue
-
-            raw_nakshatra = raw_nakshatra.replace("shw", "sw")
-            formatted_nakshatra = raw_nakshatra.upper()
-
-            if formatted_nakshatra not in valid_nakshatras:
-                InvalidEntry.objects.create(
-                    name=name,
-                    country_code=country_code,
-                    phone=phone,
-                    nakshatra=formatted_nakshatra,
-                    reason="Invalid Nakshatra",
-                )
-                invalid_count += 1
-                continue
-
-            exists = Devotee.objects.filter(
-                name=name,
-                phone=phone,
-                country_code=country_code,
-                nakshatra=formatted_nakshatra,
-            ).exists()
-
-            if exists:
-                DuplicateEntry.objects.create(
-                    name=name,
-                    country_code=country_code,
-                    phone=phone,
-                    nakshatra=formatted_nakshatra,
-                )
-                duplicate_count += 1
-                continue
-
-            Devotee.objects.create(
-                name=name,
-                phone=phone,
-                country_code=country_code,
-                nakshatra=formatted_nakshatra,
-            )
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser, FormParser])
+def create_import(request):
+
+    file = request.FILES.get("file")
 
-            created_count += 1
+    if not file:
+        return Response(
+            {"error": "No file uploaded"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
+    if not file.name.endswith((".csv", ".xlsx")):
+        return Response(
+            {"error": "Upload CSV or XLSX file only"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    force = str(request.data.get("force", "")).lower() in ("1", "true", "yes")
+
+    try:
+        job = create_import_job(file, user=request.user, force=force)
+    except UploadInProgress as e:
         return Response(
             {
-                "message": "Bulk upload completed",
-                "created": created_count,
-                "duplicates": duplicate_count,
-                "invalid": invalid_count,
+                "error": str(e),
+                "upload_batch": e.batch.pk,
+                "import_job": e.job.pk if e.job else None,
             },
-            status=status.HTTP_200_OK,
+            status=status.HTTP_409_CONFLICT,
         )
-
     except Exception as e:
         return Response(
             {"error": f"File processing error: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
+    # Already-uploaded files come back as a finished job
+    return Response(
+        ImportJobSerializer(job).data,
+        status=(
+            status.HTTP_200_OK
+            if job.status == ImportJob.STATUS_COMPLETED
+            else status.HTTP_202_ACCEPTED
+        ),
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def import_job_status(request, job_id):
+
+    fail_stale_jobs()
+
+    job = ImportJob.objects.filter(pk=job_id).first()
+
+    if job is None:
+        return Response(
+            {"error": "Import job not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response(ImportJobSerializer(job).data, status=status.HTTP_200_OK)
+
 
 # ============================================================
 # DELETE ALL DEVOTEES UNDER A NAKSHATRA (FIXED SAFE VERSION)
@@ -265,12 +778,16 @@ def bulk_upload(request):
 @permission_classes([IsAuthenticated])
 def delete_nakshatra_data(request, nakshatra_name):
 
-    nakshatra_name = nakshatra_name.strip().lower()
-    nakshatra_name = nakshatra_name.replace("shw", "sw")
-    nakshatra_name = nakshatra_name.upper()
+    # Known spellings only: a near-miss must never pick a nakshatra
+    nakshatra_name = (
+        exact_nakshatra(nakshatra_name)
+        or nakshatra_name.strip().upper()
+    )
 
-    devotees = Devotee.objects.filter(nakshatra=nakshatra_name)
-    deleted_count = devotees.count()
+    deleted_count = purge(
+        Devotee.objects.filter(nakshatra=nakshatra_name),
+        nakshatra=nakshatra_name,
+    )
 
     # ✅ Return 200 even if nothing found
     if deleted_count == 0:
@@ -282,8 +799,6 @@ def delete_nakshatra_data(request, nakshatra_name):
             status=status.HTTP_200_OK,
         )
 
-    devotees.delete()
-
     return Response(
         {
             "message": f"{deleted_count} devotees deleted successfully",
@@ -301,8 +816,7 @@ def delete_nakshatra_data(request, nakshatra_name):
 @permission_classes([IsAuthenticated])
 def delete_all_duplicates(request):
 
-    deleted_count = DuplicateEntry.objects.count()
-    DuplicateEntry.objects.all().delete()
+    deleted_count = purge(DuplicateEntry.objects.all())
 
     return Response(
         {
@@ -321,8 +835,7 @@ def delete_all_duplicates(request):
 @permission_classes([IsAuthenticated])
 def delete_all_invalids(request):
 
-    deleted_count = InvalidEntry.objects.count()
-    InvalidEntry.objects.all().delete()
+    deleted_count = purge(InvalidEntry.objects.all())
 
     return Response(
         {
@@ -330,4 +843,24 @@ def delete_all_invalids(request):
             "deleted": deleted_count,
         },
         status=status.HTTP_200_OK,
-    )
\ No newline at end of file
+    )
+
+
+# ============================================================
+# STATS (COUNTS FROM THE SUMMARY TABLE)
+# ============================================================
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def stats(request):
+    return Response(read_stats(), status=status.HTTP_200_OK)
+
+
+# ============================================================
+# AUTH USER CACHE COUNTERS (THIS PROCESS)
+# ============================================================
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def auth_cache_stats(request):
+    return Response(user_cache.stats(), status=status.HTTP_200_OK)
@@ -48,6 +48,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # MUST be first
+    "devotees.middleware.SQLProfilingMiddleware",  # no-op unless SQL_PROFILING=True
+    "devotees.middleware.ReplicaRoutingMiddleware",  # no-op without a replica
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -64,18 +66,93 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "devotees.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    "DEFAULT_PAGINATION_CLASS": "devotees.pagination.CreatedAtCursorPagination",
+    "PAGE_SIZE": int(os.environ.get("PAGE_SIZE", 50)),
 }
 
+# Upper bound for ?page_size= on list endpoints
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", 500))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=6),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
 
+# Authenticated users are cached per process for this many seconds
+# (0 = look the user up on every request); invalidated on user saves
+AUTH_USER_CACHE_TTL = int(os.environ.get("AUTH_USER_CACHE_TTL", 60))
+AUTH_USER_CACHE_SIZE = int(os.environ.get("AUTH_USER_CACHE_SIZE", 1024))
+
+# ==================================================
+# BULK UPLOAD
+# ==================================================
+
+# Files above this size (bytes) are streamed and committed in chunks
+BULK_UPLOAD_STREAMING_THRESHOLD = int(
+    os.environ.get("BULK_UPLOAD_STREAMING_THRESHOLD", 5 * 1024 * 1024)
+)
+
+# Rows per streamed chunk
+BULK_UPLOAD_CHUNK_SIZE = int(os.environ.get("BULK_UPLOAD_CHUNK_SIZE", 5000))
+
+# CSV uploads: "csv" (stdlib reader, pandas never imported) or "pandas"
+BULK_UPLOAD_CSV_READER = os.environ.get("BULK_UPLOAD_CSV_READER", "csv")
+
+# Background import jobs (local thread pool, no broker)
+IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", 2))
+
+# Queued / running jobs are stamped every JOB_HEARTBEAT_SECONDS; after
+# JOB_STALE_SECONDS without one (worker restarted) they are failed
+JOB_HEARTBEAT_SECONDS = int(os.environ.get("JOB_HEARTBEAT_SECONDS", 30))
+JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", 300))
+IMPORT_UPLOAD_DIR = os.environ.get(
+    "IMPORT_UPLOAD_DIR", str(BASE_DIR / "import_uploads")
+)
+
+# Rows per DELETE batch for nakshatra / duplicate / invalid purges
+PURGE_BATCH_SIZE = int(os.environ.get("PURGE_BATCH_SIZE", 2000))
+
+# Duplicate / invalid entries older than this are moved to gzip CSV
+# archives by `manage.py archive_entries`
+RETENTION_DAYS = int(os.environ.get("RETENTION_DAYS", 180))
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", str(BASE_DIR / "archive"))
+
+# ==================================================
+# SQL PROFILING (OPT-IN)
+# ==================================================
+
+# Query count / DB time per request as a Server-Timing header and a
+# log line on "devotees.sql"; repeated query shapes are flagged (N+1)
+SQL_PROFILING = os.environ.get("SQL_PROFILING", "False") == "True"
+
+# Fraction of requests profiled (0.0 - 1.0)
+SQL_PROFILING_SAMPLE_RATE = float(os.environ.get("SQL_PROFILING_SAMPLE_RATE", 1.0))
+
+SQL_PROFILING_SLOWEST = int(os.environ.get("SQL_PROFILING_SLOWEST", 3))
+SQL_PROFILING_N_PLUS_ONE_THRESHOLD = int(
+    os.environ.get("SQL_PROFILING_N_PLUS_ONE_THRESHOLD", 10)
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "devotees.sql": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
 # ==================================================
 # CORS CONFIG  (FIXED)
 # ==================================================
@@ -104,12 +181,15 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+# Off only for local stand-ins (e.g. sqlite:/// URLs)
+DATABASE_SSL_REQUIRE = os.environ.get("DATABASE_SSL_REQUIRE", "True") == "True"
+
 if DATABASE_URL:
     DATABASES = {
         "default": dj_database_url.parse(
             DATABASE_URL,
             conn_max_age=600,
-            ssl_require=True
+            ssl_require=DATABASE_SSL_REQUIRE
         )
     }
 else:
@@ -127,6 +207,23 @@ else:
         }
     }
 
+# Optional read replica: list / stats / export reads go there, writes
+# and migrations stay on "default" (see devotees/routers.py)
+DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=600,
+        ssl_require=DATABASE_SSL_REQUIRE
+    )
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["devotees.routers.PrimaryReplicaRouter"]
+
+# After a write, the same user reads from the primary for this long
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+
 # ==================================================
 # TEMPLATES
 # ==================================================
@@ -19,6 +19,8 @@ function AddDevotee() {
   const [error, setError] = useState("");
   const [success, setSuccess] = useState("");
   const [loading, setLoading] = useState(false);
+  const [progress, setProgress] = useState("");
+  const [alreadyUploaded, setAlreadyUploaded] = useState(null);
 
   // ✅ CORRECTED SPELLINGS (MATCH BACKEND EXACTLY)
   const nakshatras = [
@@ -119,9 +121,11 @@ function AddDevotee() {
   };
 
   // ================= BULK UPLOAD =================
-  const handleBulkUpload = async () => {
+  // force=true ingests a file the server has seen before again
+  const handleBulkUpload = async (force = false) => {
     setError("");
     setSuccess("");
+    setAlreadyUploaded(null);
 
     if (!selectedFile) {
       setError("Please select a CSV or Excel file");
@@ -132,15 +136,24 @@ function AddDevotee() {
 
     const data = new FormData();
     data.append("file", selectedFile);
+    if (force) data.append("force", "true");
 
     try {
-      const response = await API.post("bulk-upload/", data);
-
-      setSuccess(
-        `Created: ${response.data.created} | Duplicates: ${response.data.duplicates} | Invalid: ${response.data.invalid}`
-      );
-
-      setSelectedFile(null);
+      // Upload is queued as a background import job
+      const response = await API.post("import-jobs/", data);
+      const job = await pollImportJob(response.data.id);
+
+      if (job.status === "FAILED") {
+        setError(job.error || "Bulk upload failed");
+      } else if (job.already_ingested) {
+        // Nothing was imported; the counts are the earlier upload's
+        setAlreadyUploaded(job);
+      } else {
+        setSuccess(
+          `Created: ${job.created_count} | Duplicates: ${job.duplicate_count} | Invalid: ${job.invalid_count}`
+        );
+        setSelectedFile(null);
+      }
 
     } catch (error) {
       if (error.response?.data?.error) {
@@ -149,10 +162,37 @@ function AddDevotee() {
         setError("Bulk upload failed");
       }
     } finally {
+      setProgress("");
       setLoading(false);
     }
   };
 
+  // ================= IMPORT JOB POLLING =================
+  // The server fails jobs whose worker died; the cap is a backstop
+  const POLL_INTERVAL_MS = 1500;
+  const MAX_POLL_ATTEMPTS = 1200; // ~30 minutes
+
+  const pollImportJob = async (jobId) => {
+    for (let attempt = 0; attempt < MAX_POLL_ATTEMPTS; attempt++) {
+      const { data: job } = await API.get(`import-jobs/${jobId}/`);
+
+      if (job.status === "COMPLETED" || job.status === "FAILED") {
+        return job;
+      }
+
+      const total = job.total_rows ? ` / ${job.total_rows}` : "";
+      const eta = job.eta_seconds != null ? ` | ETA: ${Math.ceil(job.eta_seconds)}s` : "";
+      setProgress(`Processed: ${job.rows_processed}${total}${eta}`);
+
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+    }
+
+    return {
+      status: "FAILED",
+      error: `Import #${jobId} is still running after 30 minutes. Check again later before re-uploading.`,
+    };
+  };
+
   // ================= LOGOUT =================
   const handleLogout = () => {
     localStorage.removeItem("access");
@@ -244,9 +284,29 @@ function AddDevotee() {
           />
         </div>
 
-        <button onClick={handleBulkUpload} disabled={loading}>
+        <button onClick={() => handleBulkUpload()} disabled={loading}>
           {loading ? "Uploading..." : "Upload File"}
         </button>
+
+        {progress && <p className="upload-progress">{progress}</p>}
+
+        {alreadyUploaded && (
+          <div className="error-box">
+            <p>
+              This file was already uploaded (Created: {alreadyUploaded.created_count} |
+              Duplicates: {alreadyUploaded.duplicate_count} | Invalid: {alreadyUploaded.invalid_count}).
+              Nothing was imported. Upload it again?
+            </p>
+
+            <button onClick={() => handleBulkUpload(true)} disabled={loading}>
+              Upload Again
+            </button>
+
+            <button onClick={() => setAlreadyUploaded(null)} disabled={loading}>
+              Cancel
+            </button>
+          </div>
+        )}
       </div>
 
       {error && <div className="error-box">{error}</div>}
@@ -1,13 +1,19 @@
 import { useParams } from "react-router-dom";
-import { useEffect, useState, useMemo } from "react";
+import { useEffect, useState } from "react";
 import { toast } from "react-toastify";
 import jsPDF from "jspdf";
 import autoTable from "jspdf-autotable";
-import * as XLSX from "xlsx";
 import { saveAs } from "file-saver";
 import API from "../services/api";
 import "./NakshatraTable.css";
 
+// Largest page the API serves (MAX_PAGE_SIZE); used to fetch every row
+const FULL_PAGE_SIZE = 500;
+
+// Convert All runs as a server job; the server fails jobs whose worker died
+const POLL_INTERVAL_MS = 1500;
+const MAX_POLL_ATTEMPTS = 1200; // ~30 minutes
+
 const NAKSHATRA_OPTIONS = [
   "ASWATHY","BHARANI","KARTHIKA","ROHINI","MAKAYIRAM","THIRUVATHIRA",
   "PUNARTHAM","POOYAM","AYILYAM","MAKAM","POORAM","UTHRAM",
@@ -22,6 +28,9 @@ function NakshatraTable({ type = "devotees" }) {
   const nakshatraName = name ? name.toUpperCase() : "";
 
   const [data, setData] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [converting, setConverting] = useState(false);
   const [searchTerm, setSearchTerm] = useState("");
   const [selectedNakshatra, setSelectedNakshatra] = useState("");
   const [editingId, setEditingId] = useState(null);
@@ -41,16 +50,33 @@ function NakshatraTable({ type = "devotees" }) {
 
   /* ================= FETCH ================= */
 
+  const buildParams = () => {
+    const params = {
+      ordering: `${sortOrder === "desc" ? "-" : ""}${sortField === "name" ? "name" : "created_at"}`,
+    };
+
+    const term = searchTerm.trim();
+    if (term) params.search = term;
+
+    if (isDevoteePage) params.nakshatra = nakshatraName;
+    else if (selectedNakshatra) params.nakshatra = selectedNakshatra;
+
+    return params;
+  };
+
+  const listEndpoint = () => {
+    if (isDuplicatePage) return "duplicates/";
+    if (isInvalidPage) return "invalids/";
+    return "devotees/";
+  };
+
   const fetchData = async () => {
     setFetchLoading(true);
     try {
-      let endpoint = "";
-      if (isDuplicatePage) endpoint = "duplicates/";
-      else if (isInvalidPage) endpoint = "invalids/";
-      else endpoint = `devotees/?nakshatra=${nakshatraName}`;
-
-      const response = await API.get(endpoint);
-      setData(response.data);
+      // Search, nakshatra filter and sorting are evaluated by the API
+      const response = await API.get(listEndpoint(), { params: buildParams() });
+      setData(response.data.results);
+      setNextPage(response.data.next);
     } catch {
       toast.error("Failed to fetch data");
     } finally {
@@ -59,43 +85,46 @@ function NakshatraTable({ type = "devotees" }) {
   };
 
   useEffect(() => {
-    fetchData();
-  }, [nakshatraName, type]);
-
-  /* ================= FILTER + SORT ================= */
+    // Debounce typing in the search box
+    const timer = setTimeout(fetchData, searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [nakshatraName, type, searchTerm, selectedNakshatra, sortField, sortOrder]);
 
-  const filteredData = useMemo(() => {
+  // Cursor pagination: `next` is an absolute URL from the API
+  const loadMore = async () => {
+    if (!nextPage) return;
 
-    let filtered = data.filter((item) => {
-      const matchSearch =
-        item.name?.toUpperCase().includes(searchTerm.toUpperCase()) ||
-        item.phone?.includes(searchTerm);
-
-      const matchNak =
-        !selectedNakshatra || item.nakshatra === selectedNakshatra;
+    setLoadingMore(true);
+    try {
+      const response = await API.get(nextPage);
+      setData((prev) => [...prev, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch {
+      toast.error("Failed to fetch more data");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
-      return matchSearch && matchNak;
+  // Every row matching the filter, not just the pages loaded so far
+  const fetchAllRows = async () => {
+    let response = await API.get(listEndpoint(), {
+      params: { ...buildParams(), page_size: FULL_PAGE_SIZE },
     });
+    const rows = [...response.data.results];
 
-    filtered.sort((a, b) => {
-      if (sortField === "name") {
-        return sortOrder === "asc"
-          ? a.name.localeCompare(b.name)
-          : b.name.localeCompare(a.name);
-      }
-
-      if (sortField === "date" && a.created_at && b.created_at) {
-        return sortOrder === "asc"
-          ? new Date(a.created_at) - new Date(b.created_at)
-          : new Date(b.created_at) - new Date(a.created_at);
-      }
+    while (response.data.next) {
+      response = await API.get(response.data.next);
+      rows.push(...response.data.results);
+    }
 
-      return 0;
-    });
+    return rows;
+  };
 
-    return filtered;
+  /* ================= FILTER + SORT ================= */
 
-  }, [data, searchTerm, selectedNakshatra, sortField, sortOrder]);
+  // Rows arrive already filtered and sorted from the API
+  const filteredData = data;
 
   /* ================= DOWNLOAD ================= */
 
@@ -109,10 +138,18 @@ function NakshatraTable({ type = "devotees" }) {
     return `${activeNakshatra}_${today}.${ext}`;
   };
 
-  const downloadPDF = () => {
+  const downloadPDF = async () => {
+    let allRows;
+    try {
+      allRows = await fetchAllRows();
+    } catch {
+      toast.error("PDF download failed");
+      return;
+    }
+
     const doc = new jsPDF();
 
-    const rows = filteredData.map((item, i) => [
+    const rows = allRows.map((item, i) => [
       i + 1,
       item.name,
       item.country_code,
@@ -130,17 +167,25 @@ function NakshatraTable({ type = "devotees" }) {
     toast.success(`PDF downloaded: ${fileName}`);
   };
 
-  const downloadCSV = () => {
-    const worksheet = XLSX.utils.json_to_sheet(filteredData);
-    const workbook = XLSX.utils.book_new();
-    XLSX.utils.book_append_sheet(workbook, worksheet, "Data");
+  const downloadCSV = async () => {
+    let endpoint = "";
+    if (isDuplicatePage) endpoint = "duplicates/export.csv";
+    else if (isInvalidPage) endpoint = "invalids/export.csv";
+    else endpoint = "devotees/export.csv";
 
-    const csv = XLSX.write(workbook, { bookType: "csv", type: "array" });
-    const blob = new Blob([csv], { type: "text/csv;charset=utf-8;" });
+    try {
+      // Server streams every matching row, not just the loaded pages
+      const response = await API.get(endpoint, {
+        params: buildParams(),
+        responseType: "blob",
+      });
 
-    const fileName = generateFileName("csv");
-    saveAs(blob, fileName);
-    toast.success(`CSV downloaded: ${fileName}`);
+      const fileName = generateFileName("csv");
+      saveAs(response.data, fileName);
+      toast.success(`CSV downloaded: ${fileName}`);
+    } catch {
+      toast.error("CSV download failed");
+    }
   };
 
   /* ================= DELETE ================= */
@@ -202,48 +247,87 @@ function NakshatraTable({ type = "devotees" }) {
 
   /* ================= CONVERT ================= */
 
+  // One batch request: valid rows become devotees, already-registered
+  // rows move to duplicates, and converted invalid entries are removed
+  const convertInvalids = async (items) => {
+    const response = await API.post("invalids/convert/", { items });
+    const results = response.data.results;
+
+    return {
+      created: results.filter((r) => r.status === "created").length,
+      duplicates: results.filter((r) => r.status === "duplicate").length,
+      failed: results.filter((r) => r.status === "invalid").length,
+    };
+  };
+
   const handleConvert = async (id) => {
     try {
-      await API.post("devotees/", {
-        name: editData.name.toUpperCase(),
-        country_code: editData.country_code,
-        phone: editData.phone,
-        nakshatra: editData.nakshatra.toUpperCase(),
-      });
+      const { created, duplicates } = await convertInvalids([
+        {
+          id,
+          name: editData.name.toUpperCase(),
+          country_code: editData.country_code,
+          phone: editData.phone,
+          nakshatra: editData.nakshatra.toUpperCase(),
+        },
+      ]);
+
+      if (created) toast.success("Converted to valid devotee");
+      else if (duplicates) toast.warning("Already exists. Moved to duplicate list.");
+      else {
+        toast.error("Conversion failed");
+        return;
+      }
 
-      await API.delete(`invalids/${id}/`);
-      toast.success("Converted to valid devotee");
       cancelEdit();
       fetchData();
 
-    } catch (error) {
+    } catch {
+      toast.error("Conversion failed");
+    }
+  };
 
-      const errorData = error.response?.data;
-      const isDuplicate =
-        errorData?.duplicate ||
-        errorData?.non_field_errors ||
-        errorData?.detail;
-
-      if (isDuplicate) {
-        try {
-          await API.post("duplicates/", {
-            name: editData.name.toUpperCase(),
-            country_code: editData.country_code,
-            phone: editData.phone,
-            nakshatra: editData.nakshatra.toUpperCase(),
-          });
-
-          await API.delete(`invalids/${id}/`);
-          toast.warning("Already exists. Moved to duplicate list.");
-          cancelEdit();
-          fetchData();
-
-        } catch {
-          toast.error("Failed to move to duplicate list");
-        }
+  const pollReprocessJob = async (jobId) => {
+    for (let attempt = 0; attempt < MAX_POLL_ATTEMPTS; attempt++) {
+      const { data: job } = await API.get(`reprocess-jobs/${jobId}/`);
+
+      if (job.status === "COMPLETED" || job.status === "FAILED") {
+        return job;
+      }
+
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+    }
+
+    return {
+      status: "FAILED",
+      error: `Conversion #${jobId} is still running after 30 minutes. Check again later.`,
+    };
+  };
+
+  // Runs on the server over every invalid entry matching the current
+  // filter (not just the loaded pages)
+  const handleConvertAll = async () => {
+    const filters = buildParams();
+    delete filters.ordering;
+
+    setConverting(true);
+    try {
+      const response = await API.post("invalids/reprocess/", filters);
+      const job = await pollReprocessJob(response.data.id);
+
+      if (job.status === "FAILED") {
+        toast.error(job.error || "Conversion failed");
       } else {
-        toast.error("Conversion failed");
+        toast.success(
+          `Converted: ${job.moved_to_devotees} | Duplicates: ${job.moved_to_duplicates} | Still invalid: ${job.still_invalid}`
+        );
       }
+      fetchData();
+
+    } catch (error) {
+      toast.error(error.response?.data?.error || "Conversion failed");
+    } finally {
+      setConverting(false);
     }
   };
 
@@ -292,6 +376,11 @@ function NakshatraTable({ type = "devotees" }) {
 
         <button className="btn pdf-btn" onClick={() => setDownloadType("pdf")}>PDF</button>
         <button className="btn csv-btn" onClick={() => setDownloadType("csv")}>CSV</button>
+        {isInvalidPage && (
+          <button className="btn convert-btn" onClick={handleConvertAll} disabled={converting}>
+            {converting ? "Converting..." : "Convert All"}
+          </button>
+        )}
         <button className="btn delete-btn" onClick={() => setDeleteAllMode(true)}>Delete All</button>
       </div>
 
@@ -499,6 +588,18 @@ function NakshatraTable({ type = "devotees" }) {
                         </tbody>
                       </table>
                       )}
+
+                      {!fetchLoading && nextPage && (
+                      <div style={{ textAlign: "center", marginTop: "15px" }}>
+                        <button
+                        className="btn load-more-btn"
+                        onClick={loadMore}
+                        disabled={loadingMore}
+                        >
+                        {loadingMore ? "Loading..." : "Load More"}
+                        </button>
+                      </div>
+                      )}
                     </div>
                     );
                   }
@@ -8,6 +8,7 @@ function Nakshatras() {
 
   const [duplicateCount, setDuplicateCount] = useState(0);
   const [invalidCount, setInvalidCount] = useState(0);
+  const [nakshatraCounts, setNakshatraCounts] = useState({});
 
   // ✅ MUST MATCH BACKEND EXACTLY
   const nakshatras = [
@@ -26,13 +27,12 @@ function Nakshatras() {
 
   const fetchCounts = async () => {
     try {
-      const [dup, inv] = await Promise.all([
-        API.get("duplicates/"),
-        API.get("invalids/")
-      ]);
+      // Counts come from the server-side summary table
+      const { data } = await API.get("stats/");
 
-      setDuplicateCount(dup.data.length);
-      setInvalidCount(inv.data.length);
+      setNakshatraCounts(data.devotees.by_nakshatra);
+      setDuplicateCount(data.duplicates);
+      setInvalidCount(data.invalids);
 
     } catch (err) {
       console.error("Failed to fetch counts", err);
@@ -56,6 +56,9 @@ function Nakshatras() {
             onClick={() => navigate(`/nakshatras/${encodeURIComponent(n)}`)}
           >
             {n}
+            {nakshatraCounts[n] > 0 && (
+              <span className="card-count">{nakshatraCounts[n]}</span>
+            )}
           </div>
         ))}
 